@@ -0,0 +1,161 @@
+import time
+from settings import AI_THINK_BUCKETS, AI_THINK_BUDGET_MS
+
+
+class AIScheduler:
+    def __init__(self, buckets=AI_THINK_BUCKETS, budget_ms=AI_THINK_BUDGET_MS):
+        """
+        Initialize a scheduler that spreads enemy thinking over several frames.
+
+        Every enemy gets a fixed slot when the scheduler first sees it and thinks on the
+        frames of its bucket (slot modulo buckets), so with four buckets each enemy thinks
+        every fourth frame and a quarter of the enemies think per frame. Enemies that
+        have never thought, or that missed their turn, think first on the next frame.
+
+        With a budget, thinking stops for the frame once the budget is used up and the
+        remaining enemies are deferred to the next frame; at least one enemy always
+        thinks. Without a budget (None) the schedule only depends on the frame number,
+        so runs are reproducible.
+
+        The defaults come from AI_THINK_BUCKETS and AI_THINK_BUDGET_MS, which ship as
+        one bucket and no budget, so time-slicing is opt-in and every enemy thinks every
+        frame unless the settings are changed.
+
+        Attributes:
+        buckets: The number of frames over which every enemy thinks once.
+        budget_ms: The time in milliseconds thinking may take per frame, or None.
+        frame: The number of frames scheduled so far.
+        slots: A dict mapping each enemy to its slot.
+        last_think: A dict mapping each enemy to the frame it last thought in.
+        think_counts: A dict mapping each enemy to how often it thought.
+        seen_counts: A dict mapping each enemy to how many frames it was scheduled in.
+        deferred: The number of thinks pushed to a later frame by the budget.
+        last_thinks: The number of enemies that thought in the last frame.
+
+        :param buckets: The number of round-robin buckets, 1 to think every frame.
+        :type buckets: int
+        :param budget_ms: The per-frame thinking budget in milliseconds, or None.
+        :type budget_ms: float or None
+        """
+        self.buckets = max(1, buckets)
+        self.budget_ms = budget_ms
+        self.reset()
+
+    def reset(self):
+        """
+        Forget every enemy and the statistics, e.g. when a level is loaded.
+
+        :return: None
+        """
+        self.frame = 0
+        self.next_slot = 0
+        self.slots = {}
+        self.last_think = {}
+        self.think_counts = {}
+        self.seen_counts = {}
+        self.deferred = 0
+        self.last_thinks = 0
+        self.think_time = 0.0
+
+    def due(self, enemies):
+        """
+        Get the enemies that should think this frame, most overdue first.
+
+        :param enemies: The enemies updated this frame.
+        :type enemies: list of Enemy
+        :return: A list of enemies.
+        """
+        overdue = []
+        due = []
+        bucket = self.frame % self.buckets
+        for enemy in enemies:
+            slot = self.slots.get(enemy)
+            if slot is None:
+                slot = self.next_slot
+                self.next_slot += 1
+                self.slots[enemy] = slot
+            self.seen_counts[enemy] = self.seen_counts.get(enemy, 0) + 1
+
+            last = self.last_think.get(enemy)
+            if last is None or self.frame - last > self.buckets:
+                overdue.append((-1 if last is None else last, slot, enemy))
+            elif slot % self.buckets == bucket:
+                due.append(enemy)
+        overdue.sort(key=lambda item: item[:2])
+        return [enemy for _, _, enemy in overdue] + due
+
+    def think(self, enemies, prepare=None):
+        """
+        Let the enemies whose turn it is think.
+
+        :param enemies: The enemies updated this frame.
+        :type enemies: list of Enemy
+        :param prepare: A function called with the list of enemies due to think before
+            any of them thinks, e.g. to batch their perception.
+        :type prepare: callable or None
+        :return: The number of enemies that thought.
+        :rtype: int
+        """
+        due = self.due(enemies)
+        if prepare is not None and due:
+            prepare(due)
+        start = time.perf_counter()
+        thinks = 0
+        for enemy in due:
+            if (
+                self.budget_ms is not None
+                and thinks
+                and (time.perf_counter() - start) * 1000 >= self.budget_ms
+            ):
+                self.deferred += len(due) - thinks
+                break
+            enemy.think()
+            self.last_think[enemy] = self.frame
+            self.think_counts[enemy] = self.think_counts.get(enemy, 0) + 1
+            thinks += 1
+
+        self.think_time += time.perf_counter() - start
+        self.last_thinks = thinks
+        self.frame += 1
+        if len(self.slots) > 2 * len(enemies) + 64:
+            self.forget_missing(enemies)
+        return thinks
+
+    def forget_missing(self, enemies):
+        """
+        Drop the bookkeeping of enemies that are no longer updated.
+
+        Enemies that come back later, e.g. after sleeping, get a new slot and think
+        on their first frame.
+
+        :param enemies: The enemies that are still updated.
+        :type enemies: list of Enemy
+        :return: None
+        """
+        keep = set(enemies)
+        for table in (self.slots, self.last_think, self.think_counts, self.seen_counts):
+            for enemy in [enemy for enemy in table if enemy not in keep]:
+                del table[enemy]
+
+    def stats(self):
+        """
+        Get statistics about how often enemies think.
+
+        :return: A dict with the number of frames, the enemies tracked, the thinks in
+            the last frame, the deferred thinks, the average think time per frame in
+            milliseconds, and a "think_rate" dict mapping each enemy's class name and
+            slot to the fraction of its frames in which it thought.
+        :rtype: dict
+        """
+        rates = {}
+        for enemy, seen in self.seen_counts.items():
+            key = f"{enemy.__class__.__name__}#{self.slots[enemy]}"
+            rates[key] = self.think_counts.get(enemy, 0) / seen
+        return {
+            "frames": self.frame,
+            "enemies": len(self.slots),
+            "last_thinks": self.last_thinks,
+            "deferred": self.deferred,
+            "think_ms": self.think_time * 1000 / max(1, self.frame),
+            "think_rate": rates,
+        }
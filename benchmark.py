@@ -0,0 +1,380 @@
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import pygame
+from settings import LEVEL_PATH, SIMULATION_RATE
+from headless import SCRIPTS, create_game, run_headless, timing_stats
+
+
+BENCHMARK_VERSION = 1
+
+# The phases of a tick, as (name, owner attribute or None for the game, method).
+# "collisions" is not a method, it is what is left of update after the other phases.
+PHASES = (
+    ("update", None, "update"),
+    ("projectiles", "projectiles", "update"),
+    ("enemies", None, "update_enemies"),
+    ("sprites", "all_sprites", "update"),
+    ("camera", "camera", "update"),
+    ("draw", None, "draw"),
+)
+UPDATE_SUBPHASES = ("projectiles", "enemies", "sprites", "camera")
+
+
+class PhaseTimer:
+    def __init__(self, game):
+        """
+        Initialize a timer for the phases of a game's ticks and attach it to the game.
+
+        The methods listed in PHASES are shadowed by timing wrappers on the game's own
+        objects, so the game code is run unchanged and the methods of other games are
+        not affected. Every call of a phase appends its duration; the time of update
+        not spent in its sub-phases is recorded as "collisions".
+
+        Attributes:
+        game: The game being timed.
+        times: A dict mapping each phase name to a list of durations in seconds.
+        originals: The (owner, method name) of every wrapped method, to detach.
+        in_update: The sub-phase time accumulated during the running update.
+
+        :param game: The game to time.
+        :type game: Game
+        """
+        self.game = game
+        self.times = {name: [] for name, _, _ in PHASES}
+        self.times["collisions"] = []
+        self.originals = []
+        self.in_update = 0.0
+        for name, owner_name, method_name in PHASES:
+            owner = game if owner_name is None else getattr(game, owner_name)
+            self.wrap(owner, method_name, name)
+
+    def wrap(self, owner, method_name, name):
+        """
+        Shadow a method of an object with a wrapper that times its calls.
+
+        :param owner: The object the method is looked up on.
+        :param method_name: The name of the method.
+        :type method_name: str
+        :param name: The phase the calls are recorded as.
+        :type name: str
+        :return: None
+        """
+        method = getattr(owner, method_name)
+        times = self.times[name]
+        is_update = name == "update"
+        is_subphase = name in UPDATE_SUBPHASES
+
+        def timed(*args, **kwargs):
+            if is_update:
+                self.in_update = 0.0
+            start = time.perf_counter()
+            result = method(*args, **kwargs)
+            duration = time.perf_counter() - start
+            times.append(duration)
+            if is_subphase:
+                self.in_update += duration
+            elif is_update:
+                self.times["collisions"].append(max(0.0, duration - self.in_update))
+            return result
+
+        setattr(owner, method_name, timed)
+        self.originals.append((owner, method_name))
+
+    def reset(self):
+        """
+        Forget the recorded durations.
+
+        :return: None
+        """
+        for times in self.times.values():
+            times.clear()
+
+    def detach(self):
+        """
+        Remove the wrappers, so the game's methods are called directly again.
+
+        :return: None
+        """
+        for owner, method_name in self.originals:
+            delattr(owner, method_name)
+        self.originals = []
+
+    def stats(self):
+        """
+        Summarize the recorded durations of every phase.
+
+        :return: A dict mapping each phase that ran to its timing_stats.
+        :rtype: dict
+        """
+        return {name: timing_stats(times) for name, times in self.times.items() if times}
+
+
+def find_levels(pattern=LEVEL_PATH + "*.json"):
+    """
+    Get the level files to benchmark.
+
+    :param pattern: A glob pattern of level JSON files.
+    :type pattern: str
+    :return: The matching paths, sorted.
+    :rtype: list of str
+    """
+    return sorted(glob.glob(pattern))
+
+
+def measure_peak_memory(game, level, ticks, script):
+    """
+    Run a level again with tracemalloc to find the peak memory it allocates.
+
+    Tracing slows every allocation down, so this is a separate run from the timed
+    one. The runs are deterministic, so both play the same ticks.
+
+    :param game: The headless game.
+    :type game: Game
+    :param level: The path of the level JSON file.
+    :type level: str
+    :param ticks: The number of ticks to run.
+    :type ticks: int
+    :param script: The input script.
+    :type script: callable
+    :return: The peak traced memory in KiB, including loading the level.
+    :rtype: float
+    """
+    tracemalloc.start()
+    try:
+        run_headless(level, ticks, script, True, game)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def benchmark_level(game, timer, level, ticks, script, repeat=1, memory=True):
+    """
+    Benchmark one level: run it headless with rendering and time every phase.
+
+    The durations of all repeats are pooled before the percentiles are taken.
+
+    :param game: The headless game the timer is attached to.
+    :type game: Game
+    :param timer: The phase timer of the game.
+    :type timer: PhaseTimer
+    :param level: The path of the level JSON file.
+    :type level: str
+    :param ticks: The number of ticks per run.
+    :type ticks: int
+    :param script: The input script.
+    :type script: callable
+    :param repeat: How many times the level is run.
+    :type repeat: int
+    :param memory: Whether to measure the peak memory with an extra run.
+    :type memory: bool
+    :return: A dict with the ticks played, the ticks per second, the phase stats,
+        the peak memory in KiB or None, and the checksum of the final state.
+    :rtype: dict
+    """
+    timer.reset()
+    seconds = 0.0
+    played = 0
+    for _ in range(repeat):
+        result = run_headless(level, ticks, script, True, game)
+        seconds += result["seconds"]
+        played += result["ticks"]
+    phases = timer.stats()
+    peak_memory_kb = measure_peak_memory(game, level, ticks, script) if memory else None
+    return {
+        "level": level,
+        "ticks": result["ticks"],
+        "ticks_per_second": played / seconds if seconds else 0.0,
+        "phases": phases,
+        "peak_memory_kb": peak_memory_kb,
+        "checksum": result["checksum"],
+    }
+
+
+def run_benchmark(levels, ticks=600, script="patrol", repeat=3, memory=True):
+    """
+    Benchmark levels headless under a scripted input.
+
+    :param levels: The paths of the level JSON files.
+    :type levels: list of str
+    :param ticks: The number of ticks per run.
+    :type ticks: int
+    :param script: The name of the input script, see headless.SCRIPTS.
+    :type script: str
+    :param repeat: How many times each level is run.
+    :type repeat: int
+    :param memory: Whether to measure the peak memory of each level.
+    :type memory: bool
+    :return: The results: the settings of the run, the environment and a dict
+        mapping each level to its result of benchmark_level.
+    :rtype: dict
+    """
+    game = create_game()
+    timer = PhaseTimer(game)
+    try:
+        results = {
+            level: benchmark_level(
+                game, timer, level, ticks, SCRIPTS[script], repeat, memory
+            )
+            for level in levels
+        }
+    finally:
+        timer.detach()
+    return {
+        "version": BENCHMARK_VERSION,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "ticks": ticks,
+        "script": script,
+        "repeat": repeat,
+        "simulation_rate": SIMULATION_RATE,
+        "environment": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+        },
+        "levels": results,
+    }
+
+
+def compare(baseline, current, threshold=0.1, min_delta_ms=0.05):
+    """
+    Compare benchmark results with a baseline and find the regressions.
+
+    A phase regresses when its p50 or p95 grew by more than threshold and by more
+    than min_delta_ms, so phases that take microseconds do not flag on noise. A level
+    regresses when its ticks per second dropped or its peak memory grew by more than
+    threshold. A level whose checksum changed played differently, so its numbers
+    are reported but not comparable.
+
+    :param baseline: The baseline results of run_benchmark.
+    :type baseline: dict
+    :param current: The new results of run_benchmark.
+    :type current: dict
+    :param threshold: The relative change that counts as a regression, e.g. 0.1.
+    :type threshold: float
+    :param min_delta_ms: The smallest change in milliseconds that counts.
+    :type min_delta_ms: float
+    :return: A list of (level, metric, baseline value, current value, regression)
+        tuples for every compared metric, and a list of messages about levels that
+        cannot be compared.
+    :rtype: tuple
+    """
+    rows = []
+    notes = []
+    for level, result in current["levels"].items():
+        base = baseline["levels"].get(level)
+        if base is None:
+            notes.append(f"{level}: not in the baseline")
+            continue
+        if base["checksum"] != result["checksum"]:
+            notes.append(f"{level}: played differently than the baseline")
+
+        for name, stats in result["phases"].items():
+            base_stats = base["phases"].get(name)
+            if base_stats is None:
+                continue
+            for key in ("p50_ms", "p95_ms"):
+                old, new = base_stats[key], stats[key]
+                regression = new > old * (1 + threshold) and new - old > min_delta_ms
+                rows.append((level, f"{name} {key}", old, new, regression))
+
+        old, new = base["ticks_per_second"], result["ticks_per_second"]
+        rows.append(
+            (level, "ticks_per_second", old, new, new < old / (1 + threshold))
+        )
+        old, new = base["peak_memory_kb"], result["peak_memory_kb"]
+        if old is not None and new is not None:
+            rows.append(
+                (level, "peak_memory_kb", old, new, new > old * (1 + threshold))
+            )
+    return rows, notes
+
+
+def print_results(results):
+    """
+    Print a table of the phase timings of every level.
+
+    :param results: The results of run_benchmark.
+    :type results: dict
+    :return: None
+    """
+    for level, result in results["levels"].items():
+        memory = result["peak_memory_kb"]
+        print(
+            f"{level}: {result['ticks']} ticks, "
+            f"{result['ticks_per_second']:.0f} ticks/s, "
+            f"peak memory {'-' if memory is None else f'{memory:.0f} KiB'}"
+        )
+        for name, stats in result["phases"].items():
+            print(
+                f"    {name:<12} p50 {stats['p50_ms']:7.3f} ms  "
+                f"p95 {stats['p95_ms']:7.3f} ms  p99 {stats['p99_ms']:7.3f} ms"
+            )
+
+
+def main():
+    """
+    Benchmark the levels, save the results as a baseline or compare them with one.
+
+    Exits with status 1 if a comparison finds a regression.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the levels headless")
+    parser.add_argument("levels", nargs="*", help="level files, default all levels")
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--script", choices=sorted(SCRIPTS), default="patrol")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc")
+    parser.add_argument("--save", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="compare with a baseline")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--min-delta-ms", type=float, default=0.05)
+    args = parser.parse_args()
+
+    # The game's log messages go to stdout, keep them out of the report.
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = run_benchmark(
+            args.levels or find_levels(),
+            args.ticks,
+            args.script,
+            args.repeat,
+            not args.no_memory,
+        )
+    print_results(results)
+
+    if args.save:
+        directory = os.path.dirname(args.save)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=4)
+        print(f"Saved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        if baseline.get("version") != BENCHMARK_VERSION:
+            sys.exit(f"Unsupported baseline version: {baseline.get('version')}")
+        rows, notes = compare(baseline, results, args.threshold, args.min_delta_ms)
+        for note in notes:
+            print(f"NOTE {note}")
+        regressions = [row for row in rows if row[4]]
+        for level, metric, old, new, _ in regressions:
+            change = (new - old) / old * 100 if old else float("inf")
+            print(f"REGRESSION {level} {metric}: {old:.3f} -> {new:.3f} ({change:+.0f}%)")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} in {len(rows)} metrics")
+
+
+if __name__ == "__main__":
+    main()
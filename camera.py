@@ -1,5 +1,6 @@
 import pygame
 from settings import *
+from image_cache import get_image
 
 
 class Camera:
@@ -44,7 +45,7 @@ class Camera:
         """
         Updates the rectangles used to draw the camera on the screen.
 
-        This method is called whenever the camera is moved. It calculates the new positions of the rectangles and creates new surfaces and rectangles accordingly.
+        This method is called whenever the camera is moved. It calculates the new positions of the rectangles and creates new rectangles accordingly, the surfaces come from the image cache.
 
         Attributes:
         rect_size (int): The size of the rectangles used to draw the camera on the screen.
@@ -58,12 +59,42 @@ class Camera:
         self.rects = []
         for dx in [-self.rect_size, 0]:
             for dy in [-self.rect_size, 0]:
-                surface = pygame.Surface((self.rect_size, self.rect_size))
-                surface.fill(RED)
-                surface.set_alpha(0)
+                surface = get_image(
+                    "CameraRect", (self.rect_size, self.rect_size), RED, 0
+                )
                 rect = surface.get_rect(topleft=(center_x + dx, center_y + dy))
                 self.rects.append((surface, rect))
 
+    def reset(self):
+        """
+        Moves the camera back to the top left corner of the world, where it starts.
+        """
+        self.x = 0
+        self.y = 0
+        self.camera = pygame.Rect(0, 0, self.width, self.height)
+        self.update_rect_positions()
+
+    def viewport(self):
+        """
+        Get the part of the world that is currently on screen.
+
+        Returns:
+            pygame.Rect: The visible area in world coordinates.
+        """
+        return pygame.Rect(-self.camera.x, -self.camera.y, WIDTH, HEIGHT)
+
+    def activation_rect(self, margin):
+        """
+        Get the area around the viewport in which entities are kept awake.
+
+        Args:
+            margin (int): The distance around the viewport that still counts as near.
+
+        Returns:
+            pygame.Rect: The activation area in world coordinates.
+        """
+        return self.viewport().inflate(margin * 2, margin * 2)
+
     def apply(self, entity):
         """
         Applies the camera to the given entity.
@@ -0,0 +1,217 @@
+import glob
+import json
+import pygame
+from settings import LEVEL_PATH
+from spatial_hash import SpatialHash
+
+
+MERGE_AXES = {
+    "Platform": (True, True),
+    "DeadlyPlatform": (True, True),
+    "SlipperyPlatform": (True, True),
+    "LadderPlatform": (False, True),
+}
+
+
+class Collider:
+    def __init__(self, rect, kind, sources):
+        """
+        Initialize a Collider instance.
+
+        A collider is the rectangle the collision code tests against. It stands in for
+        one or more touching platforms of the same type, which are still drawn on their
+        own.
+
+        :param rect: The merged collision rectangle.
+        :type rect: pygame.Rect
+        :param kind: The platform class every source platform belongs to.
+        :type kind: type
+        :param sources: The platforms covered by this collider.
+        :type sources: list of Platform
+        """
+        self.rect = rect
+        self.kind = kind
+        self.sources = sources
+
+    def __repr__(self):
+        return f"<Collider {self.kind.__name__} {self.rect} x{len(self.sources)}>"
+
+
+def _merge_runs(items, horizontal):
+    """
+    Merge runs of rectangles that touch along one axis and line up on the other.
+
+    :param items: A list of (rect, sources) tuples.
+    :param horizontal: True to merge side by side rectangles with the same top and
+        height, False to merge stacked rectangles with the same left and width.
+    :return: A tuple (items, merged) with the new list and whether anything merged.
+    """
+    if horizontal:
+        items.sort(key=lambda item: (item[0].top, item[0].height, item[0].left))
+    else:
+        items.sort(key=lambda item: (item[0].left, item[0].width, item[0].top))
+
+    result = []
+    merged = False
+    for rect, sources in items:
+        if result:
+            last_rect, last_sources = result[-1]
+            if horizontal:
+                lines_up = (
+                    last_rect.top == rect.top
+                    and last_rect.height == rect.height
+                    and rect.left <= last_rect.right
+                )
+            else:
+                lines_up = (
+                    last_rect.left == rect.left
+                    and last_rect.width == rect.width
+                    and rect.top <= last_rect.bottom
+                )
+            if lines_up:
+                result[-1] = (last_rect.union(rect), last_sources + sources)
+                merged = True
+                continue
+        result.append((rect, sources))
+    return result, merged
+
+
+def _absorb_contained(items):
+    """
+    Drop rectangles that lie completely inside another rectangle of the list.
+
+    :param items: A list of (rect, sources) tuples.
+    :return: A tuple (items, merged) with the new list and whether anything was dropped.
+    """
+    items = sorted(items, key=lambda item: item[0].width * item[0].height, reverse=True)
+    grid = SpatialHash()
+    kept = []
+    for rect, sources in items:
+        container = None
+        for index in grid.query(rect):
+            if kept[index][0].contains(rect):
+                container = index
+                break
+        if container is None:
+            grid.insert(len(kept), rect)
+            kept.append((rect, sources))
+        else:
+            kept[container] = (kept[container][0], kept[container][1] + sources)
+    return kept, len(kept) < len(items)
+
+
+def merge_rects(rects, horizontal=True, vertical=True):
+    """
+    Greedily merge touching or overlapping rectangles into larger rectangles.
+
+    Rectangles lying completely inside another one are dropped. Two rectangles are
+    merged when their union is itself a rectangle, i.e. they share a full edge span and
+    touch or overlap along the other axis. The passes repeat until no more rectangles
+    can be merged.
+
+    :param rects: The rectangles to merge.
+    :type rects: list of pygame.Rect
+    :param horizontal: Whether side by side rectangles may be merged.
+    :param vertical: Whether stacked rectangles may be merged.
+    :return: A list of (rect, indices) tuples, where indices lists the positions in
+        rects covered by the merged rect.
+    """
+    items = [(pygame.Rect(rect), [i]) for i, rect in enumerate(rects)]
+    merged = True
+    while merged:
+        items, merged = _absorb_contained(items)
+        if horizontal:
+            items, changed = _merge_runs(items, True)
+            merged = merged or changed
+        if vertical:
+            items, changed = _merge_runs(items, False)
+            merged = merged or changed
+        if not (horizontal and vertical):
+            break
+    return [(rect, sorted(indices)) for rect, indices in items]
+
+
+def build_colliders(platforms):
+    """
+    Merge touching platforms of the same type into colliders.
+
+    Platform types missing from MERGE_AXES, such as teleporters, are never merged and
+    are not part of the result.
+
+    :param platforms: The platforms of the level.
+    :type platforms: iterable of Platform
+    :return: A list of Collider objects.
+    """
+    by_kind = {}
+    for platform in platforms:
+        if type(platform).__name__ in MERGE_AXES:
+            by_kind.setdefault(type(platform), []).append(platform)
+
+    colliders = []
+    for kind, members in by_kind.items():
+        horizontal, vertical = MERGE_AXES[kind.__name__]
+        for rect, indices in merge_rects(
+            [platform.rect for platform in members], horizontal, vertical
+        ):
+            colliders.append(Collider(rect, kind, [members[i] for i in indices]))
+    return colliders
+
+
+def merge_level_data(platform_data):
+    """
+    Merge the platforms of a level file without creating any sprites.
+
+    :param platform_data: The "platforms" list of a level JSON file.
+    :type platform_data: list of dict
+    :return: A list of (type_name, rect) tuples, with teleporters and other unmerged
+        types passed through unchanged.
+    """
+    by_kind = {}
+    result = []
+    for plat in platform_data:
+        if plat["width"] <= 0 or plat["height"] <= 0:
+            continue
+        rect = pygame.Rect(plat["x"], plat["y"], plat["width"], plat["height"])
+        if plat["type"] in MERGE_AXES:
+            by_kind.setdefault(plat["type"], []).append(rect)
+        else:
+            result.append((plat["type"], rect))
+
+    for kind, rects in by_kind.items():
+        horizontal, vertical = MERGE_AXES[kind]
+        for rect, _ in merge_rects(rects, horizontal, vertical):
+            result.append((kind, rect))
+    return result
+
+
+def main():
+    """
+    Report how many colliders the merge pass removes from every level.
+
+    :return: None
+    """
+    total_before = 0
+    total_after = 0
+    for level_file in sorted(glob.glob(LEVEL_PATH + "*.json")):
+        with open(level_file, "r") as f:
+            level_data = json.load(f)
+        platforms = [
+            plat
+            for plat in level_data["platforms"]
+            if plat["width"] > 0 and plat["height"] > 0
+        ]
+        merged = merge_level_data(platforms)
+        total_before += len(platforms)
+        total_after += len(merged)
+        print(
+            f"{level_file}: {len(platforms)} platforms -> {len(merged)} colliders "
+            f"({len(platforms) - len(merged)} removed)"
+        )
+    print(
+        f"Total: {total_before} platforms -> {total_after} colliders "
+        f"({total_before - total_after} removed)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+import math
+from heapq import merge
+from operator import itemgetter
+
+
+class SweepAndPrune:
+    def __init__(self):
+        """
+        Initialize an empty sort-and-sweep broad phase.
+
+        Moving entities are kept in a single list sorted by the left edge of their
+        rect. Entities only move a few pixels per frame, so the list from the previous
+        frame is nearly sorted and an insertion sort brings it back in order in close
+        to linear time. Newly added entities are sorted on their own and merged in.
+        Sweeping the sorted list then only compares entities whose x intervals overlap,
+        instead of every entity with every other entity.
+
+        Attributes:
+        entries: A list of [left, entity, layer] entries sorted by left.
+        """
+        self.entries = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def update(self, layers):
+        """
+        Synchronise the broad phase with the current entities and re-sort it.
+
+        Entities that are no longer listed are dropped, new entities are appended, and
+        the list is re-sorted in place by the current left edge of each rect.
+
+        :param layers: A dict mapping a layer name to the entities on that layer, e.g.
+            {"enemies": game.enemies}. Every entity must have a rect attribute.
+        :type layers: dict
+        :return: None
+        """
+        current = {}
+        for layer, entities in layers.items():
+            for entity in entities:
+                current[entity] = layer
+
+        entries = []
+        for entry in self.entries:
+            entity = entry[1]
+            if current.get(entity) == entry[2]:
+                entry[0] = entity.rect.left
+                entries.append(entry)
+                del current[entity]
+
+        for i in range(1, len(entries)):
+            entry = entries[i]
+            left = entry[0]
+            j = i - 1
+            while j >= 0 and entries[j][0] > left:
+                entries[j + 1] = entries[j]
+                j -= 1
+            entries[j + 1] = entry
+
+        if current:
+            spawned = [
+                [entity.rect.left, entity, layer] for entity, layer in current.items()
+            ]
+            spawned.sort(key=itemgetter(0))
+            entries = list(merge(entries, spawned, key=itemgetter(0)))
+
+        self.entries = entries
+
+    def find_pairs(self, layer_pairs):
+        """
+        Sweep the sorted entities and collect overlapping pairs between layers.
+
+        :param layer_pairs: The (layer_a, layer_b) combinations to report, e.g.
+            [("player", "enemies")]. Pairs between other layers are skipped.
+        :type layer_pairs: iterable of tuple
+        :return: A dict mapping each requested (layer_a, layer_b) tuple to a list of
+            (entity_a, entity_b) pairs whose rects overlap.
+        """
+        partners = {}
+        pairs = {}
+        for layer_a, layer_b in layer_pairs:
+            key = (layer_a, layer_b)
+            pairs[key] = []
+            partners.setdefault(layer_a, []).append((layer_b, key, True))
+            partners.setdefault(layer_b, []).append((layer_a, key, False))
+
+        active = {layer: [] for layer in partners}
+        for left, entity, layer in self.entries:
+            matches = partners.get(layer)
+            if matches is None:
+                continue
+            rect = entity.rect
+            for other_layer, key, entity_first in matches:
+                others = active[other_layer]
+                if not others:
+                    continue
+                found = pairs[key]
+                still_active = []
+                for other in others:
+                    if other.right <= left:
+                        continue
+                    still_active.append(other)
+                    if rect.colliderect(other.rect):
+                        if entity_first:
+                            found.append((entity, other.entity))
+                        else:
+                            found.append((other.entity, entity))
+                active[other_layer] = still_active
+            active[layer].append(_ActiveEntry(entity))
+        return pairs
+
+
+class _ActiveEntry:
+    __slots__ = ("entity", "rect", "right")
+
+    def __init__(self, entity):
+        self.entity = entity
+        self.rect = entity.rect
+        self.right = entity.rect.right
+
+
+def _overlap_interval(start, size, velocity, low, high):
+    """
+    Get the open time interval in which a moving span overlaps a static span.
+
+    :param start: The position of the moving span at time 0.
+    :param size: The length of the moving span.
+    :param velocity: The distance the moving span travels per frame.
+    :param low: The start of the static span.
+    :param high: The end of the static span.
+    :return: A (t_enter, t_exit) tuple, or None if the spans never overlap.
+    """
+    if velocity == 0:
+        if start < high and start + size > low:
+            return -math.inf, math.inf
+        return None
+    t_a = (low - start - size) / velocity
+    t_b = (high - start) / velocity
+    if velocity > 0:
+        return t_a, t_b
+    return t_b, t_a
+
+
+def time_of_impact(rect, vel_x, vel_y, obstacles):
+    """
+    Get the first frame in which a rectangle moving in a straight line hits an obstacle.
+
+    The rectangle is moved by (vel_x, vel_y) once per frame. The overlap time with each
+    obstacle is solved per axis, so the whole flight is checked at once instead of
+    testing every obstacle on every frame.
+
+    :param rect: The rectangle at frame 0.
+    :type rect: pygame.Rect
+    :param vel_x: The horizontal distance travelled per frame.
+    :param vel_y: The vertical distance travelled per frame.
+    :param obstacles: The static objects to test, each with a rect attribute.
+    :return: The first frame number (1 or higher) at which the rectangle overlaps an
+        obstacle, or None if it never does.
+    """
+    first = None
+    for obstacle in obstacles:
+        other = obstacle.rect
+        x_interval = _overlap_interval(rect.x, rect.width, vel_x, other.left, other.right)
+        if x_interval is None:
+            continue
+        y_interval = _overlap_interval(rect.y, rect.height, vel_y, other.top, other.bottom)
+        if y_interval is None:
+            continue
+        t_enter = max(x_interval[0], y_interval[0])
+        t_exit = min(x_interval[1], y_interval[1])
+        frame = max(1, math.floor(t_enter) + 1)
+        if frame < t_exit and (first is None or frame < first):
+            first = frame
+    return first
+
+
+def stepped_time_of_impact(rect, vel_x, vel_y, obstacles, limit):
+    """
+    Get the first frame in which a rectangle moving like a projectile hits an obstacle.
+
+    A projectile adds its velocity to a float position once per frame and is drawn and
+    tested at that position rounded to whole pixels, so it can touch an obstacle a frame
+    earlier or later than the continuous path does. The continuous overlap time with
+    each obstacle, grown by a pixel on every side, gives the frames in which a hit is
+    possible; only those frames are stepped and tested with the rounded rect.
+
+    :param rect: The rectangle at frame 0.
+    :type rect: pygame.Rect
+    :param vel_x: The horizontal distance travelled per frame.
+    :param vel_y: The vertical distance travelled per frame.
+    :param obstacles: The static objects to test, each with a rect attribute.
+    :param limit: The last frame to test.
+    :type limit: int
+    :return: The first frame number (1 or higher) at which the rounded rectangle
+        overlaps an obstacle, or None if it does not up to limit.
+    """
+    windows = []
+    for obstacle in obstacles:
+        other = obstacle.rect
+        x_interval = _overlap_interval(
+            rect.x, rect.width, vel_x, other.left - 1, other.right + 1
+        )
+        if x_interval is None:
+            continue
+        y_interval = _overlap_interval(
+            rect.y, rect.height, vel_y, other.top - 1, other.bottom + 1
+        )
+        if y_interval is None:
+            continue
+        first = max(1, math.floor(max(x_interval[0], y_interval[0])) + 1)
+        last = min(limit, math.ceil(min(x_interval[1], y_interval[1])) - 1)
+        if first <= last:
+            windows.append((first, last, other))
+    if not windows:
+        return None
+    windows.sort(key=lambda window: window[0])
+
+    # The position is accumulated exactly like ProjectileSystem.update does, so the
+    # rounding matches it to the last bit.
+    pos_x = float(rect.x)
+    pos_y = float(rect.y)
+    moved = rect.copy()
+    end = max(window[1] for window in windows)
+    for frame in range(1, end + 1):
+        pos_x += vel_x
+        pos_y += vel_y
+        if frame < windows[0][0]:
+            continue
+        moved.x = round(pos_x)
+        moved.y = round(pos_y)
+        for first, last, other in windows:
+            if first > frame:
+                break
+            if frame <= last and moved.colliderect(other):
+                return frame
+    return None
+
+
+def time_to_leave(rect, vel_x, vel_y, width, height):
+    """
+    Get the first frame in which a rectangle moving in a straight line is fully outside
+    the area (0, 0, width, height).
+
+    :param rect: The rectangle at frame 0.
+    :type rect: pygame.Rect
+    :param vel_x: The horizontal distance travelled per frame.
+    :param vel_y: The vertical distance travelled per frame.
+    :param width: The width of the area.
+    :param height: The height of the area.
+    :return: The frame number (1 or higher), or None if the rectangle never leaves.
+    """
+    frames = []
+    if vel_x > 0:
+        frames.append(math.floor((width - rect.left) / vel_x) + 1)
+    elif vel_x < 0:
+        frames.append(math.floor(rect.right / -vel_x) + 1)
+    if vel_y > 0:
+        frames.append(math.floor((height - rect.top) / vel_y) + 1)
+    elif vel_y < 0:
+        frames.append(math.floor(rect.bottom / -vel_y) + 1)
+    if not frames:
+        return None
+    return max(1, min(frames))
+
+
+def straight_line_lifetime(rect, vel_x, vel_y, registry, collections, width, height):
+    """
+    Get the number of frames a straight-line projectile lives before it hits static
+    geometry or leaves the world.
+
+    The platforms are fetched from the registry once, for the area the projectile sweeps
+    until it leaves the world, and the hit is found on the same rounded positions the
+    projectile system moves the projectile through.
+
+    :param rect: The projectile rectangle at spawn.
+    :type rect: pygame.Rect
+    :param vel_x: The horizontal distance travelled per frame.
+    :param vel_y: The vertical distance travelled per frame.
+    :param registry: The platform registry of the level.
+    :type registry: PlatformRegistry
+    :param collections: The platform collections that stop the projectile. All
+        platforms stop it if the sequence is empty.
+    :param width: The width of the world.
+    :param height: The height of the world.
+    :return: The number of frames, or None if the projectile never stops.
+    """
+    leave = time_to_leave(rect, vel_x, vel_y, width, height)
+    if leave is None:
+        return None
+    swept = rect.union(rect.move(round(vel_x * leave), round(vel_y * leave)))
+    swept.inflate_ip(2, 2)
+    impact = stepped_time_of_impact(
+        rect, vel_x, vel_y, registry.query(swept, *collections), leave
+    )
+    if impact is None:
+        return leave
+    return min(impact, leave)
@@ -0,0 +1,284 @@
+from settings import COLLISION_BACKEND
+from spatial_hash import SpatialHash
+from debug_logger import logger
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+RESOLVE_NONE = 0
+RESOLVE_TOP = 1
+RESOLVE_BOTTOM = 2
+RESOLVE_LEFT = 3
+RESOLVE_RIGHT = 4
+
+
+def resolve_side(rect, platform_rect, vel_x, vel_y):
+    """
+    Pick the side an entity is pushed out of a platform it overlaps.
+
+    The side with the smallest penetration wins, as long as the entity is moving into
+    it. Ties are broken in the order top, bottom, left, right.
+
+    :param rect: The rectangle of the entity.
+    :type rect: pygame.Rect
+    :param platform_rect: The rectangle of the platform.
+    :type platform_rect: pygame.Rect
+    :param vel_x: The horizontal velocity of the entity.
+    :param vel_y: The vertical velocity of the entity.
+    :return: One of RESOLVE_NONE, RESOLVE_TOP, RESOLVE_BOTTOM, RESOLVE_LEFT or
+        RESOLVE_RIGHT.
+    """
+    overlap_left = rect.right - platform_rect.left
+    overlap_right = platform_rect.right - rect.left
+    overlap_top = rect.bottom - platform_rect.top
+    overlap_bottom = platform_rect.bottom - rect.top
+    min_overlap = min(overlap_left, overlap_right, overlap_top, overlap_bottom)
+
+    if min_overlap == overlap_top and vel_y >= 0:
+        return RESOLVE_TOP
+    if min_overlap == overlap_bottom and vel_y < 0:
+        return RESOLVE_BOTTOM
+    if min_overlap == overlap_left and vel_x > 0:
+        return RESOLVE_LEFT
+    if min_overlap == overlap_right and vel_x < 0:
+        return RESOLVE_RIGHT
+    return RESOLVE_NONE
+
+
+def apply_side(enemy, platform_rect, side):
+    """
+    Push an enemy out of a platform and update its velocity and on_ground flag.
+
+    :param enemy: The enemy to move.
+    :type enemy: Enemy
+    :param platform_rect: The rectangle of the platform.
+    :type platform_rect: pygame.Rect
+    :param side: The side returned by resolve_side.
+    :return: None
+    """
+    if side == RESOLVE_TOP:
+        enemy.rect.bottom = platform_rect.top
+        enemy.vel_y = 0
+        enemy.on_ground = True
+    elif side == RESOLVE_BOTTOM:
+        enemy.rect.top = platform_rect.bottom
+        enemy.vel_y = 0
+    elif side == RESOLVE_LEFT:
+        enemy.rect.right = platform_rect.left
+        enemy.vel_x = 0
+        enemy.patrol_direction *= -1
+    elif side == RESOLVE_RIGHT:
+        enemy.rect.left = platform_rect.right
+        enemy.vel_x = 0
+        enemy.patrol_direction *= -1
+
+
+class PlatformKernel:
+    def __init__(self, registry, backend=COLLISION_BACKEND):
+        """
+        Build the enemy versus platform collision kernel for a level.
+
+        The colliders that block enemies (solids and teleporters) are indexed in a
+        spatial hash and copied into a struct of arrays once at level load. Every frame,
+        resolve() finds the colliders near every enemy and the side each overlapping
+        enemy is pushed out of in one batched call, then writes the results back to the
+        enemies.
+
+        Both backends take the candidate colliders of every enemy from the spatial hash,
+        so the work follows the number of colliders near the enemies and not the size of
+        the level. The "numpy" backend then tests all candidate pairs with NumPy arrays,
+        the "python" backend tests them one by one. Both give identical results. "auto"
+        picks NumPy when it is installed.
+
+        Attributes:
+        colliders: The blocking colliders, in the order they are tested.
+        grid: A SpatialHash of the indices of the colliders.
+        backend: The backend in use, "numpy" or "python".
+        x, y, w, h: NumPy arrays with the collider rectangles (numpy backend only).
+
+        :param registry: The platform registry of the level.
+        :type registry: PlatformRegistry
+        :param backend: "auto", "numpy" or "python".
+        :type backend: str
+        """
+        self.registry = registry
+        self.colliders = list(registry.solids) + list(registry.teleporters)
+        self.grid = SpatialHash()
+        for i, collider in enumerate(self.colliders):
+            self.grid.insert(i, collider.rect)
+
+        if backend == "auto":
+            backend = "numpy" if np is not None else "python"
+        elif backend == "numpy" and np is None:
+            logger.warning("NumPy is not installed, using the python collision backend")
+            backend = "python"
+        self.backend = backend
+
+        if self.backend == "numpy":
+            rects = [collider.rect for collider in self.colliders]
+            self.x = np.array([rect.x for rect in rects], dtype=np.int64)
+            self.y = np.array([rect.y for rect in rects], dtype=np.int64)
+            self.w = np.array([rect.width for rect in rects], dtype=np.int64)
+            self.h = np.array([rect.height for rect in rects], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.colliders)
+
+    def contacts(self, enemies):
+        """
+        Find the colliders near every enemy and how the enemy overlaps them.
+
+        A collider is near an enemy when it overlaps the enemy's rect inflated by its
+        own size, so colliders the enemy can be pushed into while resolving are
+        included.
+
+        :param enemies: The enemies to test.
+        :type enemies: list of Enemy
+        :return: A list with one entry per enemy. Each entry is a list of
+            (collider_index, side) tuples in collider order, where side is the
+            resolve_side result for the current rect, or RESOLVE_NONE if the enemy does
+            not overlap the collider yet.
+        """
+        if self.backend == "numpy":
+            return self._contacts_numpy(enemies)
+        return self._contacts_python(enemies)
+
+    def _contacts_python(self, enemies):
+        result = []
+        for enemy in enemies:
+            rect = enemy.rect
+            area = rect.inflate(rect.width, rect.height)
+            entry = []
+            for i in self.grid.query(area):
+                platform_rect = self.colliders[i].rect
+                if not area.colliderect(platform_rect):
+                    continue
+                if rect.colliderect(platform_rect):
+                    side = resolve_side(rect, platform_rect, enemy.vel_x, enemy.vel_y)
+                else:
+                    side = RESOLVE_NONE
+                entry.append((i, side))
+            result.append(entry)
+        return result
+
+    def _contacts_numpy(self, enemies):
+        count = len(enemies)
+        if count == 0 or not self.colliders:
+            return [[] for _ in range(count)]
+
+        # The candidate pairs, by enemy and then in collider order.
+        rows = []
+        cols = []
+        query = self.grid.query
+        for row, enemy in enumerate(enemies):
+            rect = enemy.rect
+            candidates = query(rect.inflate(rect.width, rect.height))
+            rows.extend([row] * len(candidates))
+            cols.extend(candidates)
+        if not cols:
+            return [[] for _ in range(count)]
+        rows = np.array(rows, dtype=np.int64)
+        cols = np.array(cols, dtype=np.int64)
+
+        ex = np.fromiter((enemy.rect.x for enemy in enemies), np.int64, count)
+        ey = np.fromiter((enemy.rect.y for enemy in enemies), np.int64, count)
+        ew = np.fromiter((enemy.rect.width for enemy in enemies), np.int64, count)
+        eh = np.fromiter((enemy.rect.height for enemy in enemies), np.int64, count)
+        vx = np.fromiter((enemy.vel_x for enemy in enemies), np.float64, count)
+        vy = np.fromiter((enemy.vel_y for enemy in enemies), np.float64, count)
+
+        left = ex[rows]
+        top = ey[rows]
+        width = ew[rows]
+        height = eh[rows]
+        plat_left = self.x[cols]
+        plat_top = self.y[cols]
+        plat_right = plat_left + self.w[cols]
+        plat_bottom = plat_top + self.h[cols]
+
+        # Same rounding as pygame.Rect.inflate.
+        area_left = left - width // 2
+        area_top = top - height // 2
+        near = (
+            (area_left < plat_right)
+            & (area_left + width * 2 > plat_left)
+            & (area_top < plat_bottom)
+            & (area_top + height * 2 > plat_top)
+        )
+        if not near.any():
+            return [[] for _ in range(count)]
+        rows = rows[near]
+        cols = cols[near]
+        left = left[near]
+        top = top[near]
+        right = left + width[near]
+        bottom = top + height[near]
+        plat_left = plat_left[near]
+        plat_top = plat_top[near]
+        plat_right = plat_right[near]
+        plat_bottom = plat_bottom[near]
+
+        overlapping = (
+            (left < plat_right)
+            & (right > plat_left)
+            & (top < plat_bottom)
+            & (bottom > plat_top)
+        )
+        overlap_left = right - plat_left
+        overlap_right = plat_right - left
+        overlap_top = bottom - plat_top
+        overlap_bottom = plat_bottom - top
+        min_overlap = np.minimum(
+            np.minimum(overlap_left, overlap_right),
+            np.minimum(overlap_top, overlap_bottom),
+        )
+        vel_x = vx[rows]
+        vel_y = vy[rows]
+        sides = np.select(
+            [
+                (min_overlap == overlap_top) & (vel_y >= 0),
+                (min_overlap == overlap_bottom) & (vel_y < 0),
+                (min_overlap == overlap_left) & (vel_x > 0),
+                (min_overlap == overlap_right) & (vel_x < 0),
+            ],
+            [RESOLVE_TOP, RESOLVE_BOTTOM, RESOLVE_LEFT, RESOLVE_RIGHT],
+            RESOLVE_NONE,
+        )
+        sides = np.where(overlapping, sides, RESOLVE_NONE)
+
+        result = [[] for _ in range(count)]
+        for row, col, side in zip(rows.tolist(), cols.tolist(), sides.tolist()):
+            result[row].append((col, side))
+        return result
+
+    def resolve(self, enemies):
+        """
+        Push every enemy out of the platforms it overlaps.
+
+        The overlaps of all enemies are computed in one batched call. The results are
+        then applied per enemy in collider order. Once an enemy has been moved, the
+        remaining colliders near it are tested again against its new rect, so the result
+        is the same as resolving the colliders one after another.
+
+        :param enemies: The enemies to resolve.
+        :type enemies: iterable of Enemy
+        :return: None
+        """
+        enemies = list(enemies)
+        for enemy, entry in zip(enemies, self.contacts(enemies)):
+            enemy.on_ground = False
+            moved = False
+            for i, side in entry:
+                platform_rect = self.colliders[i].rect
+                if moved:
+                    if not enemy.rect.colliderect(platform_rect):
+                        continue
+                    side = resolve_side(
+                        enemy.rect, platform_rect, enemy.vel_x, enemy.vel_y
+                    )
+                if side != RESOLVE_NONE:
+                    apply_side(enemy, platform_rect, side)
+                    moved = True
@@ -0,0 +1,174 @@
+import argparse
+import random
+import time
+import pygame
+from collision import SweepAndPrune
+
+
+class StressEntity:
+    def __init__(self, x, y, size, vel_x, vel_y):
+        """
+        Initialize a moving box used by the stress scenario.
+
+        :param x: The starting x-coordinate.
+        :param y: The starting y-coordinate.
+        :param size: The width and height of the box.
+        :param vel_x: The horizontal speed in pixels per frame.
+        :param vel_y: The vertical speed in pixels per frame.
+        """
+        self.rect = pygame.Rect(x, y, size, size)
+        self.vel_x = vel_x
+        self.vel_y = vel_y
+
+    def update(self, world_width, world_height):
+        """
+        Move the box and bounce it off the world borders.
+
+        :param world_width: The width of the world.
+        :param world_height: The height of the world.
+        :return: None
+        """
+        self.rect.x += self.vel_x
+        self.rect.y += self.vel_y
+        if self.rect.left < 0 or self.rect.right > world_width:
+            self.vel_x *= -1
+        if self.rect.top < 0 or self.rect.bottom > world_height:
+            self.vel_y *= -1
+
+
+def make_scenario(enemy_count, projectile_count, world_width, world_height, seed):
+    """
+    Create the layers of a stress scenario.
+
+    :param enemy_count: The number of 30x30 enemies.
+    :param projectile_count: The number of 8x8 projectiles, split evenly between the
+        player and the enemies.
+    :param world_width: The width of the world.
+    :param world_height: The height of the world.
+    :param seed: The random seed, so every run builds the same scenario.
+    :return: A dict mapping layer names to lists of StressEntity objects.
+    """
+    rng = random.Random(seed)
+
+    def spawn(count, size, speed):
+        return [
+            StressEntity(
+                rng.randrange(0, world_width - size),
+                rng.randrange(0, world_height - size),
+                size,
+                rng.choice((-1, 1)) * rng.randint(1, speed),
+                rng.choice((-1, 1)) * rng.randint(0, speed),
+            )
+            for _ in range(count)
+        ]
+
+    return {
+        "player": spawn(1, 40, 5),
+        "enemies": spawn(enemy_count, 30, 2),
+        "enemy_projectiles": spawn(projectile_count // 2, 8, 8),
+        "player_projectiles": spawn(projectile_count - projectile_count // 2, 8, 15),
+    }
+
+
+LAYER_PAIRS = [
+    ("player", "enemies"),
+    ("player", "enemy_projectiles"),
+    ("player_projectiles", "enemies"),
+]
+
+
+def brute_force_pairs(layers):
+    """
+    Find the overlapping pairs by testing every combination, like the old nested loops.
+
+    :param layers: The layers of the scenario.
+    :return: A dict mapping each layer pair to its list of overlapping pairs.
+    """
+    pairs = {}
+    for layer_a, layer_b in LAYER_PAIRS:
+        pairs[(layer_a, layer_b)] = [
+            (a, b)
+            for a in layers[layer_a]
+            for b in layers[layer_b]
+            if a.rect.colliderect(b.rect)
+        ]
+    return pairs
+
+
+def run(enemy_count, projectile_count, frames, world_width, world_height, seed, check):
+    """
+    Run the scenario with both broad phases and return the average frame times.
+
+    :return: A tuple (sweep_ms, brute_ms, pair_count) with the average time per frame
+        in milliseconds and the number of pairs found in the last frame.
+    """
+    layers = make_scenario(enemy_count, projectile_count, world_width, world_height, seed)
+    broad_phase = SweepAndPrune()
+    sweep_time = 0.0
+    brute_time = 0.0
+    pair_count = 0
+
+    for _ in range(frames):
+        for entities in layers.values():
+            for entity in entities:
+                entity.update(world_width, world_height)
+
+        start = time.perf_counter()
+        broad_phase.update(layers)
+        pairs = broad_phase.find_pairs(LAYER_PAIRS)
+        sweep_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = brute_force_pairs(layers)
+        brute_time += time.perf_counter() - start
+
+        if check:
+            for key in LAYER_PAIRS:
+                if set(pairs[key]) != set(expected[key]):
+                    raise AssertionError(f"Sweep and prune missed pairs for {key}")
+        pair_count = sum(len(found) for found in pairs.values())
+
+    return sweep_time * 1000 / frames, brute_time * 1000 / frames, pair_count
+
+
+def main():
+    """
+    Run the stress scenario at growing sizes and print how both broad phases scale.
+
+    The largest size is 500 enemies and 2,000 projectiles by default. Every size is
+    checked against the brute force result, so the numbers also prove that sweep and
+    prune finds exactly the same pairs.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Sweep and prune stress scenario")
+    parser.add_argument("--enemies", type=int, default=500)
+    parser.add_argument("--projectiles", type=int, default=2000)
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--world-width", type=int, default=20000)
+    parser.add_argument("--world-height", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-check", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'enemies':>8} {'projectiles':>12} {'sweep ms':>10} {'brute ms':>10} {'pairs':>6}")
+    for fraction in (0.125, 0.25, 0.5, 1.0):
+        enemy_count = int(args.enemies * fraction)
+        projectile_count = int(args.projectiles * fraction)
+        sweep_ms, brute_ms, pair_count = run(
+            enemy_count,
+            projectile_count,
+            args.frames,
+            args.world_width,
+            args.world_height,
+            args.seed,
+            not args.no_check,
+        )
+        print(
+            f"{enemy_count:>8} {projectile_count:>12} "
+            f"{sweep_ms:>10.2f} {brute_ms:>10.2f} {pair_count:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -68,6 +68,16 @@ class DebugLogger:
         print(f"{self.HEADER}{log_msg}{self.ENDC}")
         self._write_to_log(log_msg)
 
+    def debug(self, message: str) -> None:
+        """
+        Write a debug message to the general log file only, not to the console.
+
+        :param message: The message to log
+        :return: None
+        """
+        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+        self._write_to_log(f"[DEBUG][{timestamp}] {message}")
+
     def info(self, message: str, section: str = None) -> None:
         timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
         if section:
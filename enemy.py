@@ -4,20 +4,32 @@ import math
 from abc import ABC, abstractmethod
 from settings import *
 from debug_logger import logger
+from image_cache import get_image
 
 import pygame
 import math
 from abc import ABC, abstractmethod
 from settings import RED, GREEN, BLUE
-from projectile import EnemyProjectile
-from platforms import LadderPlatform
+from projectile import OWNER_ENEMY
+from navigation import MOVE_DROP, MOVE_LADDER
 
 
 class Enemy(pygame.sprite.Sprite, ABC):
+    size = (30, 30)
+    colour = RED
+    walks_on_ladders = False
+    navigation_moves = ()
+
     def __init__(self, game, x, y):
         """
         Initialize the enemy.
 
+        Enemies of the same type share one image from the image cache, the look of each
+        type comes from its size and colour class attributes. The navigation_moves class
+        attribute lists the edges of the level's navigation graph the enemy can follow
+        while chasing. It is empty by default, so an enemy walks straight towards the
+        player unless its class opts in to navigating.
+
         :param game: The current game instance.
         :type game: Game
         :param x: The x position of the enemy.
@@ -27,7 +39,7 @@ class Enemy(pygame.sprite.Sprite, ABC):
         """
         super().__init__()
         self.game = game
-        self.image = pygame.Surface((30, 30))
+        self.image = get_image(type(self).__name__, self.size, self.colour)
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
@@ -53,6 +65,12 @@ class Enemy(pygame.sprite.Sprite, ABC):
         self.patrol_direction = 1
         self.vision_range = 300
         self.on_ground = False
+        self.chasing = False
+        self.chase_direction = 1
+        self.span = None
+        self.nav_edge = None
+        self.climbing = False
+        self.climb_speed = 2
 
     def draw_health_bar(self, surface, camera):
         """
@@ -93,23 +111,88 @@ class Enemy(pygame.sprite.Sprite, ABC):
                 self.health -= amount
                 logger.warning(f"{self.__class__.__name__} at ({self.rect.x}, {self.rect.y}) took {amount} damage. Health: {self.health}/{self.max_health}")
                 self.invulnerable = True
-                self.invulnerable_timer = pygame.time.get_ticks()
+                self.invulnerable_timer = self.game.get_ticks()
                 if self.health <= 0:
                     self.kill()
         except Exception as e:
             logger.error(f"Error in take_damage for {self.__class__.__name__}", exc_info=e)
 
+    def perceive(self):
+        """
+        Get the offset and squared distance from the enemy to the player.
+
+        The result comes from the game's perception cache when it was computed for this
+        frame, otherwise it is worked out directly.
+
+        :return: A (dx, dy, dist_sq) tuple.
+        :rtype: tuple
+        """
+        cached = self.game.perception.get(self)
+        if cached is not None:
+            return cached
+        dx = self.game.player.rect.centerx - self.rect.centerx
+        dy = self.game.player.rect.centery - self.rect.centery
+        return dx, dy, dx * dx + dy * dy
+
     def detect_player(self):
         """
         Check if the player is within the enemy's line of sight.
 
-        :return: True if the player is in range, False otherwise.
+        :return: True if the player is in range and not hidden by a platform, False
+            otherwise.
         :rtype: bool
         """
-        dx = self.game.player.rect.centerx - self.rect.centerx
-        dy = self.game.player.rect.centery - self.rect.centery
-        distance = math.sqrt(dx**2 + dy**2)
-        return distance <= self.vision_range
+        return self.sees_player(self.perceive()[2])
+
+    def sees_player(self, dist_sq):
+        """
+        Check if the player is in vision range and no platform is in the way.
+
+        The range is tested first, so a ray is only cast through the level's line of
+        sight service for players close enough to be seen.
+
+        :param dist_sq: The squared distance to the player, from perceive.
+        :type dist_sq: int
+        :return: True if the enemy sees the player, False otherwise.
+        :rtype: bool
+        """
+        if dist_sq > self.vision_range**2:
+            return False
+        return self.game.line_of_sight.visible(
+            self, self.rect.center, self.game.player.rect.center
+        )
+
+    def check_edge(self):
+        """
+        Check if the enemy is at the edge of the ground it walks on.
+
+        The enemy looks up the walkable span it stands on in the level's span map and
+        keeps it until it leaves it, so the check is a comparison against the span
+        instead of a platform query. Enemies with walks_on_ladders also walk over the
+        tops of ladders. When the enemy does not stand on a span, e.g. while falling,
+        the platforms one step ahead are queried instead.
+
+        :return: True if the next step leaves the ground, False otherwise.
+        """
+        step = self.patrol_direction * self.patrol_speed
+        span = self.span
+        spans = self.game.walkable_spans
+        if span is None or not span.supports(self.rect, spans.tolerance):
+            span = spans.span_at(self.rect, self.walks_on_ladders)
+            self.span = span
+
+        if span is not None:
+            return not (
+                self.rect.left + step < span.right
+                and self.rect.right + step > span.left
+            )
+
+        edge_check = self.rect.move(step, 5)
+        registry = self.game.platform_registry
+        collections = (registry.solids, registry.teleporters)
+        if self.walks_on_ladders:
+            collections += (registry.ladders,)
+        return not registry.collide(edge_check, *collections)
 
     def apply_gravity(self):
         """
@@ -123,60 +206,172 @@ class Enemy(pygame.sprite.Sprite, ABC):
 
     def update(self):
         """
-        Update the enemy's state for the current frame.
+        Do nothing when the sprite groups are updated.
+
+        Enemies are updated together by Game.update_enemies, which calls begin_update on
+        every enemy, resolves all platform collisions in one batch and then calls
+        end_update on every enemy.
+
+        :return: None
+        """
 
-        This method updates the invulnerability status, checks for collisions with the player,
-        applies gravity, handles platform collisions, and moves the enemy.
+    def begin_update(self):
+        """
+        Prepare the enemy for the platform collision pass of the current frame.
 
         Invulnerability is checked based on the duration since the last invulnerability timer.
         If the enemy is invulnerable and the duration has passed, invulnerability is removed.
+        Gravity is then applied to the enemy's vertical velocity, unless it is climbing.
 
-        The method also checks for player collisions and applies gravity to the enemy's
-        vertical velocity. Platform collisions are handled, and the enemy is moved according
-        to its current velocity and state.
+        :return: None
         """
-        if self.game.debug_mode:
-            start_time = time.time()
-
-        current_time = pygame.time.get_ticks()
+        current_time = self.game.get_ticks()
         if self.invulnerable:
             if current_time - self.invulnerable_timer > self.invulnerable_duration:
                 self.invulnerable = False
 
-        self.check_player_collision()
-        self.apply_gravity()
-        self.handle_platform_collision()
-        self.move()
+        if not self.climbing:
+            self.apply_gravity()
+
+    def end_update(self):
+        """
+        Finish the enemy's update after its platform collisions have been resolved.
+
+        The enemy acts on its last decision and moves according to its current velocity
+        and state. Deciding is done by think, which the game's AI scheduler calls before
+        this on the frames the enemy gets to think. An enemy that reached the ladder its
+        path leads over climbs it instead. Contact damage to the player is handled by
+        the game's collision phase.
+
+        :return: None
+        """
+        edge = self.nav_edge
+        if (
+            not self.climbing
+            and self.chasing
+            and edge is not None
+            and edge.kind == MOVE_LADDER
+            and self.rect.bottom == self.game.navigation.nodes[edge.source].top
+            and abs(self.rect.centerx - edge.x) <= self.chase_speed + 1
+        ):
+            self.climbing = True
+
+        if self.climbing:
+            self.climb()
+        else:
+            self.act()
 
         if self.game.debug_mode:
-            logger.log_performance(f"{self.__class__.__name__} update", start_time)
             logger.trace(f"{self.__class__.__name__} pos: ({self.rect.x}, {self.rect.y}), vel: ({self.vel_x}, {self.vel_y})")
 
+    def think(self):
+        """
+        Decide what the enemy does next from what it perceives.
+
+        This is the costly part of the enemy's AI, so it does not run every frame: the
+        decision is stored on the enemy and act keeps applying it until the next think.
+        By default the enemy chases the player while it can see them, see sees_player.
+
+        :return: None
+        """
+        dx, _, dist_sq = self.perceive()
+        if self.sees_player(dist_sq):
+            self.chasing = True
+            self.chase_direction = self.steer(dx)
+        else:
+            self.chasing = False
+            self.nav_edge = None
+
+    def steer(self, dx):
+        """
+        Choose the direction to chase the player in.
+
+        The enemy follows the first edge of its path in the level's navigation graph:
+        it walks to the end of its ground to drop off it, or to the ladder to climb.
+        Without a path, e.g. when the player stands on the same ground or cannot be
+        reached, it walks straight towards the player.
+
+        :param dx: The horizontal offset from the enemy to the player.
+        :type dx: int
+        :return: -1 to walk left, 1 to walk right, 0 to wait at a ladder.
+        :rtype: int
+        """
+        self.nav_edge = self.next_nav_edge()
+        edge = self.nav_edge
+        if edge is None:
+            return 1 if dx > 0 else -1
+        if edge.kind == MOVE_DROP:
+            source = self.game.navigation.nodes[edge.source]
+            return -1 if edge.x <= source.left else 1
+        offset = edge.x - self.rect.centerx
+        if offset == 0:
+            return 0
+        return 1 if offset > 0 else -1
+
+    def next_nav_edge(self):
+        """
+        Get the next edge on the enemy's path to the player.
+
+        While the enemy is in the air, the path starts on the ground it will land on.
+
+        :return: The edge, or None if the enemy cannot navigate or has no path.
+        :rtype: NavEdge or None
+        """
+        navigation = self.game.navigation
+        if not self.navigation_moves or navigation is None:
+            return None
+        start = navigation.node_at(self.rect)
+        if start is None:
+            return None
+        path = navigation.find_path(start, self.navigation_moves)
+        return path[0] if path else None
+
+    def climb(self):
+        """
+        Climb the ladder of the current navigation edge towards the ground it leads to.
+
+        The enemy is centered on the ladder and moves climb_speed pixels per frame,
+        without gravity or platform collisions. On arrival it steps onto the ground.
+
+        :return: None
+        """
+        edge = self.nav_edge
+        target = self.game.navigation.nodes[edge.target]
+        self.vel_x = 0
+        self.vel_y = 0
+        self.rect.centerx = edge.x
+        if self.rect.bottom > target.top:
+            self.rect.bottom = max(target.top, self.rect.bottom - self.climb_speed)
+        else:
+            self.rect.bottom = min(target.top, self.rect.bottom + self.climb_speed)
+
+        if self.rect.bottom == target.top:
+            self.rect.centerx = min(max(self.rect.centerx, target.left), target.right - 1)
+            self.climbing = False
+            self.on_ground = True
+            self.nav_edge = None
+            self.span = None
+
     @abstractmethod
-    def move(self):
+    def act(self):
         """
-        Move the enemy according to its current state and velocity.
+        Move the enemy according to its last decision and its current velocity.
 
-        This method is abstract and must be implemented by subclasses.
+        This runs every frame and must be cheap. It is abstract and must be implemented
+        by subclasses.
 
         :return: None
         """
         pass
 
-    def check_player_collision(self):
+    def move(self):
         """
-        Check if the enemy has collided with the player.
-
-        If the enemy has collided with the player and the player is not invulnerable to the enemy, the player is dealt 10 damage and the enemy's last damage time is updated.
+        Think and act in one step.
 
         :return: None
         """
-        if self.rect.colliderect(self.game.player.rect):
-            current_time = pygame.time.get_ticks()
-            if not self.game.player.is_invulnerable_to(self):
-                if current_time - self.last_damage_time >= self.damage_cooldown:
-                    self.game.player.take_damage(10, self)
-                    self.last_damage_time = current_time
+        self.think()
+        self.act()
 
     def handle_platform_collision(self):
         """
@@ -189,38 +384,12 @@ class Enemy(pygame.sprite.Sprite, ABC):
         the enemy's vertical velocity to 0. If the enemy has collided with a platform from
         the left or right, it reverses the enemy's patrol direction.
 
+        Game.update_enemies resolves all enemies at once; this resolves a single one
+        with the same kernel.
+
         :return: None
         """
-        self.on_ground = False
-        for platform in self.game.platforms:
-            if isinstance(platform, LadderPlatform):
-                continue
-
-            if self.rect.colliderect(platform.rect):
-                overlap_left = self.rect.right - platform.rect.left
-                overlap_right = platform.rect.right - self.rect.left
-                overlap_top = self.rect.bottom - platform.rect.top
-                overlap_bottom = platform.rect.bottom - self.rect.top
-
-                min_overlap = min(
-                    overlap_left, overlap_right, overlap_top, overlap_bottom
-                )
-
-                if min_overlap == overlap_top and self.vel_y >= 0:
-                    self.rect.bottom = platform.rect.top
-                    self.vel_y = 0
-                    self.on_ground = True
-                elif min_overlap == overlap_bottom and self.vel_y < 0:
-                    self.rect.top = platform.rect.bottom
-                    self.vel_y = 0
-                elif min_overlap == overlap_left and self.vel_x > 0:
-                    self.rect.right = platform.rect.left
-                    self.vel_x = 0
-                    self.patrol_direction *= -1
-                elif min_overlap == overlap_right and self.vel_x < 0:
-                    self.rect.left = platform.rect.right
-                    self.vel_x = 0
-                    self.patrol_direction *= -1
+        self.game.platform_kernel.resolve([self])
 
 
 class GroundEnemy(Enemy):
@@ -234,42 +403,21 @@ class GroundEnemy(Enemy):
         :return: None
         """
         super().__init__(game, x, y)
-        self.image.fill(RED)
         self.max_health = GROUND_ENEMIE_HEALTH
         self.health = self.max_health
 
-    def check_edge(self):
-        """
-        Check if the enemy is at the edge of a platform.
-
-        :return: True if the enemy is at the edge of a platform, False otherwise.
-        """
-        edge_check = self.rect.copy()
-        edge_check.x += self.patrol_direction * self.patrol_speed
-        edge_check.y += 5
-
-        has_ground = False
-        for platform in self.game.platforms:
-            if not isinstance(platform, LadderPlatform) and edge_check.colliderect(
-                platform.rect
-            ):
-                has_ground = True
-                break
-        return not has_ground
-
-    def move(self):
+    def act(self):
         """
         Move the enemy.
 
-        If the player is in sight, the enemy will move towards the player. Otherwise, it will move back and forth between two points on the platform it is on.
+        If the enemy decided to chase the player, it will move towards the player. Otherwise, it will move back and forth between two points on the platform it is on.
 
         When the enemy is on the ground, it will move horizontally. When it is not on the ground, it will not move at all.
 
         :return: None
         """
-        if self.detect_player():
-            dx = self.game.player.rect.centerx - self.rect.centerx
-            target_speed = self.chase_speed * (1 if dx > 0 else -1)
+        if self.chasing:
+            target_speed = self.chase_speed * self.chase_direction
         else:
             if self.check_edge():
                 self.patrol_direction *= -1
@@ -286,6 +434,8 @@ class GroundEnemy(Enemy):
 
 
 class FlyingEnemy(Enemy):
+    colour = (255, 100, 100)
+
     def __init__(self, game, x, y):
         """
         Initialize a FlyingEnemy instance.
@@ -315,7 +465,6 @@ class FlyingEnemy(Enemy):
         """
 
         super().__init__(game, x, y)
-        self.image.fill((255, 100, 100))
         self.gravity = 0
         self.patrol_radius = 100
         self.angle = 0
@@ -330,21 +479,20 @@ class FlyingEnemy(Enemy):
         self.hover_speed = 2
         self.chase_speed = 4
 
-    def move(self):
+    def think(self):
         """
-        Update the flying enemy's position.
+        Choose the flying enemy's velocity.
 
         If the player is detected, the flying enemy will either dive towards the player or hover around it.
         If the player is not detected, the flying enemy will hover around its starting position.
 
         :return: None
         """
-        current_time = pygame.time.get_ticks()
+        current_time = self.game.get_ticks()
 
-        if self.detect_player():
-            dx = self.game.player.rect.centerx - self.rect.centerx
-            dy = self.game.player.rect.centery - self.rect.centery
-            distance = math.sqrt(dx * dx + dy * dy)
+        dx, dy, dist_sq = self.perceive()
+        if self.sees_player(dist_sq):
+            distance = math.sqrt(dist_sq)
 
             if current_time - self.last_dive >= self.dive_cooldown:
                 self.diving = True
@@ -362,11 +510,14 @@ class FlyingEnemy(Enemy):
                 if distance > target_dist:
                     self.vel_x = dx / distance * self.hover_speed
                     self.vel_y = dy / distance * self.hover_speed
+                elif distance > 0:
+                    # Circle around the player: the direction to the player turned by
+                    # 90 degrees.
+                    self.vel_x = -dy / distance * self.hover_speed
+                    self.vel_y = dx / distance * self.hover_speed
                 else:
-                    angle = math.atan2(dy, dx)
-                    circle_angle = angle + math.pi / 2
-                    self.vel_x = math.cos(circle_angle) * self.hover_speed
-                    self.vel_y = math.sin(circle_angle) * self.hover_speed
+                    self.vel_x = 0
+                    self.vel_y = self.hover_speed
         else:
             dx = self.start_pos[0] - self.rect.centerx
             dy = self.start_pos[1] - self.rect.centery
@@ -379,11 +530,20 @@ class FlyingEnemy(Enemy):
                 self.vel_x = 0
                 self.vel_y = 0
 
+    def act(self):
+        """
+        Move the flying enemy by the velocity chosen in think.
+
+        :return: None
+        """
         self.rect.x += self.vel_x
         self.rect.y += self.vel_y
 
 
 class ShooterEnemy(Enemy):
+    colour = BLUE
+    walks_on_ladders = True
+
     def __init__(self, game, x, y):
         """
         Initialize a ShooterEnemy instance.
@@ -397,7 +557,8 @@ class ShooterEnemy(Enemy):
         shoot_range: The range within which the enemy can shoot at the player.
         shoot_cooldown: The cooldown time between shots.
         last_shot: The time of the last shot fired.
-        projectiles: A group of projectiles fired by the enemy.
+        projectile_speed: The speed of the enemy's projectiles.
+        projectile_damage: The damage of the enemy's projectiles.
         patrol_point: The starting point of the enemy's patrol path.
         patrol_range: The range of the patrol path.
         max_health: The maximum health of the shooter enemy.
@@ -407,11 +568,11 @@ class ShooterEnemy(Enemy):
         """
 
         super().__init__(game, x, y)
-        self.image.fill(BLUE)
         self.shoot_range = 400
         self.shoot_cooldown = 1000
         self.last_shot = 0
-        self.projectiles = pygame.sprite.Group()
+        self.projectile_speed = 8
+        self.projectile_damage = 10
         self.patrol_point = self.rect.x
         self.patrol_range = 100
         self.max_health = SHOOTER_ENEMIE_HEALTH
@@ -419,38 +580,27 @@ class ShooterEnemy(Enemy):
         self.can_use_ladders = False
         self.shoot_range = 400
         self.retreat_range = 200
+        self.in_shoot_range = False
 
-    def check_edge(self):
+    def think(self):
         """
-        Check if the enemy is on the edge of a platform.
-
-        :return: True if the enemy is on the edge of a platform, False otherwise.
+        Decide whether to shoot at, chase or ignore the player.
         """
-        edge_check = self.rect.copy()
-        edge_check.x += self.patrol_direction * self.patrol_speed
-        edge_check.y += 5
-
-        has_ground = False
-        for platform in self.game.platforms:
-            if edge_check.colliderect(platform.rect):
-                has_ground = True
-                break
-        return not has_ground
+        super().think()
+        self.in_shoot_range = (
+            self.chasing and self.perceive()[2] <= self.shoot_range**2
+        )
 
-    def move(self):
+    def act(self):
         """
-        Move the enemy based on player position and range conditions.
+        Move the enemy based on its last decision.
         """
-        if self.detect_player():
-            dx = self.game.player.rect.centerx - self.rect.centerx
-            dy = self.game.player.rect.centery - self.rect.centery
-            distance = math.sqrt(dx**2 + dy**2)
-
-            if distance <= self.shoot_range:
+        if self.chasing:
+            if self.in_shoot_range:
                 self.shoot()
                 self.vel_x = 0
             else:
-                target_speed = self.chase_speed * (1 if dx > 0 else -1)
+                target_speed = self.chase_speed * self.chase_direction
                 self.adjust_velocity(target_speed)
         else:
             if self.check_edge():
@@ -474,65 +624,40 @@ class ShooterEnemy(Enemy):
         Shoot at the player if the cooldown has expired.
 
         This method checks if the cooldown since the last shot has expired. If it has,
-        it calculates the angle between the enemy and the player, creates a new
-        EnemyProjectile instance, and adds it to the game's sprite groups.
+        it fires a projectile towards the player through the game's projectile system.
 
         Attributes:
         last_shot (int): The time of the last shot.
         shoot_cooldown (int): The cooldown time between shots.
         """
-        current_time = pygame.time.get_ticks()
+        current_time = self.game.get_ticks()
         if current_time - self.last_shot >= self.shoot_cooldown:
             logger.info(f"ShooterEnemy firing at player. Position: ({self.rect.centerx}, {self.rect.centery})")
             self.last_shot = current_time
             dx = self.game.player.rect.centerx - self.rect.centerx
             dy = self.game.player.rect.centery - self.rect.centery
-            angle = math.atan2(dy, dx)
-
-            projectile = EnemyProjectile(
-                self.game, self.rect.centerx, self.rect.centery, angle
-            )
-            self.projectiles.add(projectile)
-            self.game.all_sprites.add(projectile)
-
-    def update(self):
-        """
-        Update the enemy.
-
-        Calls the parent's update method to update the enemy's position.
-
-        Then, updates each projectile in the enemy's projectiles group and kills any
-        projectiles that are outside of the world.
-
-        Finally, if the player is within the enemy's view range, the enemy will move
-        towards the player. If the player is within the enemy's shoot range, the enemy
-        will shoot at the player.
-
-        :return: None
-        """
-        super().update()
-
-        self.projectiles.update()
-
-        for projectile in self.projectiles:
-            if (
-                projectile.rect.right < 0
-                or projectile.rect.left > self.game.world_width
-                or projectile.rect.bottom < 0
-                or projectile.rect.top > self.game.world_height
-            ):
-                projectile.kill()
-
-        if self.detect_player():
-            distance = math.sqrt(
-                (self.game.player.rect.centerx - self.rect.centerx) ** 2
-                + (self.game.player.rect.centery - self.rect.centery) ** 2
+            distance = math.sqrt(dx * dx + dy * dy)
+            if distance == 0:
+                dx, distance = 1, 1
+
+            # Enemy shots stop at every platform, ladders included, unlike the
+            # player's shots.
+            self.game.projectiles.spawn(
+                self.rect.centerx,
+                self.rect.centery,
+                dx / distance * self.projectile_speed,
+                dy / distance * self.projectile_speed,
+                self.projectile_damage,
+                OWNER_ENEMY,
+                self,
             )
-            if distance <= self.shoot_range:
-                self.shoot()
 
 
 class TankEnemy(Enemy):
+    size = (40, 40)
+    colour = GREEN
+    walks_on_ladders = True
+
     def __init__(self, game, x, y):
         """
         Initialize a TankEnemy instance.
@@ -542,52 +667,23 @@ class TankEnemy(Enemy):
         :param y: The y-coordinate of the enemy's starting position.
         """
         super().__init__(game, x, y)
-        self.image = pygame.Surface((40, 40))
-        self.image.fill(GREEN)
         self.max_health = TANK_ENEMIE_HEALTH
         self.health = self.max_health
         self.patrol_speed = 1
         self.chase_speed = 2
-        self.rect = self.image.get_rect()
-        self.rect.x = x
-        self.rect.y = y
-
-    def check_edge(self):
-        """
-        Check if the enemy is close to an edge.
-
-        This method checks if the enemy is close to an edge by moving a temporary
-        rectangle (edge_check) in the direction of the patrol direction. If the
-        edge_check rectangle is not colliding with any platforms, the method
-        returns True, indicating that the enemy is close to an edge. Otherwise, it
-        returns False.
-
-        :return: True if the enemy is close to an edge, False otherwise.
-        """
-        edge_check = self.rect.copy()
-        edge_check.x += self.patrol_direction * self.patrol_speed
-        edge_check.y += 5
-
-        has_ground = False
-        for platform in self.game.platforms:
-            if edge_check.colliderect(platform.rect):
-                has_ground = True
-                break
-        return not has_ground
 
-    def move(self):
+    def act(self):
         """
         Move the enemy.
 
-        If the player is in range, the enemy will chase the player. Otherwise, the
-        enemy will patrol back and forth within its platform. If the enemy is close
+        If the enemy decided to chase the player, it will move towards them. Otherwise,
+        the enemy will patrol back and forth within its platform. If the enemy is close
         to an edge, it will turn around.
 
         :return: None
         """
-        if self.detect_player():
-            dx = self.game.player.rect.centerx - self.rect.centerx
-            target_speed = self.chase_speed * (1 if dx > 0 else -1)
+        if self.chasing:
+            target_speed = self.chase_speed * self.chase_direction
         else:
             if self.check_edge():
                 self.patrol_direction *= -1
@@ -0,0 +1,589 @@
+import argparse
+import contextlib
+import multiprocessing
+import os
+import random
+import time
+from array import array
+from multiprocessing import shared_memory
+from settings import LEVEL_PATH
+from headless import SCRIPTS, create_game
+from replay import GAMEPLAY_KEYS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+ENEMY_TYPES = ("GroundEnemy", "ShooterEnemy", "FlyingEnemy", "TankEnemy")
+# The observation holds the player and this many of the nearest enemies.
+OBSERVED_ENEMIES = 8
+PLAYER_FEATURES = ("x", "y", "vel_x", "vel_y", "health", "on_ground", "projectiles")
+ENEMY_FEATURES = ("dx", "dy", "health", "type")
+OBSERVATION_SIZE = len(PLAYER_FEATURES) + OBSERVED_ENEMIES * len(ENEMY_FEATURES)
+STAT_NAMES = (
+    "ticks",
+    "damage_taken",
+    "damage_dealt",
+    "kills",
+    "distance",
+    "enemies",
+)
+
+
+def keys_to_mask(keys):
+    """
+    Encode held keys as a bit mask over GAMEPLAY_KEYS.
+
+    :param keys: The pygame key constants held.
+    :type keys: iterable of int
+    :return: The mask.
+    :rtype: int
+    """
+    mask = 0
+    for key in keys:
+        mask |= 1 << GAMEPLAY_KEYS.index(key)
+    return mask
+
+
+def mask_to_keys(mask):
+    """
+    Decode a bit mask made by keys_to_mask.
+
+    :param mask: The mask.
+    :type mask: int
+    :return: A tuple of pygame key constants.
+    """
+    return tuple(key for bit, key in enumerate(GAMEPLAY_KEYS) if mask >> bit & 1)
+
+
+class Environment:
+    def __init__(self, game=None):
+        """
+        Initialize a programmatic environment around a headless game.
+
+        reset loads a level, step feeds the keys held for one tick, runs Game.update
+        and returns an observation, the stats of the tick and whether the episode is
+        over. The episode ends when the player dies or after max_ticks ticks.
+
+        Enemy parameters can be overridden per episode, to tune them with automated
+        play sessions: reset takes a dict mapping an enemy class name, or "Enemy" for
+        all enemies, to the attributes to set on the enemies of the level, e.g.
+        {"FlyingEnemy": {"dive_cooldown": 1500}}.
+
+        Attributes:
+        game: The headless game.
+        max_ticks: The length of an episode, or None for no limit.
+        ticks: The ticks run in the current episode.
+        done: Whether the current episode is over.
+        totals: The stats summed over the current episode.
+        last_health: The enemy healths after the previous tick, by enemy.
+        last_x: The player's x-coordinate after the previous tick.
+
+        :param game: A headless game to use, or None to create one.
+        :type game: Game or None
+        """
+        self.game = game or create_game()
+        self.max_ticks = None
+        self.ticks = 0
+        self.done = True
+        self.totals = dict.fromkeys(STAT_NAMES, 0)
+        self.last_health = {}
+        self.last_x = 0
+
+    def reset(self, level, seed=0, max_ticks=None, enemy_params=None):
+        """
+        Start an episode on a level.
+
+        :param level: The path of the level JSON file.
+        :type level: str
+        :param seed: The seed of the random module.
+        :type seed: int
+        :param max_ticks: The length of the episode, or None for no limit.
+        :type max_ticks: int or None
+        :param enemy_params: The enemy attributes to override, see the class.
+        :type enemy_params: dict or None
+        :return: The first observation.
+        :rtype: list of float
+        """
+        game = self.game
+        game.state_logging = False
+        game.current_level = level
+        game.reset_level()
+        game.input.feed(())
+        random.seed(seed)
+        for enemy in game.enemies:
+            for name, params in (enemy_params or {}).items():
+                if name == "Enemy" or type(enemy).__name__ == name:
+                    for attribute, value in params.items():
+                        setattr(enemy, attribute, value)
+
+        self.max_ticks = max_ticks
+        self.ticks = 0
+        self.done = False
+        self.totals = dict.fromkeys(STAT_NAMES, 0)
+        self.last_health = {enemy: enemy.health for enemy in game.enemies}
+        self.last_x = game.player.rect.x
+        return self.observe()
+
+    def step(self, keys=()):
+        """
+        Run one tick with the given keys held.
+
+        Stepping a finished episode does nothing and returns empty stats.
+
+        :param keys: The pygame key constants held during the tick.
+        :type keys: iterable of int
+        :return: The observation, a dict with the stats of the tick named in
+            STAT_NAMES, and whether the episode is over.
+        :rtype: tuple
+        """
+        if self.done:
+            return self.observe(), dict.fromkeys(STAT_NAMES, 0), True
+
+        game = self.game
+        health = game.player.health
+        game.input.feed(keys)
+        game.update()
+        self.ticks += 1
+
+        damage_dealt = 0
+        kills = 0
+        alive = game.enemies
+        for enemy, last in self.last_health.items():
+            if enemy in alive:
+                damage_dealt += max(0, last - enemy.health)
+            else:
+                damage_dealt += max(0, last)
+                kills += 1
+        self.last_health = {enemy: enemy.health for enemy in alive}
+        x = game.player.rect.x
+        stats = {
+            "ticks": 1,
+            "damage_taken": max(0, health - game.player.health),
+            "damage_dealt": damage_dealt,
+            "kills": kills,
+            "distance": abs(x - self.last_x),
+            "enemies": len(alive),
+        }
+        self.last_x = x
+        for name, value in stats.items():
+            self.totals[name] += value
+        self.totals["enemies"] = len(alive)
+
+        self.done = game.state != "playing" or (
+            self.max_ticks is not None and self.ticks >= self.max_ticks
+        )
+        return self.observe(), stats, self.done
+
+    def observe(self):
+        """
+        Get the observation of the current tick.
+
+        The observation is a flat list of OBSERVATION_SIZE numbers: the player's
+        PLAYER_FEATURES, then the ENEMY_FEATURES of the OBSERVED_ENEMIES nearest
+        enemies, nearest first, with the offset measured from the player and the type
+        as an index into ENEMY_TYPES. Missing enemies are all zeros.
+
+        :return: The observation.
+        :rtype: list of float
+        """
+        game = self.game
+        player = game.player.rect
+        observation = [
+            player.x,
+            player.y,
+            game.player.vel_x,
+            game.player.vel_y,
+            game.player.health,
+            float(game.player.on_ground),
+            len(game.projectiles),
+        ]
+        nearest = sorted(
+            (
+                (enemy.rect.centerx - player.centerx) ** 2
+                + (enemy.rect.centery - player.centery) ** 2,
+                enemy.rect.centerx - player.centerx,
+                enemy.rect.centery - player.centery,
+                enemy.health,
+                ENEMY_TYPES.index(type(enemy).__name__),
+            )
+            for enemy in game.enemies
+        )[:OBSERVED_ENEMIES]
+        for _, dx, dy, health, kind in nearest:
+            observation.extend((dx, dy, health, kind))
+        observation.extend([0.0] * (OBSERVATION_SIZE - len(observation)))
+        return observation
+
+    def run(self, script, ticks):
+        """
+        Run the episode with a scripted input until it is over or for a number of ticks.
+
+        :param script: A function mapping a tick number to the keys held, see
+            headless.SCRIPTS.
+        :type script: callable
+        :param ticks: The most ticks to run.
+        :type ticks: int
+        :return: The stats of the episode so far.
+        :rtype: dict
+        """
+        for _ in range(ticks):
+            if self.done:
+                break
+            self.step(script(self.ticks))
+        return dict(self.totals)
+
+
+class SharedBuffers:
+    def __init__(self, count, name=None):
+        """
+        Initialize the shared memory a vectorized environment and its workers use.
+
+        One block holds, for every environment, its observation and episode stats as
+        doubles, its action as a key mask and its done flag. The parent creates the
+        block, the workers attach to it by name.
+
+        Attributes:
+        memory: The SharedMemory block.
+        observations, stats: Views of the doubles, one row per environment, as NumPy
+            arrays if NumPy is installed, otherwise flat memoryviews.
+        actions: A memoryview of the key masks, one per environment.
+        done: A memoryview of the done flags, one byte per environment.
+        owner: Whether this process created the block and must unlink it.
+
+        :param count: The number of environments.
+        :type count: int
+        :param name: The name of an existing block, or None to create one.
+        :type name: str or None
+        """
+        doubles = count * (OBSERVATION_SIZE + len(STAT_NAMES))
+        size = doubles * 8 + count * 8 + count
+        self.owner = name is None
+        self.memory = shared_memory.SharedMemory(name, create=self.owner, size=size)
+        self.count = count
+        buffer = self.memory.buf
+        observation_end = count * OBSERVATION_SIZE * 8
+        stats_end = doubles * 8
+        actions_end = stats_end + count * 8
+        if np is not None:
+            self.observations = np.ndarray(
+                (count, OBSERVATION_SIZE), np.float64, buffer, 0
+            )
+            self.stats = np.ndarray(
+                (count, len(STAT_NAMES)), np.float64, buffer, observation_end
+            )
+        else:
+            self.observations = buffer[:observation_end].cast("d")
+            self.stats = buffer[observation_end:stats_end].cast("d")
+        self.actions = buffer[stats_end:actions_end].cast("q")
+        self.done = buffer[actions_end : actions_end + count]
+
+    def write(self, index, observation, totals, done):
+        """
+        Store the state of one environment.
+
+        :param index: The index of the environment.
+        :type index: int
+        :param observation: Its observation.
+        :type observation: list of float
+        :param totals: Its episode stats.
+        :type totals: dict
+        :param done: Whether its episode is over.
+        :type done: bool
+        :return: None
+        """
+        stats = [totals[name] for name in STAT_NAMES]
+        if np is not None:
+            self.observations[index] = observation
+            self.stats[index] = stats
+        else:
+            start = index * OBSERVATION_SIZE
+            self.observations[start : start + OBSERVATION_SIZE] = array("d", observation)
+            start = index * len(STAT_NAMES)
+            self.stats[start : start + len(STAT_NAMES)] = array("d", stats)
+        self.done[index] = int(done)
+
+    def observation(self, index):
+        """
+        Get the observation of one environment as a list.
+
+        :param index: The index of the environment.
+        :type index: int
+        :return: The observation.
+        :rtype: list of float
+        """
+        if np is not None:
+            return self.observations[index].tolist()
+        start = index * OBSERVATION_SIZE
+        return self.observations[start : start + OBSERVATION_SIZE].tolist()
+
+    def episode_stats(self, index):
+        """
+        Get the episode stats of one environment.
+
+        :param index: The index of the environment.
+        :type index: int
+        :return: A dict mapping the STAT_NAMES to their values.
+        :rtype: dict
+        """
+        if np is not None:
+            values = self.stats[index].tolist()
+        else:
+            start = index * len(STAT_NAMES)
+            values = self.stats[start : start + len(STAT_NAMES)].tolist()
+        return dict(zip(STAT_NAMES, values))
+
+    def close(self):
+        """
+        Release the views and detach from the block, unlinking it if this process
+        created it.
+
+        :return: None
+        """
+        if np is None:
+            self.observations.release()
+            self.stats.release()
+        self.observations = self.stats = None
+        self.actions.release()
+        self.done.release()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+def worker(connection, buffer_name, count, indices):
+    """
+    Run the environments of one worker process until told to close.
+
+    The worker waits for commands from the parent, runs them on its environments and
+    writes their observations, stats and done flags to the shared buffers, then
+    answers with None, or with a list of results for "run". The actions of "step"
+    are read from the shared key masks.
+
+    :param connection: The worker's end of the pipe to the parent.
+    :param buffer_name: The name of the shared memory block.
+    :type buffer_name: str
+    :param count: The number of environments in the block.
+    :type count: int
+    :param indices: The indices of this worker's environments.
+    :type indices: list of int
+    :return: None
+    """
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        buffers = SharedBuffers(count, buffer_name)
+        environments = {index: Environment() for index in indices}
+        try:
+            while True:
+                command, args = connection.recv()
+                if command == "close":
+                    break
+                results = []
+                for index, environment in environments.items():
+                    if command == "reset":
+                        level, seed, max_ticks, enemy_params = args[index]
+                        observation = environment.reset(
+                            level, seed, max_ticks, enemy_params
+                        )
+                    elif command == "step":
+                        observation, _, _ = environment.step(
+                            mask_to_keys(buffers.actions[index])
+                        )
+                    elif command == "run":
+                        script, ticks = args
+                        results.append(environment.run(SCRIPTS[script], ticks))
+                        observation = environment.observe()
+                    buffers.write(index, observation, environment.totals, environment.done)
+                connection.send(results if command == "run" else None)
+        finally:
+            buffers.close()
+            connection.close()
+
+
+class VectorEnvironment:
+    def __init__(self, count, workers=None):
+        """
+        Initialize count environments spread over worker processes.
+
+        Every worker runs its share of the environments, each with its own headless
+        game. Actions go to the workers and observations, episode stats and done flags
+        come back through one shared memory block, so a step only sends a short
+        command through each worker's pipe. The workers are started with "spawn", so
+        each has a fresh pygame.
+
+        Attributes:
+        count: The number of environments.
+        buffers: The SharedBuffers of the environments.
+        connections: The parent's end of the pipe to every worker.
+        processes: The worker processes.
+        indices: The environment indices of every worker.
+
+        :param count: The number of environments.
+        :type count: int
+        :param workers: The number of worker processes, or None for one per CPU, at
+            most count.
+        :type workers: int or None
+        """
+        self.count = count
+        workers = min(count, workers or os.cpu_count() or 1)
+        self.buffers = SharedBuffers(count)
+        self.indices = [list(range(i, count, workers)) for i in range(workers)]
+        context = multiprocessing.get_context("spawn")
+        self.connections = []
+        self.processes = []
+        for indices in self.indices:
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=worker,
+                args=(child, self.buffers.memory.name, count, indices),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def command(self, command, args=None):
+        """
+        Send a command to every worker and wait for all of them to finish it.
+
+        :param command: "reset", "step" or "run".
+        :type command: str
+        :param args: The arguments of the command.
+        :return: The answers of the workers, in worker order.
+        :rtype: list
+        """
+        for connection in self.connections:
+            connection.send((command, args))
+        return [connection.recv() for connection in self.connections]
+
+    def reset(self, levels, seeds=0, max_ticks=None, enemy_params=None):
+        """
+        Start an episode in every environment.
+
+        :param levels: The level of every environment, or one level for all.
+        :type levels: list of str or str
+        :param seeds: The seed of every environment, or one seed for all.
+        :type seeds: list of int or int
+        :param max_ticks: The length of the episodes, or None for no limit.
+        :type max_ticks: int or None
+        :param enemy_params: The enemy overrides of every environment, or one dict
+            for all, see Environment.
+        :type enemy_params: list of dict or dict or None
+        :return: The observations, one row per environment.
+        """
+        levels = [levels] * self.count if isinstance(levels, str) else levels
+        seeds = [seeds] * self.count if isinstance(seeds, int) else seeds
+        if enemy_params is None or isinstance(enemy_params, dict):
+            enemy_params = [enemy_params] * self.count
+        self.command(
+            "reset",
+            [
+                (level, seed, max_ticks, params)
+                for level, seed, params in zip(levels, seeds, enemy_params)
+            ],
+        )
+        return self.buffers.observations
+
+    def step(self, actions):
+        """
+        Run one tick in every environment.
+
+        :param actions: The keys held in every environment, as iterables of pygame key
+            constants from GAMEPLAY_KEYS.
+        :type actions: list
+        :return: The observations, the episode stats and the done flags, views of the
+            shared buffers that the next command overwrites.
+        :rtype: tuple
+        """
+        for index, keys in enumerate(actions):
+            self.buffers.actions[index] = keys_to_mask(keys)
+        self.command("step")
+        return self.buffers.observations, self.buffers.stats, self.buffers.done
+
+    def run(self, script, ticks):
+        """
+        Run every environment with a scripted input, without a round trip per tick.
+
+        :param script: The name of a script in headless.SCRIPTS.
+        :type script: str
+        :param ticks: The most ticks to run.
+        :type ticks: int
+        :return: The episode stats of every environment.
+        :rtype: list of dict
+        """
+        results = [None] * self.count
+        for indices, answers in zip(self.indices, self.command("run", (script, ticks))):
+            for index, stats in zip(indices, answers):
+                results[index] = stats
+        return results
+
+    def episode_stats(self):
+        """
+        Get the episode stats of every environment.
+
+        :return: A list of dicts mapping the STAT_NAMES to their values.
+        :rtype: list of dict
+        """
+        return [self.buffers.episode_stats(index) for index in range(self.count)]
+
+    def close(self):
+        """
+        Stop the workers and free the shared memory.
+
+        :return: None
+        """
+        for connection in self.connections:
+            try:
+                connection.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for connection in self.connections:
+            connection.close()
+        self.connections = []
+        self.processes = []
+        if self.buffers is not None:
+            self.buffers.close()
+            self.buffers = None
+
+
+def main():
+    """
+    Run a level in parallel environments and print the combined throughput.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Run levels in parallel environments")
+    parser.add_argument("level", nargs="?", default=LEVEL_PATH + "one.json")
+    parser.add_argument("--envs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--script", choices=sorted(SCRIPTS), default="patrol")
+    args = parser.parse_args()
+
+    with VectorEnvironment(args.envs, args.workers) as environments:
+        environments.reset(args.level)
+        start = time.perf_counter()
+        results = environments.run(args.script, args.ticks)
+        elapsed = time.perf_counter() - start
+    ticks = sum(stats["ticks"] for stats in results)
+    print(
+        f"{args.level}: {args.envs} environments in {len(environments.indices)} "
+        f"workers, {ticks} ticks in {elapsed:.2f} s, {ticks / elapsed:.0f} ticks/s"
+    )
+    for index, stats in enumerate(results):
+        print(f"    {index}: " + ", ".join(f"{k} {v:g}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
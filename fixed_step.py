@@ -0,0 +1,155 @@
+from contextlib import contextmanager
+from settings import SIMULATION_RATE, MAX_SIMULATION_STEPS, INTERPOLATION_SNAP_DISTANCE
+
+
+class FixedTimestep:
+    def __init__(self, rate=SIMULATION_RATE, max_steps=MAX_SIMULATION_STEPS):
+        """
+        Initialize an accumulator that turns rendered frames into fixed simulation ticks.
+
+        The time each rendered frame took is added to the accumulator and the
+        simulation advances by as many whole ticks as fit into it, so it runs at the
+        same rate whether the game renders faster or slower than that. The leftover
+        time is kept for the next frame and, as a fraction of a tick, tells the renderer
+        how far it is between the last two ticks.
+
+        If a frame took so long that more than max_steps ticks would be due, e.g. after
+        the window was dragged, the extra ticks are dropped instead of caught up, so the
+        game slows down for a moment rather than freezing while it catches up.
+
+        Attributes:
+        rate: The simulation ticks per second.
+        step: The duration of one tick in seconds.
+        max_steps: The most ticks run for one rendered frame.
+        accumulator: The time in seconds not yet simulated.
+        alpha: How far the rendered frame is between the previous and the current tick,
+            from 0 to 1.
+        ticks: The number of ticks run.
+        dropped_ticks: The number of ticks dropped by the catch-up limit.
+
+        :param rate: The simulation ticks per second.
+        :type rate: int
+        :param max_steps: The most ticks run for one rendered frame.
+        :type max_steps: int
+        """
+        self.rate = rate
+        self.step = 1.0 / rate
+        self.max_steps = max_steps
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the accumulated time, e.g. when the game is resumed from a menu.
+
+        :return: None
+        """
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        self.ticks = 0
+        self.dropped_ticks = 0
+
+    def advance(self, elapsed):
+        """
+        Add the duration of a rendered frame and get the number of ticks to run.
+
+        :param elapsed: The time the frame took in seconds.
+        :type elapsed: float
+        :return: The number of simulation ticks to run for this frame.
+        :rtype: int
+        """
+        self.accumulator += elapsed
+        steps = int(self.accumulator / self.step)
+        if steps > self.max_steps:
+            self.dropped_ticks += steps - self.max_steps
+            self.accumulator -= (steps - self.max_steps) * self.step
+            steps = self.max_steps
+        self.accumulator = max(0.0, self.accumulator - steps * self.step)
+        self.ticks += steps
+        self.alpha = min(1.0, self.accumulator / self.step)
+        return steps
+
+
+class Interpolator:
+    def __init__(self, snap_distance=INTERPOLATION_SNAP_DISTANCE):
+        """
+        Initialize a helper that draws moving entities between two simulation ticks.
+
+        Before every tick the positions of the moving sprites and the camera are
+        captured. While drawing, they are moved to a blend of the captured and the
+        current positions and moved back afterwards, so the existing drawing code,
+        including health bars and the player's gun, draws the blended positions
+        without knowing about it. Sprites that moved further than snap_distance in one
+        tick, e.g. through a teleporter, are drawn where they are.
+
+        Attributes:
+        snap_distance: The distance in pixels above which a sprite is not blended.
+        previous: A dict mapping each captured sprite to its top left before the tick.
+        previous_camera: The camera offset before the tick, or None.
+
+        :param snap_distance: The distance above which a sprite is not blended.
+        :type snap_distance: int
+        """
+        self.snap_distance = snap_distance
+        self.clear()
+
+    def clear(self):
+        """
+        Forget the captured positions, e.g. when a level is loaded.
+
+        :return: None
+        """
+        self.previous = {}
+        self.previous_camera = None
+
+    def capture(self, sprites, camera):
+        """
+        Remember the positions of the moving sprites and the camera before a tick.
+
+        :param sprites: The sprites that can move.
+        :type sprites: iterable of pygame.sprite.Sprite
+        :param camera: The game camera.
+        :type camera: Camera
+        :return: None
+        """
+        self.previous = {sprite: sprite.rect.topleft for sprite in sprites}
+        self.previous_camera = camera.camera.topleft
+
+    @contextmanager
+    def applied(self, camera, alpha):
+        """
+        Move the captured sprites and the camera to their blended positions for the
+        duration of the with block.
+
+        :param camera: The game camera.
+        :type camera: Camera
+        :param alpha: How far to blend from the previous to the current position.
+        :type alpha: float
+        """
+        if alpha >= 1.0 or self.previous_camera is None:
+            yield
+            return
+
+        snap = self.snap_distance
+        moved = []
+        for sprite, (px, py) in self.previous.items():
+            rect = sprite.rect
+            x, y = rect.topleft
+            if (x, y) == (px, py) or abs(x - px) > snap or abs(y - py) > snap:
+                continue
+            moved.append((rect, x, y))
+            rect.topleft = (round(px + (x - px) * alpha), round(py + (y - py) * alpha))
+
+        view = camera.camera
+        camera_x, camera_y = view.topleft
+        px, py = self.previous_camera
+        if abs(camera_x - px) <= snap and abs(camera_y - py) <= snap:
+            view.topleft = (
+                round(px + (camera_x - px) * alpha),
+                round(py + (camera_y - py) * alpha),
+            )
+        try:
+            yield
+        finally:
+            view.topleft = (camera_x, camera_y)
+            for rect, x, y in moved:
+                rect.topleft = (x, y)
@@ -9,25 +9,46 @@ from platforms import (
     TeleporterPlatform,
 )
 from camera import Camera
+from platform_registry import PlatformRegistry
+from teleporters import TeleporterNetwork
+from collision_kernel import PlatformKernel
+from projectile import ProjectileSystem, OWNER_PLAYER, OWNER_ENEMY
+from ai_scheduler import AIScheduler
+from perception import PerceptionCache
+from walkable_spans import WalkableSpanMap
+from navigation import NavigationGraph
+from line_of_sight import LineOfSight
+from spatial_hash import SpatialHash
+from fixed_step import FixedTimestep, Interpolator
+from input_manager import InputManager
+from replay import Recording
+from headless import game_checksum
 from gun import Gun
-from enemy import GroundEnemy, FlyingEnemy, ShooterEnemy, TankEnemy, Enemy
+from enemy import GroundEnemy, FlyingEnemy, ShooterEnemy, TankEnemy
 from menus import MainMenu, PauseMenu, LevelSelectMenu, SettingsMenu, GameOverMenu
 from sound_manager import SoundManager
+import argparse
 import json
 import os
-import math
 from debug_logger import logger
+from image_cache import image_count
 import time
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False):
         """
         Initialize the game.
 
         Initialize pygame, set up display, clock, and game state. Load the first level and
         create the main menu, pause menu, settings menu, level select menu, and game over menu.
 
+        A headless game, see headless.py, plays no music and gets its input fed to
+        the input manager instead of polling it. Setting state_logging to False skips the
+        per-update logging of the game state.
+
+        :param headless: Whether the game runs without a player, e.g. for benchmarks.
+        :type headless: bool
         :return: None
         """
         logger.info("Initializing game...")
@@ -35,12 +56,29 @@ class Game:
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         pygame.display.set_caption("2D Platformer")
         self.clock = pygame.time.Clock()
+        self.timestep = FixedTimestep()
+        self.simulation_ticks = 0
+        self.interpolator = Interpolator()
         self.running = True
+        self.headless = headless
+        self.input = InputManager()
+        self.record_path = None
+        self.recording = None
+        self.state_logging = True
         self.all_sprites = pygame.sprite.Group()
         self.platforms = pygame.sprite.Group()
         self.enemies = pygame.sprite.Group()
-        self.enemy_projectiles = pygame.sprite.Group()
+        self.projectiles = ProjectileSystem(self)
+        self.ai_scheduler = AIScheduler()
+        self.perception = PerceptionCache()
         self.gun = None
+        self.platform_registry = PlatformRegistry()
+        self.teleporter_network = TeleporterNetwork()
+        self.platform_kernel = PlatformKernel(self.platform_registry)
+        self.walkable_spans = WalkableSpanMap(self.platform_registry)
+        self.navigation = None
+        self.line_of_sight = LineOfSight(self.platform_registry)
+        self.draw_index = SpatialHash()
         self.current_level = LEVEL_PATH + "ene.json"
         self.load_level(self.current_level)
         self.available_levels = self.get_available_levels()
@@ -55,10 +93,15 @@ class Game:
         self.level_select = LevelSelectMenu(self)
         self.game_over_menu = GameOverMenu(self)
 
-        self.sound_manager.load_music("menu")
-        self.sound_manager.play_music("menu", -1)
+        if not headless:
+            self.sound_manager.load_music("menu")
+            self.sound_manager.play_music("menu", -1)
         logger.success("Game initialized successfully")
         self.frame_count = 0
+        self.update_count = 0
+        self.awake_enemies = 0
+        self.drawn_sprites = 0
+        self.culled_sprites = 0
         self.last_fps_check = time.time()
         self.fps_history = []
 
@@ -80,9 +123,15 @@ class Game:
 
         This will clear all sprites, load the current level again, and set the game state to "playing".
         This is used when the player dies, and is also used when the user selects a new level from the level select menu.
+        The simulation time and the update count start again at 0 and the camera goes
+        back to where it starts, so a run of a level does not depend on what was played
+        before it.
 
         :return: None
         """
+        self.simulation_ticks = 0
+        self.update_count = 0
+        self.camera.reset()
         self.all_sprites.empty()
         self.platforms.empty()
         if hasattr(self, "enemies"):
@@ -132,7 +181,9 @@ class Game:
             level_data = json.load(f)
 
         self.enemies.empty()
-        self.enemy_projectiles.empty()
+        self.projectiles.clear()
+        self.interpolator.clear()
+        self.ai_scheduler.reset()
 
         if "enemy_spawns" in level_data:
             enemy_types_dict = {
@@ -160,6 +211,7 @@ class Game:
         self.player = Player(self, player_spawn)
         self.all_sprites.add(self.player)
 
+        self.gun = None
         if level_data.get("gun_spawn"):
             x, y = level_data["gun_spawn"]
             self.gun = Gun(x, y)
@@ -186,6 +238,16 @@ class Game:
                     platform = platform_class(x, y, width, height)
                 self.all_sprites.add(platform)
                 self.platforms.add(platform)
+
+        self.platform_registry = PlatformRegistry(self.platforms)
+        self.teleporter_network = TeleporterNetwork(self.platform_registry.teleporters)
+        self.platform_kernel = PlatformKernel(self.platform_registry)
+        self.walkable_spans = WalkableSpanMap(self.platform_registry)
+        self.navigation = NavigationGraph.for_level(level_data, self.platform_registry)
+        self.line_of_sight = LineOfSight(self.platform_registry)
+        self.draw_index = SpatialHash()
+        for platform in self.platforms:
+            self.draw_index.insert(platform)
         logger.log_performance("Level load", start_time)
         logger.success(f"Level loaded successfully: {level_file}")
 
@@ -200,16 +262,35 @@ class Game:
         background music based on the game state.
 
         The game loop runs continuously until the 'running' attribute is
-        set to False. It uses a clock to manage the frame rate and updates
-        the display at the end of each loop iteration.
+        set to False. It uses a clock to cap the rendered frame rate at RENDER_FPS and
+        updates the display at the end of each loop iteration.
+
+        While playing, the simulation is decoupled from rendering: every rendered
+        frame runs as many fixed ticks of SIMULATION_RATE per second as its duration
+        calls for, at most MAX_SIMULATION_STEPS, and is then drawn with the moving
+        sprites interpolated between the last two ticks.
+
+        With record_to, the input of every tick of the first run through a level is
+        recorded, from when it is first played until the player dies, another level
+        is loaded or the game is closed.
         """
 
         last_state = None
         while self.running:
-            self.clock.tick(FPS)
+            elapsed = self.clock.tick(RENDER_FPS) / 1000
+            self.input.poll()
+
+            if self.recording is not None and (
+                self.state == "game_over" or self.current_level != self.recording.level
+            ):
+                self.stop_recording()
 
             if self.state != last_state:
                 if self.state == "playing":
+                    if self.record_path and self.recording is None:
+                        self.recording = Recording.start(self)
+                    self.timestep.reset()
+                    self.interpolator.clear()
                     self.sound_manager.play_music("game", -1)
                 elif self.state in [
                     "main_menu",
@@ -235,127 +316,241 @@ class Game:
                 self.pause_menu.draw()
             elif self.state == "playing":
                 self.events()
-                self.update()
-                self.draw()
+                for _ in range(self.timestep.advance(elapsed)):
+                    self.interpolator.capture([self.player, *self.enemies], self.camera)
+                    if self.recording is not None:
+                        self.recording.record_snapshot(self.input.snapshot)
+                    self.update()
+                    if self.state != "playing":
+                        break
+                with self.interpolator.applied(self.camera, self.timestep.alpha):
+                    self.draw()
             elif self.state == "game_over":
                 self.game_over_menu.draw(self.screen)
                 self.game_over_menu.handle_input()
 
             pygame.display.flip()
 
+        self.stop_recording()
+
+    def record_to(self, path):
+        """
+        Record the input of the next run through a level to a file, see replay.py.
+
+        :param path: The file to write the recording to.
+        :type path: str
+        :return: None
+        """
+        self.record_path = path
+
+    def stop_recording(self):
+        """
+        Finish the current recording and write it to its file.
+
+        The checksum of the game state is stored with it, so a replay can check that
+        it ended in the same state.
+
+        :return: None
+        """
+        if self.recording is None:
+            return
+        self.recording.checksum = game_checksum(self)
+        self.recording.save(self.record_path)
+        logger.success(
+            f"Recorded {len(self.recording)} ticks of {self.recording.level} "
+            f"to {self.record_path}"
+        )
+        self.recording = None
+        self.record_path = None
+
     def update(self):
         """
         Update the game state.
 
-        This method is responsible for updating the game state every frame. It updates all sprites, moves the camera, handles player-platform collisions, player-enemy collisions, projectile-platform collisions, projectile-enemy collisions and updates the player's projectiles.
+        This method is responsible for updating the game state every frame. It updates all sprites, moves the camera, handles player-platform collisions, player-enemy collisions, projectile-platform collisions and updates every projectile. Contacts between the player and enemies are a direct rect test against every enemy, which is cheaper than a broad phase for one entity, hits by projectiles come from the projectile system, and each player projectile deals its damage at most once.
 
         The method also checks for player death and kills the player if necessary.
+        Every update advances the simulation time returned by get_ticks by one tick.
 
         :return: None
         """
         if self.debug_mode:
             start_time = time.time()
             logger.start_profiling()
+        self.simulation_ticks += 1
+        self.projectiles.update()
+        self.update_enemies()
         self.all_sprites.update()
         self.camera.update(self.player)
 
-        for platform in self.platforms:
-            if isinstance(
-                platform, TeleporterPlatform
-            ) and self.player.rect.colliderect(platform.rect):
-                self.player.handle_teleporter(platform, self.platforms)
-                return
-
-        self.enemy_projectiles.update()
-
-        for enemy in self.enemies:
-            if enemy.rect.colliderect(self.player.rect):
-                current_time = pygame.time.get_ticks()
-                if (
-                    not self.player.is_invulnerable_to(enemy)
-                    and current_time - enemy.last_damage_time >= enemy.damage_cooldown
-                ):
-                    enemy.last_damage_time = current_time
-                    self.player.take_damage(10, enemy)
-                    if self.player.health <= 0:
-                        self.handle_player_death()
-                        return
-
-        for projectile in self.enemy_projectiles:
-            if projectile.rect.colliderect(self.player.rect):
-                if not self.player.is_invulnerable_to(projectile):
-                    self.player.take_damage(projectile.damage, projectile)
-                    projectile.kill()
-                    if self.player.health <= 0:
-                        self.handle_player_death()
-                        return
-
-        hits = pygame.sprite.spritecollide(self.player, self.platforms, False)
+        if self.teleporter_network.colliding(self.player.rect):
+            self.player.handle_teleporter()
+            return
+
+        player_rect = self.player.rect
+        contacts = [enemy for enemy in self.enemies if player_rect.colliderect(enemy.rect)]
+        for enemy in contacts:
+            current_time = self.get_ticks()
+            if (
+                not self.player.is_invulnerable_to(enemy)
+                and current_time - enemy.last_damage_time >= enemy.damage_cooldown
+            ):
+                enemy.last_damage_time = current_time
+                self.player.take_damage(10, enemy)
+                if self.player.health <= 0:
+                    self.handle_player_death()
+                    return
+
+        for index in self.projectiles.collide_rect(self.player.rect, OWNER_ENEMY):
+            source = self.projectiles.sources[index]
+            if not self.player.is_invulnerable_to(source):
+                self.player.take_damage(int(self.projectiles.damage[index]), source)
+                self.projectiles.kill(index)
+                if self.player.health <= 0:
+                    self.handle_player_death()
+                    return
+
+        hits = self.platform_registry.collide(self.player.rect)
         if self.player.platformtype != 2:
             self.player.ladder_y = self.player.rect.bottom
             self.player.platformtype = 0
 
         if hits:
-            self.player.handle_platform_collision(hits)
+            self.player.handle_platform_collision()
             if self.gun and self.player.check_gun_collision(self.gun):
                 self.gun.kill()
                 self.gun = None
 
-        for projectile in self.player.projectiles:
-            if projectile.check_collisions(self.platforms):
-                continue
+        for index, enemy in self.projectiles.closest_hits(self.enemies, OWNER_PLAYER):
+            enemy.take_damage(int(self.projectiles.damage[index]))
+            self.projectiles.kill(index)
+
+        if self.state_logging:
+            self.log_game_state()
+        if self.debug_mode:
+            logger.stop_profiling()
+            logger.log_performance("Game update", start_time)
 
-            hit_enemy = None
-            min_distance = float("inf")
+    def update_enemies(self):
+        """
+        Update every enemy for the current frame.
 
-            for enemy in self.enemies:
-                if projectile.rect.colliderect(enemy.rect):
-                    dx = enemy.rect.centerx - projectile.rect.centerx
-                    dy = enemy.rect.centery - projectile.rect.centery
-                    distance = math.sqrt(dx * dx + dy * dy)
+        All enemies first update their timers and gravity, then their platform
+        collisions are resolved together in one batched call of the platform kernel,
+        then the AI scheduler lets the enemies whose turn it is think, with their
+        perception computed in one batch beforehand, and finally every enemy acts and
+        moves. Enemies climbing a ladder are left out of the collision pass. Chasing
+        enemies find their paths towards the player's node of the navigation graph.
+        Enemies are updated before the player, like they were when the sprite groups
+        updated them. Only the enemies returned by active_enemies are updated.
 
-                    if distance < min_distance:
-                        min_distance = distance
-                        hit_enemy = enemy
+        :return: None
+        """
+        if self.debug_mode:
+            start_time = time.time()
 
-            if hit_enemy:
-                hit_enemy.take_damage(projectile.damage)
-                projectile.kill()
+        enemies = self.active_enemies()
+        self.awake_enemies = len(enemies)
+        self.update_count += 1
+        self.line_of_sight.tick()
+        for enemy in enemies:
+            enemy.begin_update()
+        self.platform_kernel.resolve([enemy for enemy in enemies if not enemy.climbing])
+        if self.navigation is not None:
+            self.navigation.set_goal(self.navigation.node_at(self.player.rect))
+        self.ai_scheduler.think(
+            enemies, lambda due: self.perception.update(due, self.player.rect)
+        )
+        self.perception.clear()
+        for enemy in enemies:
+            enemy.end_update()
 
-        self.player.projectiles.update()
-        self.log_game_state()
         if self.debug_mode:
-            logger.stop_profiling()
-            logger.log_performance("Game update", start_time)
+            logger.log_performance(f"Enemy update ({len(enemies)} enemies)", start_time)
+
+    def active_enemies(self):
+        """
+        Get the enemies that are updated this frame.
+
+        Enemies inside ACTIVATION_MARGIN around the camera's viewport are awake and
+        update every frame. The others sleep: they are frozen if SLEEP_TICK_INTERVAL is
+        0, otherwise each of them updates once every SLEEP_TICK_INTERVAL frames, spread
+        over the frames by its position in the enemies group. Both only depend on the
+        camera and the number of updates so far, so enemies wake up the same way every
+        time the viewport comes near.
+
+        :return: A list of enemies in update order.
+        """
+        area = self.camera.activation_rect(ACTIVATION_MARGIN)
+        interval = SLEEP_TICK_INTERVAL
+        active = []
+        for i, enemy in enumerate(self.enemies):
+            if area.colliderect(enemy.rect):
+                active.append(enemy)
+            elif interval and (self.update_count + i) % interval == 0:
+                active.append(enemy)
+        return active
+
+    def get_ticks(self):
+        """
+        Get the simulation time in milliseconds.
+
+        The time advances by one tick of SIMULATION_RATE with every update and does
+        not depend on the wall clock, so timers and cooldowns behave the same however
+        fast the game is run, e.g. when a recorded run is replayed headless.
+
+        :return: The milliseconds simulated so far.
+        :rtype: int
+        """
+        return self.simulation_ticks * 1000 // SIMULATION_RATE
+
+    def get_pressed(self):
+        """
+        Get the state of the keyboard for the current tick.
+
+        Everything in the game that reads held keys goes through this, so it reads the
+        input manager's snapshot of the frame and scripted input can stand in for the
+        keyboard.
+
+        :return: The input snapshot, indexed by pygame key constants like
+            pygame.key.get_pressed.
+        :rtype: InputSnapshot
+        """
+        return self.input.snapshot
 
     def events(self):
         """
         Handle game events.
 
-        This method checks for pygame events such as QUIT or KEYDOWN. If the event
-        type is QUIT, the game's running status is set to False. If the event type is
-        KEYDOWN, it checks if the key is ESCAPE and if so, sets the game's state to
-        "pause". If the key is 'c', it toggles the debug mode.
+        This method checks the input snapshot of the frame. If the window was asked
+        to close, the game's running status is set to False. If ESCAPE was pressed, it
+        sets the game's state to "pause". If 'c' was pressed, it toggles the debug mode.
 
         :return: None
         """
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    self.state = "pause"
-                elif event.key == pygame.K_c:
-                    self.debug_mode = not self.debug_mode
+        snapshot = self.input.snapshot
+        if snapshot.quit:
+            self.running = False
+        for key in snapshot.pressed:
+            if key == pygame.K_ESCAPE:
+                self.state = "pause"
+            elif key == pygame.K_c:
+                self.debug_mode = not self.debug_mode
 
     def draw(self):
         """
         Draw the game state to the screen.
 
         This method is responsible for drawing the game state to the screen every
-        frame. It draws all sprites, the player, the player's projectiles and the
-        enemy projectiles. It also draws the debug information if the debug mode
-        is enabled.
+        frame. It draws all sprites, including the player's projectiles and the
+        enemy projectiles, and then the player. It also draws the debug information
+        if the debug mode is enabled.
+
+        Only sprites overlapping the viewport grown by DRAW_CULL_MARGIN are drawn, in
+        the order of all_sprites: the enemies and the gun are tested directly and the
+        platforms are looked up in draw_index, so the cost follows what is on screen
+        and not the size of the level. The numbers of drawn and culled sprites are kept
+        for the debug overlay.
 
         :return: None
         """
@@ -363,16 +558,29 @@ class Game:
             start_time = time.time()
         self.screen.fill(SKY_BLUE)
 
-        for sprite in self.all_sprites:
-            if sprite != self.player:
-                self.screen.blit(sprite.image, self.camera.apply(sprite))
-                if isinstance(sprite, Enemy):
-                    sprite.draw_health_bar(self.screen, self.camera)
-
-        for projectile in self.enemy_projectiles:
-            self.screen.blit(projectile.image, self.camera.apply(projectile))
+        view = self.camera.viewport().inflate(DRAW_CULL_MARGIN * 2, DRAW_CULL_MARGIN * 2)
+        offset_x, offset_y = self.camera.camera.topleft
+        visible = [enemy for enemy in self.enemies if view.colliderect(enemy.rect)]
+        enemy_count = len(visible)
+        if self.gun is not None and view.colliderect(self.gun.rect):
+            visible.append(self.gun)
+        visible.extend(self.draw_index.collide(view))
+        self.drawn_sprites = len(visible)
+        self.culled_sprites = (
+            len(self.enemies)
+            + (self.gun is not None)
+            + len(self.draw_index)
+            - self.drawn_sprites
+        )
+
+        blit = self.screen.blit
+        for i, sprite in enumerate(visible):
+            rect = sprite.rect
+            blit(sprite.image, (rect.x + offset_x, rect.y + offset_y))
+            if i < enemy_count:
+                sprite.draw_health_bar(self.screen, self.camera)
+        self.projectiles.draw(self.screen, self.camera, self.timestep.alpha)
 
-        player_pos = self.camera.apply(self.player)
         self.player.draw(self.screen)
         self.player.draw_health_bar(self.screen)
 
@@ -417,11 +625,16 @@ class Game:
             f"Player Current Ladder: {self.player.current_ladder}",
             f"Player On Ladder Top: {self.player.on_ladder_top}",
             f"Facing Right: {self.player.facing_right}",
-            f"Player Projectiles: {len(self.player.projectiles)}",
+            f"Player Projectiles: {self.projectiles.count_owned(OWNER_PLAYER)}",
             f"Gun: {self.gun is not None}",
             f"Gun X: {self.gun.rect.x if self.gun else None}",
             f"Gun Y: {self.gun.rect.y if self.gun else None}",
             f"Enemies: {len(self.enemies)}",
+            f"Awake Enemies: {self.awake_enemies}",
+            f"Drawn Sprites: {self.drawn_sprites} (culled {self.culled_sprites})",
+            f"AI Thinks: {self.ai_scheduler.last_thinks} (deferred {self.ai_scheduler.deferred})",
+            f"Sight Rays: {self.line_of_sight.rays} (cached {self.line_of_sight.cache_hits})",
+            f"Cached Images: {image_count()}",
             f"State: {self.state}",
             f"Current Level: {self.current_level}",
             f"Available Levels: {self.available_levels}",
@@ -439,7 +652,7 @@ class Game:
         logger.track_entity("Sprites", len(self.all_sprites))
         logger.track_entity("Platforms", len(self.platforms))
         logger.track_entity("Enemies", len(self.enemies))
-        logger.track_entity("Projectiles", len(self.enemy_projectiles))
+        logger.track_entity("Projectiles", len(self.projectiles))
         
         current_time = time.time()
         self.frame_count += 1
@@ -467,6 +680,14 @@ class Game:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="2D Platformer")
+    parser.add_argument(
+        "--record", metavar="FILE", help="record the first run through a level"
+    )
+    args = parser.parse_args()
+
     game = Game()
+    if args.record:
+        game.record_to(args.record)
     game.run()
     game.quit()
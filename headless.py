@@ -0,0 +1,264 @@
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+import pygame
+from settings import LEVEL_PATH
+
+
+def idle_script(tick):
+    """
+    Hold no keys.
+
+    :param tick: The tick number.
+    :return: An empty tuple.
+    """
+    return ()
+
+
+def patrol_script(tick):
+    """
+    Run right and left, jump, climb and shoot in a fixed pattern.
+
+    Every 90 ticks the player switches between running right, running left and
+    climbing; it jumps every 45 ticks and fires for 3 of every 20 ticks.
+
+    :param tick: The tick number.
+    :return: A set of pygame key constants.
+    """
+    keys = set()
+    phase = (tick // 90) % 6
+    if phase in (0, 1, 4):
+        keys.add(pygame.K_RIGHT)
+    elif phase in (2, 3):
+        keys.add(pygame.K_LEFT)
+    else:
+        keys.add(pygame.K_UP)
+    if tick % 45 == 0:
+        keys.add(pygame.K_SPACE)
+    if tick % 20 < 3:
+        keys.add(pygame.K_f)
+    return keys
+
+
+SCRIPTS = {
+    "idle": idle_script,
+    "patrol": patrol_script,
+}
+
+
+def use_dummy_drivers():
+    """
+    Make SDL use its dummy video and audio drivers.
+
+    Must be called before pygame.init, which Game does, so no window is opened and no
+    sound device is needed.
+
+    :return: None
+    """
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+
+def create_game():
+    """
+    Create a headless game with the dummy drivers.
+
+    :return: The game.
+    :rtype: Game
+    """
+    use_dummy_drivers()
+    from game import Game
+
+    return Game(headless=True)
+
+
+def percentile(sorted_values, fraction):
+    """
+    Get a percentile of a sorted list by the nearest rank.
+
+    :param sorted_values: The values, sorted ascending.
+    :type sorted_values: list
+    :param fraction: The percentile as a fraction, e.g. 0.95.
+    :type fraction: float
+    :return: The value, or 0.0 for an empty list.
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def timing_stats(times):
+    """
+    Summarize a list of durations in seconds.
+
+    :param times: The durations.
+    :type times: list of float
+    :return: A dict with the mean, median, 95th and 99th percentile and maximum in
+        milliseconds.
+    :rtype: dict
+    """
+    ordered = sorted(times)
+    return {
+        "mean_ms": sum(ordered) * 1000 / max(1, len(ordered)),
+        "p50_ms": percentile(ordered, 0.5) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+        "max_ms": (ordered[-1] if ordered else 0.0) * 1000,
+    }
+
+
+def game_checksum(game):
+    """
+    Get a checksum of the state of the player, the enemies and the projectiles.
+
+    Two runs that end with the same checksum ended in the same state, which is how
+    replays are checked for determinism.
+
+    :param game: The game.
+    :type game: Game
+    :return: A hex digest.
+    :rtype: str
+    """
+    state = (
+        game.simulation_ticks,
+        tuple(game.player.rect),
+        game.player.health,
+        sorted((tuple(enemy.rect), enemy.health) for enemy in game.enemies),
+        len(game.projectiles),
+    )
+    return hashlib.md5(repr(state).encode()).hexdigest()
+
+
+def run_headless(
+    level,
+    ticks=600,
+    script=None,
+    render=False,
+    game=None,
+    state_logging=False,
+    setup=None,
+):
+    """
+    Load a level and run it for a number of ticks as fast as possible.
+
+    Every tick the keys the script holds are fed to the game's input manager and
+    Game.update runs; with render the frame is also drawn to the dummy display's
+    surface, which is never shown. When the player dies the run stops early. The
+    game's timers run on the simulation time, so a run does not depend on how fast it
+    is executed.
+
+    The per-update logging of the game state writes several log files every tick and
+    would dominate the timings, so it is off unless state_logging is set.
+
+    :param level: The path of the level JSON file.
+    :type level: str
+    :param ticks: The number of ticks to run.
+    :type ticks: int
+    :param script: A function mapping a tick number to the keys held, see SCRIPTS.
+    :type script: callable or None
+    :param render: Whether to draw every tick.
+    :type render: bool
+    :param game: A headless game to reuse, or None to create one.
+    :type game: Game or None
+    :param state_logging: Whether to log the game state every tick.
+    :type state_logging: bool
+    :param setup: A function called with the game once the level is loaded, e.g.
+        to restore the state a recorded run started in.
+    :type setup: callable or None
+    :return: A dict with the level, the ticks run, the total time, the ticks per
+        second, the update and draw timing stats, the final state, the remaining
+        enemies, the player's health and the checksum of the final state.
+    :rtype: dict
+    """
+    if game is None:
+        game = create_game()
+    if script is None:
+        script = idle_script
+    game.state_logging = state_logging
+    game.current_level = level
+    game.reset_level()
+    game.input.feed(())
+    if setup is not None:
+        setup(game)
+
+    update_times = []
+    draw_times = []
+    start = time.perf_counter()
+    for tick in range(ticks):
+        game.input.feed(script(tick))
+        tick_start = time.perf_counter()
+        game.update()
+        update_times.append(time.perf_counter() - tick_start)
+        if render:
+            draw_start = time.perf_counter()
+            game.draw()
+            draw_times.append(time.perf_counter() - draw_start)
+        if game.state != "playing":
+            break
+    elapsed = time.perf_counter() - start
+
+    return {
+        "level": level,
+        "ticks": len(update_times),
+        "seconds": elapsed,
+        "ticks_per_second": len(update_times) / elapsed if elapsed else 0.0,
+        "update": timing_stats(update_times),
+        "draw": timing_stats(draw_times) if render else None,
+        "state": game.state,
+        "enemies": len(game.enemies),
+        "player_health": game.player.health,
+        "checksum": game_checksum(game),
+    }
+
+
+def main():
+    """
+    Run levels headless and print their throughput.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Run levels without a display")
+    parser.add_argument("levels", nargs="*", default=[LEVEL_PATH + "one.json"])
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--script", choices=sorted(SCRIPTS), default="patrol")
+    parser.add_argument("--render", action="store_true")
+    parser.add_argument("--log-state", action="store_true", help="log the game state")
+    parser.add_argument("--json", action="store_true", help="print the stats as JSON")
+    args = parser.parse_args()
+
+    # The game's log messages go to stdout, keep them out of the JSON.
+    output = io.StringIO() if args.json else sys.stdout
+    with contextlib.redirect_stdout(output):
+        game = create_game()
+        results = [
+            run_headless(
+                level,
+                args.ticks,
+                SCRIPTS[args.script],
+                args.render,
+                game,
+                args.log_state,
+            )
+            for level in args.levels
+        ]
+    if args.json:
+        print(json.dumps(results, indent=4))
+        return
+    for result in results:
+        print(
+            f"{result['level']}: {result['ticks']} ticks, "
+            f"{result['ticks_per_second']:.0f} ticks/s, "
+            f"update p50 {result['update']['p50_ms']:.2f} ms "
+            f"p95 {result['update']['p95_ms']:.2f} ms, "
+            f"state {result['state']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import pygame
+
+
+_images = {}
+
+
+def get_image(kind, size, colour, alpha=None):
+    """
+    Get the shared image for a solid coloured entity.
+
+    Entities that look the same share one surface instead of each filling their own.
+    The surface is converted to the display format once a display exists, so blitting it
+    needs no conversion. Shared images must not be drawn on or refilled; an entity that
+    needs its own look should ask for it with a different kind.
+
+    :param kind: A name for what the image is used for, e.g. the class name.
+    :type kind: str
+    :param size: The (width, height) of the image.
+    :type size: tuple
+    :param colour: The fill colour.
+    :type colour: tuple
+    :param alpha: The surface alpha, or None for an opaque image.
+    :type alpha: int or None
+    :return: The shared surface.
+    :rtype: pygame.Surface
+    """
+    key = (kind, tuple(size), tuple(colour), alpha)
+    image = _images.get(key)
+    if image is None:
+        image = pygame.Surface(size)
+        if pygame.display.get_surface() is not None:
+            image = image.convert()
+        image.fill(colour)
+        if alpha is not None:
+            image.set_alpha(alpha)
+        _images[key] = image
+    return image
+
+
+def image_count():
+    """
+    Get the number of distinct images in the cache.
+
+    :return: The number of cached surfaces.
+    :rtype: int
+    """
+    return len(_images)
+
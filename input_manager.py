@@ -0,0 +1,166 @@
+import pygame
+
+
+class KeySet:
+    __slots__ = ("keys",)
+
+    def __init__(self, keys=()):
+        """
+        Initialize a set of held keys that can be indexed like pygame.key.get_pressed.
+
+        :param keys: The pygame key constants that are held.
+        :type keys: iterable of int
+        """
+        self.keys = frozenset(keys)
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+    def __iter__(self):
+        return iter(self.keys)
+
+
+class InputSnapshot:
+    __slots__ = (
+        "frame",
+        "held",
+        "pressed",
+        "released",
+        "events",
+        "quit",
+        "mouse_pos",
+        "mouse_buttons",
+    )
+
+    def __init__(
+        self,
+        frame=0,
+        held=KeySet(),
+        pressed=(),
+        released=(),
+        events=(),
+        quit=False,
+        mouse_pos=(0, 0),
+        mouse_buttons=(False, False, False),
+    ):
+        """
+        Initialize the input of one frame. Snapshots are not changed after creation.
+
+        Indexing a snapshot with a pygame key constant tells whether the key is held,
+        so it can be used wherever the result of pygame.key.get_pressed was.
+
+        Attributes:
+        frame: The number of the frame the snapshot was taken in.
+        held: The held keys, indexed by pygame key constants.
+        pressed: The keys that went down this frame, in order.
+        released: The keys that went up this frame, in order.
+        events: The pygame events of this frame, for the menus.
+        quit: Whether the window was asked to close.
+        mouse_pos: The mouse position in screen coordinates.
+        mouse_buttons: Whether the left, middle and right buttons are held.
+        """
+        values = {
+            "frame": frame,
+            "held": held,
+            "pressed": tuple(pressed),
+            "released": tuple(released),
+            "events": tuple(events),
+            "quit": quit,
+            "mouse_pos": tuple(mouse_pos),
+            "mouse_buttons": tuple(mouse_buttons),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __getitem__(self, key):
+        return self.held[key]
+
+    def __setattr__(self, name, value):
+        raise AttributeError("InputSnapshot is immutable")
+
+    def was_pressed(self, key):
+        """
+        Check whether a key went down this frame.
+
+        :param key: The pygame key constant.
+        :type key: int
+        :return: True if the key was pressed this frame, False otherwise.
+        :rtype: bool
+        """
+        return key in self.pressed
+
+
+class InputManager:
+    def __init__(self):
+        """
+        Initialize the input manager.
+
+        The input of a frame is read once, by poll for the keyboard and mouse or by
+        feed for scripted and recorded input, into an InputSnapshot. Everything in the
+        game reads the current snapshot instead of asking pygame itself, so the input is
+        the same for every consumer and every simulation tick of the frame, and the
+        event queue is drained in one place.
+
+        Attributes:
+        snapshot: The input of the current frame.
+        frame: The number of snapshots taken so far.
+        """
+        self.frame = 0
+        self.snapshot = InputSnapshot()
+
+    def poll(self):
+        """
+        Drain the pygame event queue and read the keyboard and mouse.
+
+        :return: The new snapshot.
+        :rtype: InputSnapshot
+        """
+        events = pygame.event.get()
+        self.frame += 1
+        self.snapshot = InputSnapshot(
+            self.frame,
+            pygame.key.get_pressed(),
+            [event.key for event in events if event.type == pygame.KEYDOWN],
+            [event.key for event in events if event.type == pygame.KEYUP],
+            events,
+            any(event.type == pygame.QUIT for event in events),
+            pygame.mouse.get_pos(),
+            pygame.mouse.get_pressed(),
+        )
+        return self.snapshot
+
+    def feed(self, keys, mouse_pos=(0, 0), mouse_buttons=(False, False, False)):
+        """
+        Take the input of a frame from a script instead of the devices.
+
+        Keys that are held now but were not in the last snapshot count as pressed, keys
+        that were held but no longer are count as released, and matching KEYDOWN events
+        are created for the menus.
+
+        :param keys: The pygame key constants held this frame.
+        :type keys: iterable of int
+        :param mouse_pos: The mouse position in screen coordinates.
+        :type mouse_pos: tuple
+        :param mouse_buttons: Whether the left, middle and right buttons are held.
+        :type mouse_buttons: tuple
+        :return: The new snapshot.
+        :rtype: InputSnapshot
+        """
+        held = KeySet(keys)
+        previous = self.snapshot.held
+        pressed = sorted(key for key in held if not previous[key])
+        released = sorted(
+            key for key in getattr(previous, "keys", ()) if key not in held.keys
+        )
+        self.frame += 1
+        self.snapshot = InputSnapshot(
+            self.frame,
+            held,
+            pressed,
+            released,
+            [pygame.event.Event(pygame.KEYDOWN, key=key) for key in pressed],
+            False,
+            mouse_pos,
+            mouse_buttons,
+        )
+        return self.snapshot
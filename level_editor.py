@@ -2,6 +2,7 @@ import pygame
 import json
 import os
 from settings import *
+from navigation import NavigationGraph
 
 
 class LevelEditor:
@@ -706,7 +707,8 @@ class LevelEditor:
 
             This method saves the current level by saving the level's platforms, world size,
             player and gun spawn positions, and enemy spawn positions and types to a
-            JSON file. The file is saved in the directory specified by the LEVEL_PATH
+            JSON file. The navigation graph of the level is stored with it, so the game
+            does not have to build it when the level is loaded. The file is saved in the directory specified by the LEVEL_PATH
             constant, with the filename being the level name followed by the ".json"
             extension.
 
@@ -731,6 +733,7 @@ class LevelEditor:
                 "gun_spawn": self.gun_spawn,
                 "enemy_spawns": processed_spawns,
                 "enemy_types": processed_types,
+                "navigation": NavigationGraph.from_level_data(self.platforms).to_dict(),
             }
 
             filepath = f"{LEVEL_PATH}{self.level_name}.json"
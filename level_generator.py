@@ -0,0 +1,379 @@
+import argparse
+import bisect
+import json
+import math
+import os
+import random
+from collections import deque
+import pygame
+from settings import GENERATED_LEVEL_PATH, GRID_SIZE, WORLD_HEIGHT
+from navigation import NavigationGraph, JumpProfile
+
+
+# The colours the level editor gives each platform type.
+PLATFORM_COLORS = {
+    "Platform": (0, 0, 0),
+    "LadderPlatform": (0, 255, 0),
+    "DeadlyPlatform": (255, 0, 0),
+    "SlipperyPlatform": (0, 0, 255),
+    "TeleporterPlatform": (148, 0, 211),
+}
+ENEMY_SIZES = {
+    "GroundEnemy": (30, 30),
+    "ShooterEnemy": (30, 30),
+    "FlyingEnemy": (30, 30),
+    "TankEnemy": (40, 40),
+}
+DEFAULT_ENEMY_MIX = {
+    "GroundEnemy": 4,
+    "FlyingEnemy": 2,
+    "TankEnemy": 1,
+    "ShooterEnemy": 1,
+}
+
+# Rows of platforms are this far apart, enough to jump inside a row without hitting
+# the row above, so rows are joined by ladders.
+ROW_SPACING = 200
+MIN_GAP = 2 * GRID_SIZE
+MIN_PLATFORM_WIDTH = 8 * GRID_SIZE
+PLATFORM_HEIGHT = 2 * GRID_SIZE
+LADDER_WIDTH = GRID_SIZE
+TELEPORTER_SIZE = (40, 60)
+HAZARD_HEIGHT = GRID_SIZE
+# The average distance between the left edges of two platforms in a row.
+DEFAULT_PITCH = 300
+# Gaps are at most this fraction of the player's longest flat jump.
+JUMP_MARGIN = 0.6
+
+
+def platform(kind, x, y, width, height, **extra):
+    """
+    Create the level file entry of a platform.
+
+    :param kind: The platform class name.
+    :type kind: str
+    :return: The platform dict.
+    :rtype: dict
+    """
+    return {
+        "type": kind,
+        "x": int(x),
+        "y": int(y),
+        "width": int(width),
+        "height": int(height),
+        "color": list(PLATFORM_COLORS[kind]),
+        **extra,
+    }
+
+
+def layout_rows(platform_count, world_width, world_height):
+    """
+    Decide how many rows there are and how far apart the platforms in a row are.
+
+    With neither size given the world is WORLD_HEIGHT high and as wide as the
+    platforms need; with one size given the other follows from the platform
+    count; with both the platforms are spread over the given area.
+
+    :return: The rows, the platforms per row, the pitch, the world width and height.
+    :rtype: tuple
+    """
+    margin = ROW_SPACING
+    if world_height is None and world_width is None:
+        world_height = WORLD_HEIGHT
+    if world_height is None:
+        per_row = max(1, int(world_width // DEFAULT_PITCH))
+        rows = math.ceil(platform_count / per_row)
+        world_height = rows * ROW_SPACING + margin
+    else:
+        # At least two platforms per row, so there is a gap to put a ladder in.
+        rows = max(1, min(platform_count // 2, int((world_height - margin) // ROW_SPACING)))
+        per_row = math.ceil(platform_count / rows)
+    if world_width is None:
+        world_width = per_row * DEFAULT_PITCH
+    pitch = world_width / per_row
+    if pitch < MIN_PLATFORM_WIDTH + MIN_GAP:
+        raise ValueError(
+            f"{platform_count} platforms do not fit in a {world_width}x{world_height} world"
+        )
+    return rows, per_row, pitch, int(world_width), int(world_height)
+
+
+def generate_level(
+    platforms=100,
+    enemies=20,
+    enemy_mix=None,
+    projectile_density=0.0,
+    world_width=None,
+    world_height=None,
+    teleporter_pairs=0,
+    slippery_ratio=0.1,
+    hazard_ratio=0.1,
+    seed=0,
+    jump=None,
+):
+    """
+    Generate a level in the format of the level editor for stress tests.
+
+    The walkable platforms are laid out in rows, left to right, with gaps the player
+    can always jump. Every other row is shifted by half a platform, so the gaps of a
+    row are above the middle of the platforms of the row below, and ladders in the
+    gaps join the rows. The whole level can be reached from the player spawn on the
+    bottom row. Some gaps of the bottom row have deadly strips at the
+    bottom of the world. Enemies stand on random platforms away from the spawn,
+    flying enemies hover above them.
+
+    Levels contain no projectiles, they are fired by shooter enemies once the level
+    runs, so the projectile density is the number of shooters per 1000 pixels of
+    platform, added to the enemy count.
+
+    :param platforms: The number of walkable platforms.
+    :type platforms: int
+    :param enemies: The number of enemies picked from the mix.
+    :type enemies: int
+    :param enemy_mix: A dict mapping enemy class names to relative weights, or None
+        for DEFAULT_ENEMY_MIX.
+    :type enemy_mix: dict or None
+    :param projectile_density: Extra shooter enemies per 1000 pixels of platform.
+    :type projectile_density: float
+    :param world_width: The world width, or None to fit the platforms.
+    :type world_width: int or None
+    :param world_height: The world height, or None to fit the platforms.
+    :type world_height: int or None
+    :param teleporter_pairs: The number of linked teleporter pairs.
+    :type teleporter_pairs: int
+    :param slippery_ratio: The fraction of platforms that are slippery.
+    :type slippery_ratio: float
+    :param hazard_ratio: The fraction of bottom row gaps with a deadly strip.
+    :type hazard_ratio: float
+    :param seed: The random seed, so the same parameters make the same level.
+    :type seed: int
+    :param jump: The player's jump physics, or None for the default.
+    :type jump: JumpProfile or None
+    :return: The level data, ready to be written as JSON.
+    :rtype: dict
+    """
+    rng = random.Random(seed)
+    jump = jump or JumpProfile()
+    enemy_mix = enemy_mix or DEFAULT_ENEMY_MIX
+    max_gap = int(jump.reach(0) * JUMP_MARGIN)
+    rows, per_row, pitch, world_width, world_height = layout_rows(
+        platforms, world_width, world_height
+    )
+    max_gap = max(MIN_GAP, min(max_gap, int(pitch * 0.4)))
+
+    platform_data = []
+    # The (left, right, top) of the walkable platforms of every row, bottom first.
+    row_spans = []
+    remaining = platforms
+    for row in range(rows):
+        top = world_height - ROW_SPACING // 2 - row * ROW_SPACING
+        count = min(per_row, remaining)
+        remaining -= count
+        spans = []
+        shift = pitch / 2 if row % 2 else 0
+        for i in range(count):
+            start = i * pitch - shift
+            gap = rng.randint(MIN_GAP, max_gap)
+            left = int(max(0, start + (gap if i else 0)))
+            right = int(start + pitch)
+            kind = "SlipperyPlatform" if rng.random() < slippery_ratio else "Platform"
+            platform_data.append(platform(kind, left, top, right - left, PLATFORM_HEIGHT))
+            spans.append((left, right, top))
+        row_spans.append(spans)
+
+    # Ladders stand beside the right end of a platform, where the player climbs onto
+    # it, and reach down to a platform of the row below. Every few platforms get one.
+    ladder_every = max(1, per_row // 8)
+    for below, spans in zip(row_spans, row_spans[1:]):
+        lefts = [left for left, _, _ in below]
+        pending = True
+        for i, (_, x, top) in enumerate(spans):
+            if not pending and i % ladder_every:
+                continue
+            j = bisect.bisect_right(lefts, x) - 1
+            if j >= 0 and x + LADDER_WIDTH <= below[j][1]:
+                platform_data.append(
+                    platform("LadderPlatform", x, top, LADDER_WIDTH, below[j][2] - top)
+                )
+                pending = False
+
+    for (_, right, _), (left, _, _) in zip(row_spans[0], row_spans[0][1:]):
+        if rng.random() < hazard_ratio:
+            platform_data.append(
+                platform(
+                    "DeadlyPlatform",
+                    right,
+                    world_height - HAZARD_HEIGHT,
+                    left - right,
+                    HAZARD_HEIGHT,
+                )
+            )
+
+    spawn_left, spawn_right, spawn_top = row_spans[0][0]
+    player_spawn = [spawn_left + 40, spawn_top - 30]
+    # Everything else is placed away from the player's first platform.
+    placeable = [span for spans in row_spans for span in spans][1:] or row_spans[0]
+
+    def spot(width):
+        left, right, top = rng.choice(placeable)
+        return rng.randint(left, max(left, right - width)), top
+
+    for pair_id in range(teleporter_pairs):
+        for _ in range(2):
+            x, top = spot(TELEPORTER_SIZE[0])
+            platform_data.append(
+                platform(
+                    "TeleporterPlatform",
+                    x,
+                    top - TELEPORTER_SIZE[1],
+                    *TELEPORTER_SIZE,
+                    pair_id=pair_id,
+                )
+            )
+
+    walkable_length = sum(right - left for spans in row_spans for left, right, _ in spans)
+    enemy_types = rng.choices(list(enemy_mix), list(enemy_mix.values()), k=enemies)
+    enemy_types += ["ShooterEnemy"] * round(projectile_density * walkable_length / 1000)
+    enemy_spawns = []
+    for enemy_type in enemy_types:
+        width, height = ENEMY_SIZES[enemy_type]
+        x, top = spot(width)
+        y = top - height
+        if enemy_type == "FlyingEnemy":
+            y -= rng.randint(0, ROW_SPACING // 2)
+        enemy_spawns.append([x, y])
+
+    return {
+        "platforms": platform_data,
+        "world_width": world_width,
+        "world_height": world_height,
+        "player_spawn": player_spawn,
+        "gun_spawn": [spawn_left + 120, spawn_top - 20],
+        "enemy_spawns": enemy_spawns,
+        "enemy_types": enemy_types,
+    }
+
+
+def reachable_fraction(graph, level_data):
+    """
+    Check how much of a level the player can reach from the spawn.
+
+    :param graph: The navigation graph of the level, built with the player's jump.
+    :type graph: NavigationGraph
+    :param level_data: The level data.
+    :type level_data: dict
+    :return: The fraction of the graph's nodes that can be reached, by walking,
+        dropping, climbing and jumping, from the node the player spawns above.
+    :rtype: float
+    """
+    x, y = level_data["player_spawn"]
+    start = graph.node_at(pygame.Rect(x - 1, y - 1, 2, 2))
+    if start is None:
+        return 0.0
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        for edge in graph.edges[queue.popleft()]:
+            if edge.target not in seen:
+                seen.add(edge.target)
+                queue.append(edge.target)
+    return len(seen) / len(graph)
+
+
+def write_level(level_data, path, navigation=True, check=True):
+    """
+    Write a generated level to a file, with its navigation graph.
+
+    :param level_data: The level data of generate_level.
+    :type level_data: dict
+    :param path: The file to write.
+    :type path: str
+    :param navigation: Whether to store the enemies' navigation graph, so the game does
+        not build it when the level is loaded.
+    :type navigation: bool
+    :param check: Whether to check that the player can reach the whole level, with a
+        graph that includes the player's jumps.
+    :type check: bool
+    :return: The fraction of the level that can be reached, or None if not checked.
+    :rtype: float or None
+    """
+    reachable = None
+    platforms = level_data["platforms"]
+    if navigation:
+        level_data["navigation"] = NavigationGraph.from_level_data(platforms).to_dict()
+    if check:
+        graph = NavigationGraph.from_level_data(platforms, JumpProfile())
+        reachable = reachable_fraction(graph, level_data)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(level_data, f, separators=(",", ":"))
+    return reachable
+
+
+def parse_mix(text):
+    """
+    Parse an enemy mix like "GroundEnemy=4,TankEnemy=1".
+
+    :param text: The mix.
+    :type text: str
+    :return: A dict mapping enemy class names to weights.
+    :rtype: dict
+    """
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENEMY_SIZES:
+            raise argparse.ArgumentTypeError(f"Unknown enemy type: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main():
+    """
+    Generate stress levels, one per platform count.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Generate stress test levels")
+    parser.add_argument(
+        "platforms", nargs="*", type=int, default=[100], help="platform counts to sweep"
+    )
+    parser.add_argument("--enemies", type=float, default=0.2, help="enemies per platform")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_ENEMY_MIX)
+    parser.add_argument("--projectile-density", type=float, default=0.0)
+    parser.add_argument("--world-width", type=int)
+    parser.add_argument("--world-height", type=int)
+    parser.add_argument("--teleporters", type=int, default=0, help="teleporter pairs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=GENERATED_LEVEL_PATH)
+    parser.add_argument("--no-navigation", action="store_true")
+    parser.add_argument("--no-check", action="store_true")
+    args = parser.parse_args()
+
+    for count in args.platforms:
+        level_data = generate_level(
+            count,
+            round(count * args.enemies),
+            args.mix,
+            args.projectile_density,
+            args.world_width,
+            args.world_height,
+            args.teleporters,
+            seed=args.seed,
+        )
+        path = os.path.join(args.out, f"stress_{count}.json")
+        reachable = write_level(
+            level_data, path, not args.no_navigation, not args.no_check
+        )
+        print(
+            f"{path}: {len(level_data['platforms'])} platforms, "
+            f"{len(level_data['enemy_types'])} enemies, "
+            f"{level_data['world_width']}x{level_data['world_height']}"
+            + ("" if reachable is None else f", {reachable:.0%} reachable")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import math
+from settings import (
+    SPATIAL_CELL_SIZE,
+    LINE_OF_SIGHT_CACHE_FRAMES,
+    LINE_OF_SIGHT_TOLERANCE,
+)
+from spatial_hash import SpatialHash
+
+
+class LineOfSight:
+    def __init__(
+        self,
+        registry,
+        cache_frames=LINE_OF_SIGHT_CACHE_FRAMES,
+        tolerance=LINE_OF_SIGHT_TOLERANCE,
+        cell_size=SPATIAL_CELL_SIZE,
+    ):
+        """
+        Initialize the line of sight service of a level.
+
+        The solid platforms and teleporters block sight. They are indexed in a uniform
+        grid, and a ray only tests the colliders in the cells it passes through, which
+        are walked in order with a DDA grid traversal, so a clear ray costs a few cell
+        lookups instead of a test against every platform and a blocked ray usually stops
+        in one of its first cells.
+
+        The result for an observer is reused for cache_frames frames as long as neither
+        end of the ray moved more than tolerance pixels on either axis since it was
+        computed.
+
+        Attributes:
+        grid: The spatial hash of the colliders that block sight.
+        cache_frames: How many frames a result is reused for, 0 to disable the cache.
+        tolerance: How far the ends of a ray may move before a cached result is dropped.
+        frame: The number of frames so far, advanced by tick.
+        cache: A dict mapping each observer to (frame, start, end, result).
+        rays: The number of rays cast.
+        cache_hits: The number of results taken from the cache.
+        cells_visited: The number of grid cells walked by all rays.
+
+        :param registry: The platform registry of the level.
+        :type registry: PlatformRegistry
+        :param cache_frames: How many frames a result is reused for.
+        :type cache_frames: int
+        :param tolerance: The movement in pixels allowed for a cached result.
+        :type tolerance: int
+        :param cell_size: The cell size of the grid.
+        :type cell_size: int
+        """
+        self.grid = SpatialHash(cell_size)
+        for collider in list(registry.solids) + list(registry.teleporters):
+            self.grid.insert(collider)
+        self.cache_frames = cache_frames
+        self.tolerance = tolerance
+        self.frame = 0
+        self.cache = {}
+        self.rays = 0
+        self.cache_hits = 0
+        self.cells_visited = 0
+
+    def tick(self):
+        """
+        Advance the frame counter. Called once per frame.
+
+        :return: None
+        """
+        self.frame += 1
+        if len(self.cache) > 256:
+            self.cache = {
+                observer: entry
+                for observer, entry in self.cache.items()
+                if self.frame - entry[0] <= self.cache_frames
+            }
+
+    def cells_along(self, start, end):
+        """
+        Get the grid cells a line segment passes through, from start to end.
+
+        Cells are stepped one axis at a time, so where the segment crosses a cell
+        corner both neighbouring cells are included.
+
+        :param start: The (x, y) start of the segment.
+        :type start: tuple
+        :param end: The (x, y) end of the segment.
+        :type end: tuple
+        :return: A generator of (cell_x, cell_y) tuples.
+        """
+        size = self.grid.cell_size
+        x0, y0 = start
+        x1, y1 = end
+        cx, cy = int(x0 // size), int(y0 // size)
+        end_cx, end_cy = int(x1 // size), int(y1 // size)
+        dx = x1 - x0
+        dy = y1 - y0
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+        if dx:
+            t_delta_x = size / abs(dx)
+            t_max_x = ((cx + (step_x > 0)) * size - x0) / dx
+        else:
+            t_delta_x = t_max_x = math.inf
+        if dy:
+            t_delta_y = size / abs(dy)
+            t_max_y = ((cy + (step_y > 0)) * size - y0) / dy
+        else:
+            t_delta_y = t_max_y = math.inf
+
+        yield cx, cy
+        for _ in range(abs(end_cx - cx) + abs(end_cy - cy)):
+            if cy == end_cy or (cx != end_cx and t_max_x < t_max_y):
+                cx += step_x
+                t_max_x += t_delta_x
+            else:
+                cy += step_y
+                t_max_y += t_delta_y
+            yield cx, cy
+
+    def cast(self, start, end):
+        """
+        Check whether a line segment is free of colliders, without the cache.
+
+        :param start: The (x, y) start of the segment.
+        :type start: tuple
+        :param end: The (x, y) end of the segment.
+        :type end: tuple
+        :return: True if nothing blocks the segment, False otherwise.
+        :rtype: bool
+        """
+        self.rays += 1
+        cells = self.grid.cells
+        tested = set()
+        for cell in self.cells_along(start, end):
+            self.cells_visited += 1
+            for collider in cells.get(cell, ()):
+                if collider in tested:
+                    continue
+                tested.add(collider)
+                if collider.rect.clipline(start, end):
+                    return False
+        return True
+
+    def visible(self, observer, start, end):
+        """
+        Check whether an observer at start can see the point end.
+
+        :param observer: The object looking, used as the cache key, e.g. an enemy.
+        :param start: The (x, y) point the observer looks from.
+        :type start: tuple
+        :param end: The (x, y) point the observer looks at.
+        :type end: tuple
+        :return: True if the line between the points is clear, False otherwise.
+        :rtype: bool
+        """
+        entry = self.cache.get(observer)
+        if entry is not None:
+            frame, cached_start, cached_end, result = entry
+            tolerance = self.tolerance
+            if (
+                self.frame - frame < self.cache_frames
+                and abs(start[0] - cached_start[0]) <= tolerance
+                and abs(start[1] - cached_start[1]) <= tolerance
+                and abs(end[0] - cached_end[0]) <= tolerance
+                and abs(end[1] - cached_end[1]) <= tolerance
+            ):
+                self.cache_hits += 1
+                return result
+
+        result = self.cast(start, end)
+        if self.cache_frames > 0:
+            self.cache[observer] = (self.frame, start, end, result)
+        return result
+
+    def stats(self):
+        """
+        Get statistics about the rays cast so far.
+
+        :return: A dict with the number of rays, cache hits and the average number of
+            cells walked per ray.
+        :rtype: dict
+        """
+        return {
+            "rays": self.rays,
+            "cache_hits": self.cache_hits,
+            "cells_per_ray": self.cells_visited / max(1, self.rays),
+        }
@@ -73,7 +73,7 @@ class MainMenu(Menu):
 
         :return: None
         """
-        for event in pygame.event.get():
+        for event in self.game.input.snapshot.events:
             if event.type == pygame.QUIT:
                 self.game.running = False
             elif event.type == pygame.KEYDOWN:
@@ -182,7 +182,7 @@ class LevelSelectMenu(Menu):
 
         :return: None
         """
-        for event in pygame.event.get():
+        for event in self.game.input.snapshot.events:
             if event.type == pygame.QUIT:
                 self.game.running = False
             elif event.type == pygame.KEYDOWN:
@@ -250,7 +250,7 @@ class PauseMenu(Menu):
 
         :return: None
         """
-        for event in pygame.event.get():
+        for event in self.game.input.snapshot.events:
             if event.type == pygame.QUIT:
                 self.game.running = False
             elif event.type == pygame.KEYDOWN:
@@ -408,7 +408,7 @@ class SettingsMenu(Menu):
 
         :return: None
         """
-        for event in pygame.event.get():
+        for event in self.game.input.snapshot.events:
             if event.type == pygame.QUIT:
                 self.game.running = False
             elif event.type == pygame.KEYDOWN:
@@ -496,7 +496,7 @@ class GameOverMenu(Menu):
 
         :return: None
         """
-        for event in pygame.event.get():
+        for event in self.game.input.snapshot.events:
             if event.type == pygame.QUIT:
                 self.game.running = False
             elif event.type == pygame.KEYDOWN:
@@ -0,0 +1,492 @@
+import hashlib
+from bisect import bisect_left
+import heapq
+import json
+import math
+import pygame
+from settings import (
+    PLAYER_JUMP_POWER,
+    PLAYER_GRAVITY,
+    PLAYER_MAX_SPEED,
+    LADDER_REACH,
+    GRID_SIZE,
+    NAVIGATION_VERSION,
+)
+from spatial_hash import SpatialHash
+from walkable_spans import WalkableSpan, merge_spans
+from collider_merge import merge_level_data
+from debug_logger import logger
+
+
+MOVE_DROP = "drop"
+MOVE_LADDER = "ladder"
+MOVE_JUMP = "jump"
+
+# Half the width of the widest walking enemy, used to decide whether an entity
+# standing at a ladder also stands on the ground next to it.
+STANCE_HALF_WIDTH = 20
+
+# Gaps narrower than the narrowest walking enemy cannot be fallen through, so the
+# ground on both sides of them is one node.
+STEP_OVER_GAP = 30
+
+
+class JumpProfile:
+    def __init__(
+        self,
+        jump_power=PLAYER_JUMP_POWER,
+        gravity=PLAYER_GRAVITY,
+        run_speed=PLAYER_MAX_SPEED,
+    ):
+        """
+        Initialize the jump physics used to decide which gaps can be jumped.
+
+        :param jump_power: The vertical velocity at take-off, negative is up.
+        :param gravity: The vertical acceleration per frame.
+        :param run_speed: The horizontal speed during the jump.
+        """
+        self.jump_power = jump_power
+        self.gravity = gravity
+        self.run_speed = run_speed
+        self.max_rise = jump_power * jump_power / (2 * gravity)
+
+    def as_list(self):
+        return [self.jump_power, self.gravity, self.run_speed]
+
+    def reach(self, rise):
+        """
+        Get the horizontal distance covered before landing at a given height.
+
+        :param rise: How far above the take-off height the landing is, negative if
+            it is below.
+        :return: The distance in pixels, or None if the height cannot be reached.
+        """
+        speed = -self.jump_power
+        discriminant = speed * speed - 2 * self.gravity * rise
+        if discriminant < 0:
+            return None
+        frames = (speed + math.sqrt(discriminant)) / self.gravity
+        return self.run_speed * frames
+
+
+class NavEdge:
+    __slots__ = ("kind", "source", "target", "x", "cost")
+
+    def __init__(self, kind, source, target, x, cost):
+        """
+        Initialize an edge of the navigation graph.
+
+        :param kind: MOVE_DROP, MOVE_LADDER or MOVE_JUMP.
+        :param source: The index of the node the edge starts on.
+        :param target: The index of the node the edge leads to.
+        :param x: The x-coordinate where the entity leaves the source node: the edge it
+            walks off, the ladder it climbs or the spot it jumps from.
+        :param cost: The approximate distance travelled along the edge.
+        """
+        self.kind = kind
+        self.source = source
+        self.target = target
+        self.x = x
+        self.cost = cost
+
+    def __repr__(self):
+        return f"<NavEdge {self.kind} {self.source}->{self.target} x={self.x}>"
+
+
+def _center(node):
+    return ((node.left + node.right) / 2, node.top)
+
+
+def _distance(a, b):
+    return math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+class NavigationGraph:
+    def __init__(self, nodes, edges, geometry=None):
+        """
+        Initialize a navigation graph from its nodes and edges.
+
+        The nodes are the walkable spans of the level. Walking inside a span needs no
+        edge; the edges are the ways to get from one span to another: dropping off its
+        end, climbing a ladder or jumping. Paths are found with A* and cached until the
+        goal changes, so any number of chasers heading for the same region share the
+        work.
+
+        Jump edges are only built from a JumpProfile, e.g. the player's, to check what
+        the player can reach. Enemies walk, drop and climb but never jump, so the graph
+        the game and the level editor build for them has no jump edges.
+
+        Attributes:
+        nodes: The walkable spans, indexed by position.
+        edges: A list with the outgoing edges of every node.
+        geometry: The key of the level geometry the graph was built from.
+        goal: The node paths currently lead to.
+        cache: A dict mapping (start, moves) to the path found for the current goal.
+
+        :param nodes: The walkable spans of the level.
+        :type nodes: list of WalkableSpan
+        :param edges: The edges between the spans.
+        :type edges: list of NavEdge
+        :param geometry: The geometry key, see geometry_key.
+        :type geometry: str or None
+        """
+        self.nodes = nodes
+        self.edges = [[] for _ in nodes]
+        for edge in edges:
+            self.edges[edge.source].append(edge)
+        self.geometry = geometry
+        self.goal = None
+        self.cache = {}
+        self.searches = 0
+
+        self.by_top = {}
+        for i, node in enumerate(nodes):
+            self.by_top.setdefault(node.top, []).append(i)
+        self.tops = sorted(self.by_top)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def edge_count(self):
+        return sum(len(edges) for edges in self.edges)
+
+    @staticmethod
+    def geometry_key(ground_rects, ladder_rects, jump):
+        """
+        Get a key that changes whenever the geometry or the jump physics change.
+
+        :return: A hex digest.
+        :rtype: str
+        """
+        data = [
+            NAVIGATION_VERSION,
+            sorted(tuple(rect) for rect in ground_rects),
+            sorted(tuple(rect) for rect in ladder_rects),
+            jump.as_list() if jump else None,
+        ]
+        return hashlib.md5(json.dumps(data).encode()).hexdigest()
+
+    @classmethod
+    def build(cls, ground_rects, ladder_rects, jump=None):
+        """
+        Build the navigation graph of a level.
+
+        :param ground_rects: The rects that can be stood on.
+        :type ground_rects: list of pygame.Rect
+        :param ladder_rects: The rects of the ladders.
+        :type ladder_rects: list of pygame.Rect
+        :param jump: The jump physics, or None to build no jump edges.
+        :type jump: JumpProfile or None
+        :return: The graph.
+        :rtype: NavigationGraph
+        """
+        ground_rects = [pygame.Rect(rect) for rect in ground_rects]
+        ladder_rects = [pygame.Rect(rect) for rect in ladder_rects]
+        spans = merge_spans(ground_rects, STEP_OVER_GAP - 1)
+        nodes = []
+        for top in sorted(spans):
+            nodes.extend(spans[top])
+
+        node_grid = SpatialHash()
+        for i, node in enumerate(nodes):
+            node_grid.insert(i, pygame.Rect(node.left, node.top, node.right - node.left, 1))
+        ground_grid = SpatialHash()
+        for i, rect in enumerate(ground_rects):
+            ground_grid.insert(i, rect)
+
+        def blocked(rect):
+            return any(
+                rect.colliderect(ground_rects[i]) for i in ground_grid.query(rect)
+            )
+
+        def make_edge(kind, source, target, x, landing):
+            start = _center(nodes[source])
+            cost = (
+                _distance(start, (x, nodes[source].top))
+                + _distance((x, nodes[source].top), landing)
+                + _distance(landing, _center(nodes[target]))
+            )
+            return NavEdge(kind, source, target, x, cost)
+
+        deepest = max((node.top for node in nodes), default=0)
+
+        def landing_below(x, top):
+            # The first node under the point (x, top), i.e. where a drop lands.
+            below = pygame.Rect(x, top + 1, 1, max(1, deepest - top))
+            best = None
+            for j in node_grid.query(below):
+                node = nodes[j]
+                if node.top > top and node.left <= x < node.right:
+                    if best is None or node.top < nodes[best].top:
+                        best = j
+            return best
+
+        edges = []
+        for i, node in enumerate(nodes):
+            for x, probe in ((node.left, node.left - 1), (node.right, node.right)):
+                if blocked(pygame.Rect(probe, node.top - GRID_SIZE * 3, 1, GRID_SIZE * 3)):
+                    continue
+                target = landing_below(probe, node.top)
+                if target is not None:
+                    edges.append(
+                        make_edge(MOVE_DROP, i, target, x, (probe, nodes[target].top))
+                    )
+
+        for ladder in ladder_rects:
+            reach = pygame.Rect(
+                ladder.left - STANCE_HALF_WIDTH,
+                ladder.top - GRID_SIZE,
+                ladder.width + STANCE_HALF_WIDTH * 2,
+                ladder.height + GRID_SIZE + LADDER_REACH,
+            )
+            near = [
+                j
+                for j in node_grid.query(reach)
+                if nodes[j].left < reach.right and nodes[j].right > reach.left
+            ]
+            tops = [j for j in near if abs(nodes[j].top - ladder.top) <= GRID_SIZE]
+            bottoms = [
+                j
+                for j in near
+                if ladder.bottom - GRID_SIZE <= nodes[j].top <= ladder.bottom + LADDER_REACH
+            ]
+            if not tops or not bottoms:
+                continue
+            upper = min(tops, key=lambda j: abs(_center(nodes[j])[0] - ladder.centerx))
+            lower = min(bottoms, key=lambda j: nodes[j].top)
+            if upper == lower:
+                continue
+            x = ladder.centerx
+            edges.append(make_edge(MOVE_LADDER, lower, upper, x, (x, nodes[upper].top)))
+            edges.append(make_edge(MOVE_LADDER, upper, lower, x, (x, nodes[lower].top)))
+
+        if jump is not None:
+            max_reach = math.ceil(jump.reach(-jump.max_rise))
+            rise = math.ceil(jump.max_rise)
+            for i, node in enumerate(nodes):
+                area = pygame.Rect(
+                    node.left - max_reach,
+                    node.top - rise,
+                    node.right - node.left + max_reach * 2,
+                    rise * 2,
+                )
+                for j in node_grid.query(area):
+                    if j == i:
+                        continue
+                    other = nodes[j]
+                    height = node.top - other.top
+                    if height <= 0 and other.left < node.right and other.right > node.left:
+                        continue
+                    distance = jump.reach(height)
+                    if distance is None:
+                        continue
+                    if other.left >= node.right:
+                        gap = other.left - node.right
+                        x, land_x = node.right - 1, other.left
+                    elif other.right <= node.left:
+                        gap = node.left - other.right
+                        x, land_x = node.left, other.right - 1
+                    else:
+                        gap = 0
+                        x = min(max(_center(other)[0], node.left), node.right - 1)
+                        land_x = x
+                    if gap <= distance:
+                        edges.append(make_edge(MOVE_JUMP, i, j, x, (land_x, other.top)))
+
+        geometry = cls.geometry_key(ground_rects, ladder_rects, jump)
+        return cls(nodes, edges, geometry)
+
+    @classmethod
+    def from_registry(cls, registry, jump=None):
+        """
+        Build the navigation graph from the colliders of a platform registry.
+
+        :param registry: The platform registry of the level.
+        :type registry: PlatformRegistry
+        :param jump: The jump physics, or None to build no jump edges.
+        :return: The graph.
+        :rtype: NavigationGraph
+        """
+        ground, ladders = cls.registry_rects(registry)
+        return cls.build(ground, ladders, jump)
+
+    @staticmethod
+    def registry_rects(registry):
+        ground = [c.rect for c in registry.solids] + [c.rect for c in registry.teleporters]
+        ladders = [c.rect for c in registry.ladders]
+        return ground, ladders
+
+    @staticmethod
+    def level_data_rects(platform_data):
+        ground = []
+        ladders = []
+        for kind, rect in merge_level_data(platform_data):
+            if kind == "LadderPlatform":
+                ladders.append(rect)
+            else:
+                ground.append(rect)
+        return ground, ladders
+
+    @classmethod
+    def from_level_data(cls, platform_data, jump=None):
+        """
+        Build the navigation graph from the "platforms" list of a level file, without
+        creating any sprites. Used to store the graph when a level is saved.
+
+        :param platform_data: The "platforms" list of a level JSON file.
+        :type platform_data: list of dict
+        :param jump: The jump physics, or None to build no jump edges.
+        :return: The graph.
+        :rtype: NavigationGraph
+        """
+        ground, ladders = cls.level_data_rects(platform_data)
+        return cls.build(ground, ladders, jump)
+
+    @classmethod
+    def for_level(cls, level_data, registry, jump=None):
+        """
+        Get the navigation graph of a loaded level.
+
+        The graph stored in the level file under "navigation" is used when it was built
+        from the same geometry, otherwise the graph is built from the registry.
+
+        :param level_data: The level JSON data.
+        :type level_data: dict
+        :param registry: The platform registry of the level.
+        :type registry: PlatformRegistry
+        :param jump: The jump physics, or None to build no jump edges.
+        :return: The graph.
+        :rtype: NavigationGraph
+        """
+        ground, ladders = cls.registry_rects(registry)
+        stored = level_data.get("navigation")
+        if stored and stored.get("geometry") == cls.geometry_key(ground, ladders, jump):
+            try:
+                return cls.from_dict(stored)
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                logger.warning(f"Ignoring invalid navigation data: {e}")
+        return cls.build(ground, ladders, jump)
+
+    def to_dict(self):
+        """
+        Convert the graph to JSON compatible data.
+
+        :return: A dict with the geometry key, the nodes and the edges.
+        :rtype: dict
+        """
+        return {
+            "geometry": self.geometry,
+            "nodes": [[node.top, node.left, node.right] for node in self.nodes],
+            "edges": [
+                [edge.kind, edge.source, edge.target, edge.x, round(edge.cost, 2)]
+                for edges in self.edges
+                for edge in edges
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a graph from the data written by to_dict.
+
+        :param data: The stored graph.
+        :type data: dict
+        :return: The graph.
+        :rtype: NavigationGraph
+        """
+        nodes = [WalkableSpan(top, left, right) for top, left, right in data["nodes"]]
+        edges = []
+        for kind, source, target, x, cost in data["edges"]:
+            if not (0 <= source < len(nodes) and 0 <= target < len(nodes)):
+                raise IndexError(f"edge {source}->{target} out of range")
+            edges.append(NavEdge(kind, source, target, x, cost))
+        return cls(nodes, edges, data["geometry"])
+
+    def node_at(self, rect):
+        """
+        Get the node a rectangle stands on, or the one it will land on if it is in the air.
+
+        :param rect: The rectangle of the entity.
+        :type rect: pygame.Rect
+        :return: The node index, or None if there is no ground below the rect.
+        """
+        for i in self.by_top.get(rect.bottom, ()):
+            node = self.nodes[i]
+            if node.left <= rect.centerx < node.right:
+                return i
+        for i in self.by_top.get(rect.bottom, ()):
+            if self.nodes[i].supports(rect):
+                return i
+
+        x = rect.centerx
+        for top in self.tops[bisect_left(self.tops, rect.bottom) :]:
+            for i in self.by_top[top]:
+                node = self.nodes[i]
+                if node.left <= x < node.right:
+                    return i
+        return None
+
+    def set_goal(self, goal):
+        """
+        Set the node paths lead to. The path cache is cleared when the goal changes.
+
+        :param goal: The node index, or None to keep the current goal.
+        :return: None
+        """
+        if goal is not None and goal != self.goal:
+            self.goal = goal
+            self.cache.clear()
+
+    def find_path(self, start, moves):
+        """
+        Find the edges leading from a node to the current goal.
+
+        :param start: The node index to start from.
+        :type start: int
+        :param moves: The edge kinds the entity can use.
+        :type moves: tuple
+        :return: The list of edges to follow, empty if the start is the goal, or None
+            if the goal cannot be reached.
+        """
+        goal = self.goal
+        if goal is None:
+            return None
+        if start == goal:
+            return []
+        key = (start, moves)
+        if key in self.cache:
+            return self.cache[key]
+
+        self.searches += 1
+        goal_center = _center(self.nodes[goal])
+        best = {start: 0.0}
+        came_from = {}
+        counter = 0
+        frontier = [(_distance(_center(self.nodes[start]), goal_center), counter, start)]
+        path = None
+        while frontier:
+            _, _, node = heapq.heappop(frontier)
+            if node == goal:
+                path = []
+                while node != start:
+                    edge = came_from[node]
+                    path.append(edge)
+                    node = edge.source
+                path.reverse()
+                break
+            cost = best[node]
+            for edge in self.edges[node]:
+                if edge.kind not in moves:
+                    continue
+                new_cost = cost + edge.cost
+                if new_cost < best.get(edge.target, math.inf):
+                    best[edge.target] = new_cost
+                    came_from[edge.target] = edge
+                    counter += 1
+                    estimate = new_cost + _distance(
+                        _center(self.nodes[edge.target]), goal_center
+                    )
+                    heapq.heappush(frontier, (estimate, counter, edge.target))
+
+        self.cache[key] = path
+        return path
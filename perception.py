@@ -0,0 +1,92 @@
+from settings import COLLISION_BACKEND
+from debug_logger import logger
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class PerceptionCache:
+    def __init__(self, backend=COLLISION_BACKEND):
+        """
+        Initialize an empty per-frame perception cache.
+
+        Once per frame, update() works out the offset and squared distance from every
+        enemy to the player in one step. Enemies then read their own result with get()
+        instead of each computing it, and compare squared distances against squared
+        ranges so no square root is needed to tell whether the player is in range.
+
+        Attributes:
+        backend: "numpy" or "python", chosen like the platform collision kernel.
+        index: A dict mapping each enemy to its row in the results.
+        dx, dy: The offsets from each enemy's center to the player's center.
+        dist_sq: The squared distances from each enemy to the player.
+
+        :param backend: "auto", "numpy" or "python".
+        :type backend: str
+        """
+        if backend == "auto":
+            backend = "numpy" if np is not None else "python"
+        elif backend == "numpy" and np is None:
+            logger.warning("NumPy is not installed, using the python perception backend")
+            backend = "python"
+        self.backend = backend
+        self.clear()
+
+    def __len__(self):
+        return len(self.index)
+
+    def clear(self):
+        """
+        Forget the results, so enemies work out their perception themselves until the
+        next update.
+
+        :return: None
+        """
+        self.index = {}
+        self.dx = []
+        self.dy = []
+        self.dist_sq = []
+
+    def update(self, enemies, target_rect):
+        """
+        Compute the offset and squared distance from every enemy to the target.
+
+        :param enemies: The enemies to compute the results for.
+        :type enemies: list of Enemy
+        :param target_rect: The rect of the player.
+        :type target_rect: pygame.Rect
+        :return: None
+        """
+        self.index = {enemy: i for i, enemy in enumerate(enemies)}
+        target_x, target_y = target_rect.center
+        if self.backend == "numpy":
+            count = len(enemies)
+            centers = np.fromiter(
+                (value for enemy in enemies for value in enemy.rect.center),
+                np.int64,
+                count * 2,
+            ).reshape(count, 2)
+            dx = target_x - centers[:, 0]
+            dy = target_y - centers[:, 1]
+            self.dx = dx.tolist()
+            self.dy = dy.tolist()
+            self.dist_sq = (dx * dx + dy * dy).tolist()
+        else:
+            self.dx = [target_x - enemy.rect.centerx for enemy in enemies]
+            self.dy = [target_y - enemy.rect.centery for enemy in enemies]
+            self.dist_sq = [dx * dx + dy * dy for dx, dy in zip(self.dx, self.dy)]
+
+    def get(self, enemy):
+        """
+        Get the cached perception of an enemy.
+
+        :param enemy: The enemy to look up.
+        :type enemy: Enemy
+        :return: A (dx, dy, dist_sq) tuple, or None if the enemy is not in the cache.
+        """
+        i = self.index.get(enemy)
+        if i is None:
+            return None
+        return self.dx[i], self.dy[i], self.dist_sq[i]
@@ -0,0 +1,212 @@
+from platforms import (
+    LadderPlatform,
+    DeadlyPlatform,
+    SlipperyPlatform,
+    TeleporterPlatform,
+)
+from spatial_hash import SpatialHash
+from collider_merge import Collider, build_colliders
+from debug_logger import logger
+
+
+class PlatformCollection:
+    def __init__(self, name, platformtype=None):
+        """
+        Initialize an empty collection of platforms that share one collision behaviour.
+
+        :param name: A readable name for the collection, used in logs and debug output.
+        :type name: str
+        :param platformtype: The value the player's platformtype takes while standing on
+            a platform of this collection, or None if the collection does not set it.
+        :type platformtype: int or None
+        """
+        self.name = name
+        self.platformtype = platformtype
+        self.platforms = []
+        self.members = set()
+        self.grid = SpatialHash()
+
+    def __len__(self):
+        return len(self.platforms)
+
+    def __iter__(self):
+        return iter(self.platforms)
+
+    def __contains__(self, platform):
+        return platform in self.members
+
+    def add(self, platform):
+        """
+        Add a platform to the collection and its spatial index.
+
+        :param platform: The platform to add.
+        :type platform: Platform
+        :return: None
+        """
+        self.platforms.append(platform)
+        self.members.add(platform)
+        self.grid.insert(platform)
+
+    def query(self, rect):
+        """
+        Get the platforms of this collection near the given rectangle.
+
+        :param rect: The area to search.
+        :type rect: pygame.Rect
+        :return: A list of candidate platforms.
+        """
+        return self.grid.query(rect)
+
+    def collide(self, rect):
+        """
+        Get the platforms of this collection overlapping the given rectangle.
+
+        :param rect: The area to test.
+        :type rect: pygame.Rect
+        :return: A list of overlapping platforms.
+        """
+        return self.grid.collide(rect)
+
+
+class PlatformRegistry:
+    def __init__(self, platforms=(), merge_colliders=True):
+        """
+        Sort the platforms of a level into typed collections.
+
+        The platform type is looked at exactly once here, so the collision code can ask
+        for the kinds it cares about instead of checking every platform's class every
+        frame. A platform can belong to more than one collection: a DeadlyPlatform is
+        both solid and a hazard, a SlipperyPlatform is both solid and a surface modifier.
+
+        Unless merge_colliders is False, touching platforms of the same type are merged
+        into larger colliders first, so the collections hold fewer rectangles than the
+        level has platforms. The platforms themselves are still the sprites that get
+        drawn. Teleporters are never merged.
+
+        Collections:
+        solids: Platforms that block movement.
+        ladders: Platforms the player can climb.
+        teleporters: Platforms that move the player to their paired teleporter.
+        hazards: Platforms that kill the player on contact.
+        surface_modifiers: Platforms that change how the player moves on them.
+
+        :param platforms: The platforms of the level.
+        :type platforms: iterable of Platform
+        :param merge_colliders: Whether to merge touching platforms into colliders.
+        :type merge_colliders: bool
+        """
+        self.solids = PlatformCollection("solids", platformtype=1)
+        self.ladders = PlatformCollection("ladders", platformtype=2)
+        self.teleporters = PlatformCollection("teleporters")
+        self.hazards = PlatformCollection("hazards")
+        self.surface_modifiers = PlatformCollection("surface_modifiers", platformtype=4)
+        self.grid = SpatialHash()
+
+        platforms = list(platforms)
+        for platform in platforms:
+            if isinstance(platform, TeleporterPlatform):
+                self.add(platform)
+
+        if merge_colliders:
+            colliders = build_colliders(platforms)
+        else:
+            colliders = [
+                Collider(platform.rect, type(platform), [platform])
+                for platform in platforms
+                if not isinstance(platform, TeleporterPlatform)
+            ]
+        for collider in colliders:
+            self.add(collider)
+
+        self.platform_count = len(platforms)
+        self.collider_count = len(self.grid)
+        self.removed_colliders = self.platform_count - self.collider_count
+        if self.removed_colliders:
+            logger.info(
+                f"Merged {self.platform_count} platforms into {self.collider_count} "
+                f"colliders ({self.removed_colliders} removed)"
+            )
+
+    def add(self, item):
+        """
+        Add a platform or collider to every collection it belongs to.
+
+        :param item: The platform or collider to add. A collider is filed by the
+            platform class it was built from.
+        :type item: Platform or Collider
+        :return: None
+        """
+        kind = item.kind if isinstance(item, Collider) else type(item)
+        self.grid.insert(item)
+        if issubclass(kind, TeleporterPlatform):
+            self.teleporters.add(item)
+        elif issubclass(kind, LadderPlatform):
+            self.ladders.add(item)
+        else:
+            self.solids.add(item)
+            if issubclass(kind, DeadlyPlatform):
+                self.hazards.add(item)
+            if issubclass(kind, SlipperyPlatform):
+                self.surface_modifiers.add(item)
+
+    def collections(self):
+        """
+        Get every typed collection of the registry.
+
+        :return: A list of PlatformCollection objects.
+        """
+        return [
+            self.solids,
+            self.ladders,
+            self.teleporters,
+            self.hazards,
+            self.surface_modifiers,
+        ]
+
+    def query(self, rect, *collections):
+        """
+        Get the platforms near a rectangle, optionally restricted to some collections.
+
+        :param rect: The area to search.
+        :type rect: pygame.Rect
+        :param collections: The collections to search. All platforms are searched if
+            none are given.
+        :return: A list of candidate platforms.
+        """
+        if not collections:
+            return self.grid.query(rect)
+        if len(collections) == 1:
+            return collections[0].query(rect)
+        found = []
+        for collection in collections:
+            found.extend(collection.query(rect))
+        return found
+
+    def collide(self, rect, *collections):
+        """
+        Get the platforms overlapping a rectangle, optionally restricted to some collections.
+
+        :param rect: The area to test.
+        :type rect: pygame.Rect
+        :param collections: The collections to test. All platforms are tested if none
+            are given.
+        :return: A list of overlapping platforms.
+        """
+        return [
+            platform
+            for platform in self.query(rect, *collections)
+            if rect.colliderect(platform.rect)
+        ]
+
+    def surface_type(self, platform):
+        """
+        Get the platformtype the player gets while standing on a solid platform.
+
+        :param platform: A collider from the solids collection.
+        :type platform: Collider
+        :return: The platformtype of the surface modifier collection if the platform
+            belongs to it, otherwise the platformtype of the solids collection.
+        """
+        if platform in self.surface_modifiers:
+            return self.surface_modifiers.platformtype
+        return self.solids.platformtype
@@ -1,26 +1,36 @@
 import pygame
 from settings import *
+from image_cache import get_image
 
 
 class Platform(pygame.sprite.Sprite):
+    colour = GREEN
+    alpha = None
+
     def __init__(self, x, y, width, height):
         """
         Initialize a Platform instance.
 
+        Platforms of the same type and size share one image from the image cache, the
+        look of each type comes from its colour and alpha class attributes.
+
         :param x: The x-coordinate of the platform's position.
         :param y: The y-coordinate of the platform's position.
         :param width: The width of the platform.
         :param height: The height of the platform.
         """
         super().__init__()
-        self.image = pygame.Surface((width, height))
-        self.image.fill(GREEN)
+        self.image = get_image(
+            type(self).__name__, (width, height), self.colour, self.alpha
+        )
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
 
 
 class LadderPlatform(Platform):
+    alpha = 192
+
     def __init__(self, x, y, width, height):
         """
         Initialize a LadderPlatform instance.
@@ -31,11 +41,11 @@ class LadderPlatform(Platform):
         :param height: The height of the ladder platform.
         """
         super().__init__(x, y, width, height)
-        self.image.fill(GREEN)
-        self.image.set_alpha(192)
 
 
 class DeadlyPlatform(Platform):
+    colour = (255, 0, 0)
+
     def __init__(self, x, y, width, height):
         """
         Initialize a DeadlyPlatform instance.
@@ -46,10 +56,11 @@ class DeadlyPlatform(Platform):
         :param height: The height of the platform.
         """
         super().__init__(x, y, width, height)
-        self.image.fill((255, 0, 0))
 
 
 class SlipperyPlatform(Platform):
+    colour = BLUE
+
     def __init__(self, x, y, width, height):
         """
         Initialize a SlipperyPlatform instance.
@@ -60,10 +71,12 @@ class SlipperyPlatform(Platform):
         :param height: The height of the slippery platform.
         """
         super().__init__(x, y, width, height)
-        self.image.fill(BLUE)
 
 
 class TeleporterPlatform(Platform):
+    colour = (148, 0, 211)
+    alpha = 128
+
     def __init__(self, x, y, width, height, pair_id=0):
         """
         Initialize a TeleporterPlatform instance.
@@ -76,7 +89,4 @@ class TeleporterPlatform(Platform):
         """
         super().__init__(x, y, width, height)
         self.pair_id = pair_id
-        self.image.fill((148, 0, 211))
         self.cooldown = 500
-        self.last_teleport = 0
-        self.image.set_alpha(128)
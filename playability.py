@@ -0,0 +1,816 @@
+import argparse
+import glob
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pygame
+from settings import GRID_SIZE, LEVEL_PATH, PLAYABILITY_REPORT_PATH, WORLD_WIDTH, WORLD_HEIGHT
+from collider_merge import merge_level_data
+from spatial_hash import SpatialHash
+from navigation import JumpProfile
+from level_generator import ENEMY_SIZES, PLATFORM_COLORS
+
+
+# The size of the player's walking sprite.
+PLAYER_SIZE = (58, 36)
+GUN_SIZE = (20, 20)
+# The player's falling speed is capped at this, see Player.apply_gravity.
+MAX_FALL_SPEED = 10
+# Jumps and falls are tried at this many horizontal speeds in each direction.
+SPEED_STEPS = 4
+MAX_AIR_TICKS = 600
+# The positions the player's centre reaches are tracked in square cells of this size.
+COVER_CELL = GRID_SIZE
+# Frontiers smaller than this are expanded in the main process, sending them to the
+# pool would cost more than it saves.
+PARALLEL_FRONTIER = 64
+
+
+class LevelGeometry:
+    def __init__(self, level_data, jump=None, player_size=PLAYER_SIZE):
+        """
+        Initialize the collision geometry of a level and the player's movement in it.
+
+        The player's movement is discretized: a state is a position the player can
+        stand at, with its x-coordinate on the GRID_SIZE grid where possible. From a
+        state the player can walk one grid cell, jump or walk off an edge at
+        SPEED_STEPS horizontal speeds per direction, climb the ladders it touches and
+        use the teleporters it touches. Jumps and falls are simulated tick by tick with
+        the player's gravity and speed cap until the player lands, dies on a hazard or
+        falls out of the world. The horizontal speed does not change in the air, so
+        what air control adds is not found.
+
+        A jump has the same path from every position at the same height, so the path
+        is worked out once per speed and take-off height and only has to be checked
+        against the level where it is used.
+
+        Attributes:
+        jump: The player's jump physics.
+        width, height: The size of the player.
+        world_width, world_height: The size of the level.
+        solids: The merged rects of the solid platforms.
+        hazards: For every solid, whether touching it kills the player.
+        ladders: The rects of the ladders.
+        teleporters: The rects of the teleporters.
+        partners: A dict mapping a teleporter's index to its partner's index.
+        solid_grid, ladder_grid, teleporter_grid: Spatial hashes of the indices.
+        speeds: The horizontal speeds tried for jumps and falls.
+        climbs: The states and cells reached by climbing each ladder.
+        arrivals: The states and cells reached by using each teleporter.
+        paths: The jump paths by speed, take-off height and x-offset in a cell.
+        shared_paths: Whether jump paths are shared along a row of cells, which needs
+            speeds that are exact in binary.
+
+        :param level_data: The level JSON data.
+        :type level_data: dict
+        :param jump: The player's jump physics, or None for the default.
+        :type jump: JumpProfile or None
+        :param player_size: The width and height of the player.
+        :type player_size: tuple
+        """
+        self.jump = jump or JumpProfile()
+        self.width, self.height = player_size
+        self.world_width = level_data.get("world_width", WORLD_WIDTH)
+        self.world_height = level_data.get("world_height", WORLD_HEIGHT)
+        self.solids = []
+        self.hazards = []
+        self.ladders = []
+        for kind, rect in merge_level_data(level_data["platforms"]):
+            if kind == "LadderPlatform":
+                self.ladders.append(rect)
+            elif kind != "TeleporterPlatform":
+                self.solids.append(rect)
+                self.hazards.append(kind == "DeadlyPlatform")
+
+        self.teleporters = []
+        pairs = {}
+        for plat in level_data["platforms"]:
+            if plat["type"] == "TeleporterPlatform" and plat["width"] > 0 and plat["height"] > 0:
+                pairs.setdefault(plat.get("pair_id", 0), []).append(len(self.teleporters))
+                self.teleporters.append(
+                    pygame.Rect(plat["x"], plat["y"], plat["width"], plat["height"])
+                )
+        self.partners = {}
+        for members in pairs.values():
+            if len(members) == 2:
+                a, b = members
+                self.partners[a] = b
+                self.partners[b] = a
+
+        self.solid_grid = self.index(self.solids)
+        self.ladder_grid = self.index(self.ladders)
+        self.teleporter_grid = self.index(self.teleporters)
+        steps = range(-SPEED_STEPS, SPEED_STEPS + 1)
+        self.speeds = [self.jump.run_speed * i / SPEED_STEPS for i in steps]
+        self.climbs = {}
+        self.arrivals = {}
+        self.paths = {}
+        self.shared_paths = all((speed * 256).is_integer() for speed in self.speeds)
+
+    @staticmethod
+    def index(rects):
+        grid = SpatialHash()
+        for i, rect in enumerate(rects):
+            grid.insert(i, rect)
+        return grid
+
+    @staticmethod
+    def hits(grid, rects, rect):
+        # Like SpatialHash.collide, without sorting: this runs several times per
+        # simulated tick.
+        size = grid.cell_size
+        cells = grid.cells
+        found = []
+        for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cy in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                for i in cells.get((cx, cy), ()):
+                    if i not in found and rect.colliderect(rects[i]):
+                        found.append(i)
+        return found
+
+    def player_rect(self, x, bottom):
+        return pygame.Rect(int(x), int(bottom) - self.height, self.width, self.height)
+
+    def push_out(self, rect):
+        """
+        Move a player rect out of the solids it overlaps, along the axis of the
+        smallest overlap, like the player's platform collision does.
+
+        :param rect: The player's rect, changed in place.
+        :type rect: pygame.Rect
+        :return: None
+        """
+        for i in self.hits(self.solid_grid, self.solids, rect):
+            solid = self.solids[i]
+            if not rect.colliderect(solid):
+                continue
+            overlaps = {
+                "top": rect.bottom - solid.top,
+                "bottom": solid.bottom - rect.top,
+                "left": rect.right - solid.left,
+                "right": solid.right - rect.left,
+            }
+            side = min(overlaps, key=overlaps.get)
+            if side == "top":
+                rect.bottom = solid.top
+            elif side == "bottom":
+                rect.top = solid.bottom
+            elif side == "left":
+                rect.right = solid.left
+            else:
+                rect.left = solid.right
+
+    def support(self, rect):
+        """
+        Get what a player rect stands on.
+
+        :param rect: The player's rect.
+        :type rect: pygame.Rect
+        :return: "hazard" if it stands on a deadly platform, "ground" if it stands on
+            a solid platform or the top of a ladder, otherwise None.
+        """
+        below = pygame.Rect(rect.x, rect.bottom, rect.width, 1)
+        found = None
+        for i in self.hits(self.solid_grid, self.solids, below):
+            if self.solids[i].top == rect.bottom:
+                if self.hazards[i]:
+                    return "hazard"
+                found = "ground"
+        if found is None:
+            for i in self.hits(self.ladder_grid, self.ladders, below):
+                if self.ladders[i].top == rect.bottom:
+                    found = "ground"
+        return found
+
+    def cover(self, rect, cells):
+        """
+        Mark the cell of the centre of a player rect as reached.
+
+        :param rect: The player's rect.
+        :type rect: pygame.Rect
+        :param cells: The set of reached cells to add to.
+        :type cells: set
+        :return: None
+        """
+        cells.add((rect.centerx // COVER_CELL, rect.centery // COVER_CELL))
+
+    def touches(self, rect, cells):
+        """
+        Check whether the player can touch a rect from the reached cells.
+
+        :param rect: The area to touch, e.g. a spawn.
+        :type rect: pygame.Rect
+        :param cells: The reached cells.
+        :type cells: set
+        :return: True if a cell the player's centre reached is close enough.
+        :rtype: bool
+        """
+        area = rect.inflate(self.width, self.height)
+        return any(
+            (cx, cy) in cells
+            for cx in range(area.left // COVER_CELL, (area.right - 1) // COVER_CELL + 1)
+            for cy in range(area.top // COVER_CELL, (area.bottom - 1) // COVER_CELL + 1)
+        )
+
+    def stand(self, x, bottom, out, cells, ignore_pair=None):
+        """
+        Add the state of the player standing at a position, snapped to the grid.
+
+        :param x: The player's x-coordinate.
+        :param bottom: The y-coordinate of the player's feet.
+        :param out: The set of states to add to.
+        :param cells: The set of reachable cells.
+        :param ignore_pair: The teleporter pair the player just used, or None.
+        :return: None
+        """
+        for candidate in (round(x / GRID_SIZE) * GRID_SIZE, int(x)):
+            rect = self.player_rect(candidate, bottom)
+            if self.hits(self.solid_grid, self.solids, rect):
+                continue
+            if self.teleport(rect, out, cells, ignore_pair):
+                return
+            if self.support(rect) == "ground":
+                out.add((candidate, int(bottom)))
+                self.cover(rect, cells)
+            return
+
+    def teleport(self, rect, out, cells, ignore_pair=None):
+        """
+        Move the player to the partner of a teleporter it touches.
+
+        The player is put on top of the partner and falls from there. Where it lands
+        only depends on the teleporter, so it is worked out once.
+
+        :return: True if the player was teleported, False otherwise.
+        :rtype: bool
+        """
+        if not self.teleporters:
+            return False
+        for i in self.hits(self.teleporter_grid, self.teleporters, rect):
+            partner = self.partners.get(i)
+            if partner is None or {i, partner} == ignore_pair:
+                continue
+            result = self.arrive(i)
+            out |= result[0]
+            cells |= result[1]
+            return True
+        return False
+
+    def arrive(self, teleporter):
+        """
+        Get where the player lands after using a teleporter, worked out once.
+
+        :param teleporter: The index of a teleporter with a partner.
+        :type teleporter: int
+        :return: The set of states and the set of cells reached.
+        :rtype: tuple
+        """
+        result = self.arrivals.get(teleporter)
+        if result is None:
+            result = self.arrivals[teleporter] = (set(), set())
+            partner = self.partners[teleporter]
+            target = self.teleporters[partner]
+            self.fly(
+                target.centerx - self.width // 2,
+                target.top - self.height,
+                0,
+                0,
+                *result,
+                ignore_pair={teleporter, partner},
+            )
+        return result
+
+    def prepare(self):
+        """
+        Work out the results of every ladder and teleporter, so they can be shared
+        with worker processes instead of every worker finding them again.
+
+        :return: None
+        """
+        for ladder in range(len(self.ladders)):
+            self.climb(ladder, set(), set())
+        for teleporter in self.partners:
+            self.arrive(teleporter)
+
+    def climb(self, ladder, out, cells, ignore_ladders=frozenset()):
+        """
+        Add the states reachable by climbing a ladder: standing on its top, and
+        wherever the player lands when it lets go at the bottom. These only depend on
+        the ladder, so they are worked out once.
+
+        :return: None
+        """
+        key = (ladder, ignore_ladders)
+        result = self.climbs.get(key)
+        if result is None:
+            result = self.climbs[key] = (set(), set())
+            rect = self.ladders[ladder]
+            x = rect.centerx - self.width // 2
+            for bottom in range(rect.top, rect.bottom + 1, COVER_CELL):
+                self.cover(self.player_rect(x, bottom), result[1])
+            self.stand(x, rect.top, *result)
+            self.fly(x, rect.bottom - self.height, 0, 0, *result, ignore_ladders | {ladder})
+        out |= result[0]
+        cells |= result[1]
+
+    def fly(
+        self, x, y, vel_x, vel_y, out, cells, ignore_ladders=frozenset(), ignore_pair=None
+    ):
+        """
+        Simulate the player in the air until it lands, dies or leaves the world.
+
+        Ladders touched on the way can be grabbed, so they are climbed as well, and
+        touching a teleporter moves the player to its partner.
+
+        :param x: The player's x-coordinate.
+        :param y: The player's y-coordinate.
+        :param vel_x: The horizontal speed.
+        :param vel_y: The vertical speed, negative is up.
+        :param out: The set of states to add to.
+        :param cells: The set of reachable cells.
+        :param ignore_ladders: Ladders not to grab, because the player is leaving them.
+        :param ignore_pair: The teleporter pair the player just used, or None.
+        :return: None
+        """
+        gravity = self.jump.gravity
+        grabbed = set(ignore_ladders)
+        for _ in range(MAX_AIR_TICKS):
+            vel_y = min(vel_y + gravity, MAX_FALL_SPEED)
+            x += vel_x
+            rect = self.player_rect(x, y + self.height)
+            hits = self.hits(self.solid_grid, self.solids, rect)
+            if hits:
+                if any(self.hazards[i] for i in hits):
+                    return
+                x -= vel_x
+                vel_x = 0
+                rect.x = int(x)
+
+            previous_bottom = rect.bottom
+            y += vel_y
+            rect.y = int(y)
+            hits = self.hits(self.solid_grid, self.solids, rect)
+            if hits:
+                if any(self.hazards[i] for i in hits):
+                    return
+                if vel_y > 0:
+                    top = min(self.solids[i].top for i in hits)
+                    self.stand(x, top, out, cells, ignore_pair)
+                    return
+                y = max(self.solids[i].bottom for i in hits)
+                vel_y = 0
+                rect.y = int(y)
+            self.cover(rect, cells)
+
+            for i in self.hits(self.ladder_grid, self.ladders, rect) if self.ladders else ():
+                if i in grabbed:
+                    continue
+                if vel_y > 0 and previous_bottom <= self.ladders[i].top < rect.bottom:
+                    self.stand(x, self.ladders[i].top, out, cells, ignore_pair)
+                    return
+                grabbed.add(i)
+                self.climb(i, out, cells, ignore_ladders)
+            if self.teleport(rect, out, cells, ignore_pair):
+                return
+            if rect.top > self.world_height:
+                return
+
+    def jump_path(self, offset, y, vel_x):
+        """
+        Simulate a jump in empty air until the player comes back down below its
+        take-off height, like fly does.
+
+        The x-coordinates are relative to the cell the player starts in. With speeds
+        that are exact in binary they stay exact, so the path can be moved along a row
+        of cells; the y-coordinates are only reused for the same take-off height.
+
+        :param offset: The player's x-coordinate within its cell, or its x-coordinate
+            if paths are not shared.
+        :param y: The player's y-coordinate at take-off.
+        :param vel_x: The horizontal speed.
+        :return: The area the player passes through before coming down, the cells it
+            covers, and its x-coordinate and rect at the tick it comes down; or None if
+            it does not come down.
+        :rtype: tuple or None
+        """
+        gravity = self.jump.gravity
+        vel_y = self.jump.jump_power
+        start = y
+        x = offset
+        area = None
+        cells = set()
+        for _ in range(MAX_AIR_TICKS):
+            vel_y = min(vel_y + gravity, MAX_FALL_SPEED)
+            x += vel_x
+            rect = pygame.Rect(
+                math.floor(x), int(y + self.height) - self.height, self.width, self.height
+            )
+            area = rect.copy() if area is None else area.union(rect)
+            y += vel_y
+            rect.y = int(y)
+            if rect.y > start:
+                return area, cells, x, rect
+            area.union_ip(rect)
+            self.cover(rect, cells)
+        return None
+
+    def jump_from(self, x, y, vel_x, out, cells):
+        """
+        Add the states reached by jumping from a position.
+
+        The jump's path is looked up for the take-off height; if nothing is in its way
+        the player comes down where the path ends, otherwise the jump is simulated
+        against the level.
+
+        :param x: The player's x-coordinate.
+        :param y: The player's y-coordinate.
+        :param vel_x: The horizontal speed.
+        :param out: The set of states to add to.
+        :param cells: The set of reachable cells.
+        :return: None
+        """
+        offset = x % COVER_CELL if self.shared_paths else x
+        key = (vel_x, y, offset)
+        if key not in self.paths:
+            self.paths[key] = self.jump_path(offset, y, vel_x)
+        path = self.paths[key]
+        if path is not None:
+            area, covered, end_x, landing = path
+            shift = x - offset
+            area = area.move(shift, 0)
+            if (
+                area.left >= 0
+                and area.top >= 0
+                and not self.hits(self.solid_grid, self.solids, area)
+                and not self.hits(self.ladder_grid, self.ladders, area)
+                and not self.hits(self.teleporter_grid, self.teleporters, area)
+            ):
+                landing = landing.move(shift, 0)
+                hits = self.hits(self.solid_grid, self.solids, landing)
+                if hits:
+                    step = shift // COVER_CELL
+                    cells.update((cx + step, cy) for cx, cy in covered)
+                    if not any(self.hazards[i] for i in hits):
+                        top = min(self.solids[i].top for i in hits)
+                        self.stand(shift + end_x, top, out, cells)
+                    return
+        self.fly(x, y, vel_x, self.jump.jump_power, out, cells)
+
+    def expand(self, state, out, cells):
+        """
+        Add the states the player can reach from a state in one move.
+
+        :param state: The (x, bottom) position the player stands at.
+        :type state: tuple
+        :param out: The set of states to add to.
+        :type out: set
+        :param cells: The set of reachable cells.
+        :type cells: set
+        :return: None
+        """
+        x, bottom = state
+        rect = self.player_rect(x, bottom)
+        self.cover(rect, cells)
+
+        for direction in (-1, 1):
+            step = self.player_rect(x + direction * GRID_SIZE, bottom)
+            if self.hits(self.solid_grid, self.solids, step):
+                continue
+            if self.teleport(step, out, cells):
+                continue
+            support = self.support(step)
+            if support == "ground":
+                out.add((step.x, bottom))
+            elif support is None:
+                for speed in self.speeds:
+                    if speed * direction > 0:
+                        self.fly(step.x, step.y, speed, 0, out, cells)
+
+        for speed in self.speeds:
+            self.jump_from(x, rect.y, speed, out, cells)
+
+        reach = rect.inflate(0, 2)
+        for i in self.hits(self.ladder_grid, self.ladders, reach):
+            self.climb(i, out, cells)
+
+
+_worker_geometry = None
+
+
+def _init_worker(level_data, jump, player_size, climbs, arrivals):
+    global _worker_geometry
+    _worker_geometry = LevelGeometry(level_data, JumpProfile(*jump), player_size)
+    _worker_geometry.climbs = climbs
+    _worker_geometry.arrivals = arrivals
+
+
+def _expand_chunk(states):
+    out = set()
+    cells = set()
+    for state in states:
+        _worker_geometry.expand(state, out, cells)
+    return out, cells
+
+
+def search(geometry, start, workers=1, level_data=None):
+    """
+    Find every state reachable from the start, one frontier at a time.
+
+    Every frontier is split into chunks that a process pool expands in parallel,
+    each worker with its own copy of the geometry. The ladders and teleporters are
+    worked out in this process first and sent to the workers with the geometry. Small
+    frontiers are expanded in this process.
+
+    :param geometry: The geometry of the level.
+    :type geometry: LevelGeometry
+    :param start: The (x, y) top-left position the player spawns at. A player
+        spawning inside a platform is pushed out of it first.
+    :type start: tuple
+    :param workers: The number of worker processes, 1 to search in this process.
+    :type workers: int
+    :param level_data: The level JSON data, needed by the workers.
+    :type level_data: dict or None
+    :return: The set of reachable states and the set of reachable cells.
+    :rtype: tuple
+    """
+    frontier = set()
+    cells = set()
+    rect = pygame.Rect(start, (geometry.width, geometry.height))
+    geometry.push_out(rect)
+    geometry.fly(rect.x, rect.y, 0, 0, frontier, cells)
+    seen = set(frontier)
+
+    executor = None
+    if workers > 1:
+        geometry.prepare()
+        executor = ProcessPoolExecutor(
+            workers,
+            multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                level_data,
+                geometry.jump.as_list(),
+                (geometry.width, geometry.height),
+                geometry.climbs,
+                geometry.arrivals,
+            ),
+        )
+    try:
+        while frontier:
+            states = sorted(frontier)
+            if executor is not None and len(states) >= PARALLEL_FRONTIER:
+                size = -(-len(states) // (workers * 4))
+                chunks = [states[i : i + size] for i in range(0, len(states), size)]
+                results = executor.map(_expand_chunk, chunks)
+            else:
+                out = set()
+                for state in states:
+                    geometry.expand(state, out, cells)
+                results = [(out, set())]
+            frontier = set()
+            for out, covered in results:
+                cells |= covered
+                frontier |= out
+            frontier -= seen
+            seen |= frontier
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return seen, cells
+
+
+def spawn_rects(level_data):
+    """
+    Get the rects of the enemy and gun spawns of a level.
+
+    :param level_data: The level JSON data.
+    :type level_data: dict
+    :return: A list of (type name, rect) tuples.
+    """
+    spawns = []
+    for (x, y), kind in zip(
+        level_data.get("enemy_spawns", []), level_data.get("enemy_types", [])
+    ):
+        spawns.append((kind, pygame.Rect(x, y, *ENEMY_SIZES.get(kind, (30, 30)))))
+    if level_data.get("gun_spawn"):
+        x, y = level_data["gun_spawn"]
+        spawns.append(("Gun", pygame.Rect(x, y, *GUN_SIZE)))
+    return spawns
+
+
+def analyze_level(level_data, jump=None, player_size=PLAYER_SIZE, workers=1):
+    """
+    Check which parts of a level the player can reach from its spawn.
+
+    A spawn counts as reachable if the player can touch it, standing or in the air.
+    A surface counts as reachable if the player can stand on it; surfaces the player
+    cannot stand on at all, e.g. covered by another platform, are left out.
+
+    :param level_data: The level JSON data.
+    :type level_data: dict
+    :param jump: The player's jump physics, or None for the default.
+    :type jump: JumpProfile or None
+    :param player_size: The width and height of the player.
+    :type player_size: tuple
+    :param workers: The number of worker processes.
+    :type workers: int
+    :return: The report: whether everything spawned can be reached, the spawns, the
+        unreachable surfaces, the number of reachable standing positions and cells,
+        and the physics used; plus "states" and "cells" with the sets found, which
+        are not JSON compatible.
+    :rtype: dict
+    """
+    start_time = time.perf_counter()
+    geometry = LevelGeometry(level_data, jump, player_size)
+    spawn_x, spawn_y = level_data.get("player_spawn", (0, 0))
+    start = (spawn_x - geometry.width // 2, spawn_y - geometry.height // 2)
+    states, cells = search(geometry, start, workers, level_data)
+
+    spawns = []
+    for kind, rect in spawn_rects(level_data):
+        spawns.append(
+            {
+                "type": kind,
+                "position": [rect.x, rect.y],
+                "reachable": geometry.touches(rect, cells),
+            }
+        )
+
+    by_bottom = {}
+    for x, bottom in states:
+        by_bottom.setdefault(bottom, []).append(x)
+    unreachable = []
+    for solid, hazard in zip(geometry.solids, geometry.hazards):
+        if hazard:
+            continue
+        xs = by_bottom.get(solid.top, ())
+        if any(solid.left - geometry.width < x < solid.right for x in xs):
+            continue
+        spots = (solid.left, solid.centerx - geometry.width // 2, solid.right - geometry.width)
+        standable = any(
+            not geometry.hits(
+                geometry.solid_grid,
+                geometry.solids,
+                geometry.player_rect(spot, solid.top),
+            )
+            for spot in spots
+        )
+        if standable:
+            unreachable.append(list(solid))
+
+    return {
+        "playable": all(spawn["reachable"] for spawn in spawns),
+        "spawns": spawns,
+        "unreachable_spawns": sum(not spawn["reachable"] for spawn in spawns),
+        "unreachable_surfaces": unreachable,
+        "standing_positions": len(states),
+        "reachable_cells": len(cells),
+        "physics": {
+            "jump_power": geometry.jump.jump_power,
+            "gravity": geometry.jump.gravity,
+            "max_speed": geometry.jump.run_speed,
+            "player_size": [geometry.width, geometry.height],
+        },
+        "workers": workers,
+        "seconds": time.perf_counter() - start_time,
+        "states": states,
+        "cells": cells,
+    }
+
+
+def render_map(level_data, report, path, max_size=4096):
+    """
+    Draw a reachability map of a level to an image file.
+
+    The area the player can reach is light green, the platforms have their editor colours,
+    surfaces that cannot be reached are outlined red, the positions the player can
+    stand at are dark green, and spawns are circled blue if they can be reached and
+    red if not. The player spawn is yellow.
+
+    :param level_data: The level JSON data.
+    :type level_data: dict
+    :param report: The report of analyze_level.
+    :type report: dict
+    :param path: The image file to write, e.g. a .png.
+    :type path: str
+    :param max_size: The longest side of the image in pixels; larger levels are
+        scaled down.
+    :type max_size: int
+    :return: None
+    """
+    world_width = level_data.get("world_width", WORLD_WIDTH)
+    world_height = level_data.get("world_height", WORLD_HEIGHT)
+    scale = min(1.0, max_size / max(world_width, world_height))
+
+    def scaled(rect):
+        return pygame.Rect(
+            int(rect[0] * scale),
+            int(rect[1] * scale),
+            max(1, int(rect[2] * scale)),
+            max(1, int(rect[3] * scale)),
+        )
+
+    surface = pygame.Surface((int(world_width * scale), int(world_height * scale)))
+    surface.fill((255, 255, 255))
+    width, height = report["physics"]["player_size"]
+    for cx, cy in report["cells"]:
+        surface.fill(
+            (190, 240, 190),
+            scaled(
+                (
+                    cx * COVER_CELL + COVER_CELL // 2 - width // 2,
+                    cy * COVER_CELL + COVER_CELL // 2 - height // 2,
+                    width,
+                    height,
+                )
+            ),
+        )
+    for plat in level_data["platforms"]:
+        if plat["width"] > 0 and plat["height"] > 0:
+            surface.fill(
+                PLATFORM_COLORS.get(plat["type"], (0, 0, 0)),
+                scaled((plat["x"], plat["y"], plat["width"], plat["height"])),
+            )
+    for rect in report["unreachable_surfaces"]:
+        pygame.draw.rect(surface, (255, 0, 0), scaled(rect).inflate(4, 4), 2)
+    for x, bottom in report["states"]:
+        surface.fill((0, 120, 0), scaled((x, bottom - 2, width, 2)))
+    for spawn in report["spawns"]:
+        x, y = spawn["position"]
+        color = (0, 0, 255) if spawn["reachable"] else (255, 0, 0)
+        pygame.draw.circle(
+            surface, color, (int(x * scale), int(y * scale)), max(4, int(20 * scale)), 2
+        )
+    spawn_x, spawn_y = level_data.get("player_spawn", (0, 0))
+    pygame.draw.circle(
+        surface, (255, 215, 0), (int(spawn_x * scale), int(spawn_y * scale)), 6
+    )
+    pygame.image.save(surface, path)
+
+
+def analyze_file(level_file, out_dir, workers=1, image=True):
+    """
+    Analyze a level file and write its JSON report and reachability map.
+
+    :param level_file: The path of the level JSON file.
+    :type level_file: str
+    :param out_dir: The directory to write the report and map to.
+    :type out_dir: str
+    :param workers: The number of worker processes.
+    :type workers: int
+    :param image: Whether to write the map.
+    :type image: bool
+    :return: The JSON compatible report.
+    :rtype: dict
+    """
+    with open(level_file, "r") as f:
+        level_data = json.load(f)
+    report = analyze_level(level_data, workers=workers)
+    os.makedirs(out_dir, exist_ok=True)
+    name = os.path.splitext(os.path.basename(level_file))[0]
+    if image:
+        render_map(level_data, report, os.path.join(out_dir, f"{name}.png"))
+    del report["states"], report["cells"]
+    report = {"level": level_file, **report}
+    with open(os.path.join(out_dir, f"{name}.json"), "w") as f:
+        json.dump(report, f, indent=4)
+    return report
+
+
+def main():
+    """
+    Analyze levels and print whether their spawns can be reached.
+
+    Exits with status 1 if a level has an unreachable spawn.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Check that levels can be played")
+    parser.add_argument("levels", nargs="*", help="level files, default all levels")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default=PLAYABILITY_REPORT_PATH)
+    parser.add_argument("--no-image", action="store_true")
+    args = parser.parse_args()
+
+    failed = False
+    for level_file in args.levels or sorted(glob.glob(LEVEL_PATH + "*.json")):
+        report = analyze_file(level_file, args.out, args.workers, not args.no_image)
+        failed = failed or not report["playable"]
+        print(
+            f"{level_file}: {'playable' if report['playable'] else 'NOT PLAYABLE'}, "
+            f"{report['unreachable_spawns']}/{len(report['spawns'])} spawns and "
+            f"{len(report['unreachable_surfaces'])} surfaces unreachable, "
+            f"{report['standing_positions']} positions in {report['seconds']:.2f} s"
+        )
+        for spawn in report["spawns"]:
+            if not spawn["reachable"]:
+                print(f"    unreachable {spawn['type']} at {spawn['position']}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,8 @@ import time
 import pygame
 from settings import *
 from sprite_loader import SpriteLoader
-from platforms import (
-    Platform,
-    LadderPlatform,
-    DeadlyPlatform,
-    SlipperyPlatform,
-    TeleporterPlatform,
-)
-from gun import Gun, Projectile
+from gun import Gun
+from projectile import OWNER_PLAYER
 from debug_logger import logger
 
 
@@ -34,7 +28,8 @@ class Player(pygame.sprite.Sprite):
         self.current_frame = 0
         self.animation_delay = 100
         self.ladder_animation_delay = 150
-        self.last_update = pygame.time.get_ticks()
+        self.last_update = self.game.get_ticks()
+        self.cooldowns = {}
 
         self.base_image = self.walking_frames[0]
         self.image = self.base_image.copy()
@@ -45,11 +40,11 @@ class Player(pygame.sprite.Sprite):
         self.vel_x = 0
         self.acceleration = 0.1
         self.slippery_acceleration = 0.9
-        self.max_speed = 5
+        self.max_speed = PLAYER_MAX_SPEED
         self.slippery_max_speed = 100
-        self.jump_power = -13
+        self.jump_power = PLAYER_JUMP_POWER
         self.sticky_jump_power = self.jump_power * 0.3
-        self.gravity = 0.8
+        self.gravity = PLAYER_GRAVITY
         self.on_ground = False
         self.platformtype = None
         self.ladder_y = 0
@@ -61,7 +56,8 @@ class Player(pygame.sprite.Sprite):
         self.ladder_exit_threshold = 20
         self.has_gun = False
         self.facing_right = True
-        self.projectiles = pygame.sprite.Group()
+        self.projectile_speed = 15
+        self.projectile_damage = 10
         self.gun_offset_x = 20
         self.gun_offset_y = 0
         self.gun_image = pygame.Surface((20, 10))
@@ -92,7 +88,7 @@ class Player(pygame.sprite.Sprite):
         :return: True if the player is invulnerable to the source, False otherwise.
         """
         source_id = id(source)
-        current_time = pygame.time.get_ticks()
+        current_time = self.game.get_ticks()
 
         if source_id in self.invulnerable_timers:
             if (
@@ -114,14 +110,14 @@ class Player(pygame.sprite.Sprite):
         and manages the player's invulnerability status and flickering effect when invulnerable.
 
         Additionally, it processes player input, applies gravity when not on a ladder
-        or when moving downwards, and moves the player. The player's projectiles are also
-        updated, checking for collisions with platforms and enemies.
+        or when moving downwards, and moves the player. Hits between the player's
+        projectiles and enemies are resolved by the game's collision phase.
         """
         if self.game.debug_mode:
             start_time = time.time()
             
-        current_time = pygame.time.get_ticks()
-        keys = pygame.key.get_pressed()
+        current_time = self.game.get_ticks()
+        keys = self.game.get_pressed()
 
         old_centerx = self.rect.centerx
         old_bottom = self.rect.bottom
@@ -200,15 +196,6 @@ class Player(pygame.sprite.Sprite):
             self.apply_gravity()
         self.move()
 
-        for projectile in self.projectiles:
-            if projectile.check_collisions(self.game.platforms):
-                continue
-
-            for enemy in self.game.enemies:
-                if projectile.rect.colliderect(enemy.rect):
-                    enemy.take_damage(projectile.damage)
-                    projectile.kill()
-
         if self.game.debug_mode:
             logger.log_performance("Player update", start_time)
             logger.trace(
@@ -227,13 +214,15 @@ class Player(pygame.sprite.Sprite):
         be called and the last call time will be updated. Otherwise, the function will
         not be called and None will be returned.
 
+        The time is the game's simulation time and the last call time is kept per
+        player in its cooldowns dict, so players of different games or levels do not
+        share cooldowns.
+
         :param cooldown_period: The time in milliseconds that the function must wait
         after being called before it can be called again.
         """
         def decorator(func):
-            last_called = [0]
-
-            def wrapper(*args, **kwargs):
+            def wrapper(self, *args, **kwargs):
                 """
                 Wrapper function to enforce a cooldown period on the decorated function.
 
@@ -242,15 +231,16 @@ class Player(pygame.sprite.Sprite):
                 decorated function is executed, and the last call time is updated. Otherwise, the
                 function is not executed, and None is returned.
 
+                :param self: The player.
                 :param args: Positional arguments to pass to the decorated function.
                 :param kwargs: Keyword arguments to pass to the decorated function.
                 :return: The result of the decorated function if the cooldown period has passed; otherwise, None.
                 """
 
-                current_time = pygame.time.get_ticks()
-                if current_time - last_called[0] >= cooldown_period:
-                    last_called[0] = current_time
-                    return func(*args, **kwargs)
+                current_time = self.game.get_ticks()
+                if current_time - self.cooldowns.get(func.__name__, 0) >= cooldown_period:
+                    self.cooldowns[func.__name__] = current_time
+                    return func(self, *args, **kwargs)
                 else:
                     return None
 
@@ -285,7 +275,7 @@ class Player(pygame.sprite.Sprite):
             logger.warning(f"Player took {amount} damage from {source.__class__.__name__}. Health: {self.health}/{self.max_health}")
 
             if source:
-                self.invulnerable_timers[id(source)] = pygame.time.get_ticks()
+                self.invulnerable_timers[id(source)] = self.game.get_ticks()
 
             self.image.set_alpha(128)
 
@@ -332,7 +322,7 @@ class Player(pygame.sprite.Sprite):
 
         :return: None
         """
-        keys = pygame.key.get_pressed()
+        keys = self.game.get_pressed()
 
         if keys[pygame.K_SPACE]:
             if self.on_ladder_top or (self.in_ladder and self.on_ground):
@@ -491,14 +481,18 @@ class Player(pygame.sprite.Sprite):
         spawn_y = self.rect.centery
         direction = 1 if self.facing_right else -1
 
-        projectile = Projectile(self.game, spawn_x, spawn_y, direction)
-        print(f"Creating projectile at: ({spawn_x}, {spawn_y})")
-
-        self.projectiles.add(projectile)
-        self.game.all_sprites.add(projectile)
-        print(
-            f"Projectile groups: player={len(self.projectiles)}, game={len(self.game.all_sprites)}"
+        registry = self.game.platform_registry
+        self.game.projectiles.spawn(
+            spawn_x,
+            spawn_y,
+            self.projectile_speed * direction,
+            0,
+            self.projectile_damage,
+            OWNER_PLAYER,
+            self,
+            (registry.solids, registry.teleporters),
         )
+        logger.debug(f"Creating projectile at: ({spawn_x}, {spawn_y})")
 
     def apply_gravity(self):
         """
@@ -530,7 +524,7 @@ class Player(pygame.sprite.Sprite):
         if not self.in_ladder or self.vel_y > 0:
             self.rect.y += self.vel_y
 
-        keys = pygame.key.get_pressed()
+        keys = self.game.get_pressed()
         if (
             not keys[pygame.K_LEFT]
             and not keys[pygame.K_RIGHT]
@@ -538,167 +532,108 @@ class Player(pygame.sprite.Sprite):
         ):
             self.vel_x = 0
 
-    def handle_platform_collision(self, platforms):
+    def handle_platform_collision(self):
         """
         Handle collisions between the player and platforms.
 
-        This method checks for collisions with various types of platforms such as
-        TeleporterPlatform, LadderPlatform, DeadlyPlatform, and SlipperyPlatform.
-        It adjusts the player's position and state based on the type of collision.
+        This method queries the typed platform collections of the level for teleporters,
+        ladders and solid platforms overlapping the player and adjusts the player's
+        position and state based on the type of collision.
 
-        If the player collides with a TeleporterPlatform, it teleports the player
-        to the paired teleporter after a cooldown period. If the player collides
-        with a LadderPlatform, it allows the player to climb the ladder. Collisions
-        with DeadlyPlatform result in the player's death. SlipperyPlatform affects
-        the player's movement speed.
+        If the player collides with a teleporter, it teleports the player to the paired
+        teleporter after a cooldown period. If the player collides with a ladder, it
+        allows the player to climb the ladder. Collisions with hazards result in the
+        player's death. Surface modifiers such as slippery platforms affect the player's
+        movement speed.
 
         The method also handles setting the player's on_ground, in_ladder, and
         on_ladder_top flags, as well as adjusting the player's velocity based on
         collision overlaps.
 
-        :param platforms: A list of platforms to check for collisions with.
-        :type platforms: list
         :return: None
         """
 
-        keys = pygame.key.get_pressed()
+        keys = self.game.get_pressed()
+        registry = self.game.platform_registry
         was_in_ladder = self.in_ladder
         self.on_ground = False
         old_ladder = self.current_ladder
 
-        for platform in platforms:
-            if isinstance(platform, TeleporterPlatform):
-                if self.rect.colliderect(platform.rect):
-                    current_time = pygame.time.get_ticks()
-                    if current_time - platform.last_teleport >= platform.cooldown:
-                        for other in platforms:
-                            if (
-                                isinstance(other, TeleporterPlatform)
-                                and other.pair_id == platform.pair_id
-                                and other != platform
-                            ):
-                                self.vel_x = 0
-                                self.vel_y = 0
-                                self.rect.centerx = other.rect.centerx
-                                self.rect.bottom = other.rect.top
-                                platform.last_teleport = current_time
-                                other.last_teleport = current_time
-                                return
+        if self.game.teleporter_network.teleport(self, self.game.get_ticks()):
+            return
+
         touching_ladder = False
-        for platform in platforms:
-            if isinstance(platform, TeleporterPlatform):
-                continue
-            if isinstance(platform, LadderPlatform) and self.rect.colliderect(
-                platform.rect
-            ):
-                if isinstance(platform, DeadlyPlatform):
-                    self.game.handle_player_death()
-                    break
-                touching_ladder = True
-                if not self.in_ladder:
-                    self.rect.centerx = platform.rect.centerx
-                self.in_ladder = True
-                self.platformtype = 2
-                self.current_ladder = platform
-                break
+        for platform in registry.ladders.collide(self.rect):
+            touching_ladder = True
+            if not self.in_ladder:
+                self.rect.centerx = platform.rect.centerx
+            self.in_ladder = True
+            self.platformtype = registry.ladders.platformtype
+            self.current_ladder = platform
+            break
 
         if not touching_ladder:
             self.in_ladder = False
             self.current_ladder = None
             self.on_ladder_top = False
 
-        for platform in platforms:
-            if isinstance(platform, TeleporterPlatform):
-                if self.rect.colliderect(platform.rect):
-                    current_time = pygame.time.get_ticks()
-                    if current_time - platform.last_teleport >= platform.cooldown:
-                        for other in platforms:
-                            if (
-                                isinstance(other, TeleporterPlatform)
-                                and other.pair_id == platform.pair_id
-                                and other != platform
-                            ):
-                                self.vel_x = 0
-                                self.vel_y = 0
-                                self.rect.centerx = other.rect.centerx
-                                self.rect.bottom = other.rect.top
-                                platform.last_teleport = current_time
-                                other.last_teleport = current_time
-                                return
-        for platform in platforms:
+        for platform in registry.ladders.collide(self.rect):
+            overlap_left = self.rect.right - platform.rect.left
+            overlap_right = platform.rect.right - self.rect.left
+            overlap_top = self.rect.bottom - platform.rect.top
+            overlap_bottom = platform.rect.bottom - self.rect.top
+
+            min_overlap = min(overlap_left, overlap_right, overlap_top, overlap_bottom)
+
+            if min_overlap == overlap_top and self.vel_y >= 0:
+                self.on_ladder_top = True
+                if not keys[pygame.K_DOWN]:
+                    self.rect.bottom = platform.rect.top
+                    self.vel_y = 0
+                    self.on_ground = True
+
+        for platform in registry.solids.query(self.rect):
             if self.rect.colliderect(platform.rect):
-                if isinstance(platform, TeleporterPlatform):
-                    continue
-                else:
-                    overlap_left = self.rect.right - platform.rect.left
-                    overlap_right = platform.rect.right - self.rect.left
-                    overlap_top = self.rect.bottom - platform.rect.top
-                    overlap_bottom = platform.rect.bottom - self.rect.top
-
-                    min_overlap = min(
-                        overlap_left, overlap_right, overlap_top, overlap_bottom
-                    )
-
-                    if isinstance(platform, LadderPlatform):
-                        if min_overlap == overlap_top and self.vel_y >= 0:
-                            self.on_ladder_top = True
-                            if not keys[pygame.K_DOWN]:
-                                self.rect.bottom = platform.rect.top
-                                self.vel_y = 0
-                                self.on_ground = True
-                        continue
-
-                    if min_overlap == overlap_top and self.vel_y >= 0:
-                        self.rect.bottom = platform.rect.top
-                        self.vel_y = 0
-                        self.on_ground = True
-                    elif min_overlap == overlap_bottom and self.vel_y < 0:
-                        self.rect.top = platform.rect.bottom
-                        self.vel_y = 0
-                    elif min_overlap == overlap_left and self.vel_x > 0:
-                        self.rect.right = platform.rect.left
-                        self.vel_x = 0
-                    elif min_overlap == overlap_right and self.vel_x < 0:
-                        self.rect.left = platform.rect.right
-                        self.vel_x = 0
-
-                    if not self.in_ladder:
-                        if isinstance(platform, DeadlyPlatform):
-                            self.game.handle_player_death()
-                            return
-                        elif isinstance(platform, SlipperyPlatform):
-                            self.platformtype = 4
-                        else:
-                            self.platformtype = 1
-
-    def handle_teleporter(self, platform, all_platforms):
+                overlap_left = self.rect.right - platform.rect.left
+                overlap_right = platform.rect.right - self.rect.left
+                overlap_top = self.rect.bottom - platform.rect.top
+                overlap_bottom = platform.rect.bottom - self.rect.top
+
+                min_overlap = min(
+                    overlap_left, overlap_right, overlap_top, overlap_bottom
+                )
+
+                if min_overlap == overlap_top and self.vel_y >= 0:
+                    self.rect.bottom = platform.rect.top
+                    self.vel_y = 0
+                    self.on_ground = True
+                elif min_overlap == overlap_bottom and self.vel_y < 0:
+                    self.rect.top = platform.rect.bottom
+                    self.vel_y = 0
+                elif min_overlap == overlap_left and self.vel_x > 0:
+                    self.rect.right = platform.rect.left
+                    self.vel_x = 0
+                elif min_overlap == overlap_right and self.vel_x < 0:
+                    self.rect.left = platform.rect.right
+                    self.vel_x = 0
+
+                if not self.in_ladder:
+                    if platform in registry.hazards:
+                        self.game.handle_player_death()
+                        return
+                    self.platformtype = registry.surface_type(platform)
+
+    def handle_teleporter(self):
         """
         Handle teleporting the player when they collide with a TeleporterPlatform.
 
-        If the player has collided with a TeleporterPlatform and the cooldown period
-        has passed, this method teleports the player to the paired teleporter.
+        If the player is standing on a paired teleporter and the cooldown period of the
+        pair has passed, the level's teleporter network moves the player to the partner
+        teleporter.
 
-        :param platform: The TeleporterPlatform that the player has collided with.
-        :type platform: TeleporterPlatform
-        :param all_platforms: The list of all platforms in the level.
-        :type all_platforms: list
-        :return: None
+        :return: True if the player was teleported, False otherwise.
         """
-        current_time = pygame.time.get_ticks()
-        if current_time - platform.last_teleport >= platform.cooldown:
-            for other in all_platforms:
-                if (
-                    isinstance(other, TeleporterPlatform)
-                    and other.pair_id == platform.pair_id
-                    and other != platform
-                ):
-                    self.vel_x = 0
-                    self.vel_y = 0
-                    self.rect.centerx = other.rect.centerx
-                    self.rect.bottom = other.rect.top
-                    platform.last_teleport = current_time
-                    other.last_teleport = current_time
-                    break
+        return self.game.teleporter_network.teleport(self, self.game.get_ticks())
 
     def check_gun_collision(self, gun):
         """
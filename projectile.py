@@ -1,80 +1,480 @@
+from bisect import bisect_left
 import pygame
-import math
+from settings import PROJECTILE_SIZE, PROJECTILE_CAPACITY, COLLISION_BACKEND, RED
+from collision import straight_line_lifetime
+from debug_logger import logger
+from image_cache import get_image
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-class EnemyProjectile(pygame.sprite.Sprite):
-    def __init__(self, game, x, y, angle):
+
+OWNER_PLAYER = 0
+OWNER_ENEMY = 1
+
+
+class ProjectileSystem:
+    def __init__(self, game, capacity=PROJECTILE_CAPACITY, backend=COLLISION_BACKEND):
         """
-        Initialize an EnemyProjectile instance.
+        Initialize an empty projectile system.
+
+        Every live projectile of the level is a row in a set of parallel arrays instead
+        of its own sprite. The live rows are packed at the front of the arrays, so an
+        update moves all projectiles in one vectorized step and drawing blits one shared
+        image at every position. The arrays grow by doubling when they are full and are
+        never shrunk, so firing does not allocate once the level has warmed up.
 
-        :param game: The game object that owns this projectile.
-        :param x: The x-coordinate of the projectile's starting position.
-        :param y: The y-coordinate of the projectile's starting position.
-        :param angle: The angle in which the projectile should travel in radians.
+        The frame in which a projectile hits a platform or leaves the world is worked out
+        once at spawn, so each update only moves the projectiles and counts down their
+        lifetimes. Hits on the player and enemies are resolved by the game's collision
+        phase with collide_rect and closest_hits.
 
         Attributes:
-        image: The visual representation of the projectile.
-        rect: The rectangle representing the projectile's position and size.
-        speed: The speed at which the projectile travels.
-        vel_x: The x component of the projectile's velocity.
-        vel_y: The y component of the projectile's velocity.
-        damage: The amount of damage the projectile inflicts on the player.
-        """
-        super().__init__()
+        game: The game object that owns the projectiles.
+        backend: "numpy" or "python", chosen like the platform collision kernel.
+        capacity: The number of rows the arrays can hold.
+        count: The number of used rows, live or killed since the last compaction.
+        pos_x, pos_y: The exact position of the top left corner of each projectile.
+        x, y: The position rounded to whole pixels, as a rect would store it.
+        vel_x, vel_y: The distance each projectile travels per update.
+        damage: The damage each projectile deals.
+        owner: OWNER_PLAYER or OWNER_ENEMY.
+        lifetime: The number of updates until the projectile is removed, or -1 if it
+            never stops.
+        alive: Whether the row holds a live projectile.
+        sources: The entity that fired each projectile.
+        image: The image drawn for every projectile.
+
+        :param game: The game object that owns the projectiles.
+        :type game: Game
+        :param capacity: The number of projectiles to allocate room for up front.
+        :type capacity: int
+        :param backend: "auto", "numpy" or "python".
+        :type backend: str
+        """
         self.game = game
-        self.image = pygame.Surface((8, 8))
-        self.image.fill((255, 0, 0))
-        self.rect = self.image.get_rect()
-        self.rect.centerx = x
-        self.rect.centery = y
-        self.speed = 8
-        self.vel_x = math.cos(angle) * self.speed
-        self.vel_y = math.sin(angle) * self.speed
-        self.damage = 10
+        if backend == "auto":
+            backend = "numpy" if np is not None else "python"
+        elif backend == "numpy" and np is None:
+            logger.warning("NumPy is not installed, using the python projectile backend")
+            backend = "python"
+        self.backend = backend
+        self.size = PROJECTILE_SIZE
+        self.image = get_image("Projectile", (self.size, self.size), RED)
+        self.count = 0
+        self.dirty = False
+        self.capacity = 0
+        self._allocate(max(1, capacity))
 
-    def check_collisions(self, platforms):
+    def _allocate(self, capacity):
         """
-        Check if the projectile has collided with any platforms.
+        Resize the arrays to the given capacity, keeping the used rows.
 
-        :param platforms: A list of platforms to check for collisions with.
-        :return: True if the projectile has collided with a platform, False otherwise.
+        :param capacity: The new number of rows.
+        :type capacity: int
+        :return: None
         """
+        count = self.count
+        if self.backend == "numpy":
+            layout = (
+                ("pos_x", np.float64),
+                ("pos_y", np.float64),
+                ("vel_x", np.float64),
+                ("vel_y", np.float64),
+                ("x", np.int64),
+                ("y", np.int64),
+                ("damage", np.int64),
+                ("owner", np.int8),
+                ("lifetime", np.int64),
+                ("alive", np.bool_),
+            )
+            for name, dtype in layout:
+                array = np.zeros(capacity, dtype=dtype)
+                if count:
+                    array[:count] = getattr(self, name)[:count]
+                setattr(self, name, array)
+        else:
+            for name, fill in (
+                ("pos_x", 0.0),
+                ("pos_y", 0.0),
+                ("vel_x", 0.0),
+                ("vel_y", 0.0),
+                ("x", 0),
+                ("y", 0),
+                ("damage", 0),
+                ("owner", 0),
+                ("lifetime", 0),
+                ("alive", False),
+            ):
+                values = getattr(self, name, [])[:count]
+                setattr(self, name, values + [fill] * (capacity - count))
+        sources = getattr(self, "sources", [])[:count]
+        self.sources = sources + [None] * (capacity - count)
+        self.capacity = capacity
 
-        for platform in platforms:
-            if self.rect.colliderect(platform.rect):
-                self.kill()
-                return True
-        return False
+    def __len__(self):
+        self.compact()
+        return self.count
 
-    def update(self):
+    def count_owned(self, owner):
         """
-        Update the enemy projectile's position and handle collisions.
+        Get the number of live projectiles fired by one side.
 
-        This method updates the position of the projectile based on its velocity.
-        It checks for collisions with platforms and the player, dealing damage
-        to the player if a collision occurs and the player is not invulnerable.
-        If the projectile goes outside the world boundaries or collides with a
-        platform, it is destroyed.
+        :param owner: OWNER_PLAYER or OWNER_ENEMY.
+        :type owner: int
+        :return: The number of live projectiles.
+        :rtype: int
+        """
+        self.compact()
+        if self.backend == "numpy":
+            return int(np.count_nonzero(self.owner[: self.count] == owner))
+        return self.owner[: self.count].count(owner)
+
+    def clear(self):
+        """
+        Remove every projectile, keeping the allocated arrays.
 
         :return: None
         """
+        for i in range(self.count):
+            self.alive[i] = False
+            self.sources[i] = None
+        self.count = 0
+        self.dirty = False
+
+    def spawn(self, x, y, vel_x, vel_y, damage, owner, source=None, collections=()):
+        """
+        Fire a projectile from the given center point.
+
+        :param x: The x-coordinate of the projectile's center.
+        :param y: The y-coordinate of the projectile's center.
+        :param vel_x: The horizontal distance travelled per update.
+        :param vel_y: The vertical distance travelled per update.
+        :param damage: The damage the projectile deals on a hit.
+        :type damage: int
+        :param owner: OWNER_PLAYER or OWNER_ENEMY.
+        :type owner: int
+        :param source: The entity that fired the projectile.
+        :param collections: The platform collections that stop the projectile. All
+            platforms stop it if the sequence is empty.
+        :return: The row of the new projectile.
+        :rtype: int
+        """
+        rect = pygame.Rect(0, 0, self.size, self.size)
+        rect.center = (x, y)
+        lifetime = straight_line_lifetime(
+            rect,
+            vel_x,
+            vel_y,
+            self.game.platform_registry,
+            collections,
+            self.game.world_width,
+            self.game.world_height,
+        )
 
-        self.rect.x += self.vel_x
-        self.rect.y += self.vel_y
+        if self.count == self.capacity:
+            self.compact()
+            if self.count == self.capacity:
+                self._allocate(self.capacity * 2)
 
-        if self.check_collisions(self.game.platforms):
+        i = self.count
+        self.pos_x[i] = float(rect.x)
+        self.pos_y[i] = float(rect.y)
+        self.x[i] = rect.x
+        self.y[i] = rect.y
+        self.vel_x[i] = vel_x
+        self.vel_y[i] = vel_y
+        self.damage[i] = damage
+        self.owner[i] = owner
+        self.lifetime[i] = -1 if lifetime is None else lifetime
+        self.alive[i] = True
+        self.sources[i] = source
+        self.count += 1
+        return i
+
+    def kill(self, index):
+        """
+        Remove a projectile. The row is reused after the next compaction.
+
+        :param index: The row of the projectile.
+        :type index: int
+        :return: None
+        """
+        self.alive[index] = False
+        self.sources[index] = None
+        self.dirty = True
+
+    def compact(self):
+        """
+        Move the live projectiles to the front of the arrays, keeping their order.
+
+        :return: None
+        """
+        if not self.dirty:
             return
+        count = self.count
+        if self.backend == "numpy":
+            keep = np.flatnonzero(self.alive[:count])
+            live = len(keep)
+            for array in (
+                self.pos_x,
+                self.pos_y,
+                self.vel_x,
+                self.vel_y,
+                self.x,
+                self.y,
+                self.damage,
+                self.owner,
+                self.lifetime,
+            ):
+                array[:live] = array[keep]
+            self.alive[:live] = True
+            self.alive[live:count] = False
+            keep = keep.tolist()
+        else:
+            keep = [i for i in range(count) if self.alive[i]]
+            live = len(keep)
+            for values in (
+                self.pos_x,
+                self.pos_y,
+                self.vel_x,
+                self.vel_y,
+                self.x,
+                self.y,
+                self.damage,
+                self.owner,
+                self.lifetime,
+                self.alive,
+            ):
+                values[:live] = [values[i] for i in keep]
+            for i in range(live, count):
+                self.alive[i] = False
+        self.sources[:live] = [self.sources[i] for i in keep]
+        for i in range(live, count):
+            self.sources[i] = None
+        self.count = live
+        self.dirty = False
 
-        if self.rect.colliderect(self.game.player.rect):
-            if not self.game.player.is_invulnerable_to(self):
-                self.game.player.take_damage(self.damage, self)
-                self.kill()
-                return
-
-        if (
-            self.rect.right < 0
-            or self.rect.left > self.game.world_width
-            or self.rect.bottom < 0
-            or self.rect.top > self.game.world_height
-        ):
-            self.kill()
+    def update(self):
+        """
+        Move every projectile and remove the ones whose lifetime ran out.
+
+        :return: None
+        """
+        self.compact()
+        count = self.count
+        if count == 0:
+            return
+
+        if self.backend == "numpy":
+            self.pos_x[:count] += self.vel_x[:count]
+            self.pos_y[:count] += self.vel_y[:count]
+            self.x[:count] = np.round(self.pos_x[:count])
+            self.y[:count] = np.round(self.pos_y[:count])
+            lifetime = self.lifetime[:count]
+            counting = lifetime >= 0
+            lifetime[counting] -= 1
+            expired = counting & (lifetime <= 0)
+            if expired.any():
+                self.alive[:count][expired] = False
+                for i in np.flatnonzero(expired).tolist():
+                    self.sources[i] = None
+                self.dirty = True
+        else:
+            for i in range(count):
+                self.pos_x[i] += self.vel_x[i]
+                self.pos_y[i] += self.vel_y[i]
+                self.x[i] = round(self.pos_x[i])
+                self.y[i] = round(self.pos_y[i])
+                if self.lifetime[i] >= 0:
+                    self.lifetime[i] -= 1
+                    if self.lifetime[i] <= 0:
+                        self.kill(i)
+        self.compact()
+
+    def rect(self, index):
+        """
+        Get the rectangle of a projectile.
+
+        :param index: The row of the projectile.
+        :type index: int
+        :return: The projectile's rectangle.
+        :rtype: pygame.Rect
+        """
+        return pygame.Rect(int(self.x[index]), int(self.y[index]), self.size, self.size)
+
+    def collide_rect(self, rect, owner):
+        """
+        Get the live projectiles of one side overlapping a rectangle.
+
+        :param rect: The area to test.
+        :type rect: pygame.Rect
+        :param owner: OWNER_PLAYER or OWNER_ENEMY.
+        :type owner: int
+        :return: A list of projectile rows in spawn order.
+        """
+        count = self.count
+        size = self.size
+        if self.backend == "numpy":
+            x = self.x[:count]
+            y = self.y[:count]
+            hit = (
+                self.alive[:count]
+                & (self.owner[:count] == owner)
+                & (x < rect.right)
+                & (x + size > rect.left)
+                & (y < rect.bottom)
+                & (y + size > rect.top)
+            )
+            return np.flatnonzero(hit).tolist()
+        return [
+            i
+            for i in range(count)
+            if self.alive[i]
+            and self.owner[i] == owner
+            and self.x[i] < rect.right
+            and self.x[i] + size > rect.left
+            and self.y[i] < rect.bottom
+            and self.y[i] + size > rect.top
+        ]
+
+    def closest_hits(self, targets, owner):
+        """
+        Find the target every projectile of one side hits.
+
+        The projectiles are sorted by x once, and every target only looks at the
+        projectiles whose x range can overlap its rect. When a projectile overlaps
+        several targets, the one whose center is closest to the projectile is kept, so
+        every projectile hits at most once.
+
+        :param targets: The entities that can be hit, each with a rect attribute.
+        :type targets: iterable
+        :param owner: The side whose projectiles are tested.
+        :type owner: int
+        :return: A list of (projectile_row, target) tuples in projectile order.
+        """
+        targets = list(targets)
+        if not targets or self.count == 0:
+            return []
+        if self.backend == "numpy":
+            return self._closest_hits_numpy(targets, owner)
+        return self._closest_hits_python(targets, owner)
+
+    def _closest_hits_numpy(self, targets, owner):
+        count = self.count
+        size = self.size
+        rows = np.flatnonzero(self.alive[:count] & (self.owner[:count] == owner))
+        if len(rows) == 0:
+            return []
+        order = rows[np.argsort(self.x[rows], kind="stable")]
+        sorted_x = self.x[order]
+
+        left = np.fromiter((t.rect.left for t in targets), np.int64, len(targets))
+        right = np.fromiter((t.rect.right for t in targets), np.int64, len(targets))
+        top = np.fromiter((t.rect.top for t in targets), np.int64, len(targets))
+        bottom = np.fromiter((t.rect.bottom for t in targets), np.int64, len(targets))
+        center_x = np.fromiter((t.rect.centerx for t in targets), np.int64, len(targets))
+        center_y = np.fromiter((t.rect.centery for t in targets), np.int64, len(targets))
+
+        first = np.searchsorted(sorted_x, left - size + 1, side="left")
+        last = np.searchsorted(sorted_x, right, side="left")
+        spans = last - first
+        total = int(spans.sum())
+        if total == 0:
+            return []
+        target = np.repeat(np.arange(len(targets)), spans)
+        offset = np.arange(total) - np.repeat(np.cumsum(spans) - spans, spans)
+        projectile = order[np.repeat(first, spans) + offset]
+
+        y = self.y[projectile]
+        hit = (y < bottom[target]) & (y + size > top[target])
+        projectile = projectile[hit]
+        target = target[hit]
+        if len(projectile) == 0:
+            return []
+
+        half = size // 2
+        dx = center_x[target] - (self.x[projectile] + half)
+        dy = center_y[target] - (self.y[projectile] + half)
+        distance = dx * dx + dy * dy
+        ranked = np.lexsort((target, distance, projectile))
+        projectile = projectile[ranked]
+        target = target[ranked]
+        keep = np.ones(len(projectile), dtype=np.bool_)
+        keep[1:] = projectile[1:] != projectile[:-1]
+        return [
+            (row, targets[t])
+            for row, t in zip(projectile[keep].tolist(), target[keep].tolist())
+        ]
+
+    def _closest_hits_python(self, targets, owner):
+        size = self.size
+        half = size // 2
+        rows = sorted(
+            (self.x[i], i)
+            for i in range(self.count)
+            if self.alive[i] and self.owner[i] == owner
+        )
+        sorted_x = [x for x, _ in rows]
+        closest = {}
+        for t, target in enumerate(targets):
+            rect = target.rect
+            start = bisect_left(sorted_x, rect.left - size + 1)
+            end = bisect_left(sorted_x, rect.right)
+            for x, i in rows[start:end]:
+                y = self.y[i]
+                if y < rect.bottom and y + size > rect.top:
+                    dx = rect.centerx - (x + half)
+                    dy = rect.centery - (y + half)
+                    key = (dx * dx + dy * dy, t)
+                    if i not in closest or key < closest[i]:
+                        closest[i] = key
+        return [(i, targets[closest[i][1]]) for i in sorted(closest)]
+
+    def draw(self, surface, camera, alpha=1.0):
+        """
+        Draw every projectile with the shared image.
+
+        :param surface: The surface to draw on.
+        :type surface: pygame.Surface
+        :param camera: The camera to draw through.
+        :type camera: Camera
+        :param alpha: How far the frame is between the previous and the current
+            simulation tick. Below 1 the projectiles are drawn that far along their
+            last step.
+        :type alpha: float
+        :return: None
+        """
+        self.compact()
+        count = self.count
+        if count == 0:
+            return
+        offset_x, offset_y = camera.camera.topleft
+        if alpha < 1.0:
+            back = 1.0 - alpha
+            if self.backend == "numpy":
+                xs = np.round(
+                    self.pos_x[:count] - self.vel_x[:count] * back + offset_x
+                ).tolist()
+                ys = np.round(
+                    self.pos_y[:count] - self.vel_y[:count] * back + offset_y
+                ).tolist()
+            else:
+                xs = [
+                    round(x - vx * back + offset_x)
+                    for x, vx in zip(self.pos_x[:count], self.vel_x[:count])
+                ]
+                ys = [
+                    round(y - vy * back + offset_y)
+                    for y, vy in zip(self.pos_y[:count], self.vel_y[:count])
+                ]
+        elif self.backend == "numpy":
+            xs = (self.x[:count] + offset_x).tolist()
+            ys = (self.y[:count] + offset_y).tolist()
+        else:
+            xs = [x + offset_x for x in self.x[:count]]
+            ys = [y + offset_y for y in self.y[:count]]
+        image = self.image
+        surface.blits([(image, position) for position in zip(xs, ys)], False)
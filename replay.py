@@ -0,0 +1,312 @@
+import argparse
+import json
+import random
+import pygame
+from settings import SIMULATION_RATE
+from headless import create_game, run_headless
+
+
+RECORDING_VERSION = 1
+
+# The keys the player reads; nothing else needs to be recorded to replay a run.
+GAMEPLAY_KEYS = (
+    pygame.K_LEFT,
+    pygame.K_RIGHT,
+    pygame.K_UP,
+    pygame.K_DOWN,
+    pygame.K_SPACE,
+    pygame.K_f,
+)
+
+
+class Recording:
+    def __init__(
+        self,
+        level,
+        seed=0,
+        start_tick=0,
+        camera=(0, 0),
+        tick_rate=SIMULATION_RATE,
+        start_update=0,
+    ):
+        """
+        Initialize an empty recording of the input of one run through a level.
+
+        The input is stored per simulation tick as a bit mask over the keys that were
+        used, and runs of ticks with the same mask are stored as one [count, mask]
+        pair, so holding a key for a second costs as much as tapping it once.
+
+        Attributes:
+        level: The path of the level the run was played on.
+        seed: The seed of the random module at the start of the run.
+        start_tick: The simulation tick of the game when the run started.
+        camera: The camera offset when the run started, which decides which enemies
+            are awake.
+        tick_rate: The simulation ticks per second the run was played at.
+        start_update: The update count of the game when the run started, which decides
+            which sleeping enemies update on which tick.
+        keys: The pygame key constants used, the bit of a key is its index.
+        runs: The [count, mask] pairs, in tick order.
+        checksum: The checksum of the game state after the last tick, or None.
+
+        :param level: The path of the level JSON file.
+        :type level: str
+        :param seed: The random seed of the run.
+        :type seed: int
+        :param start_tick: The simulation tick the run starts at.
+        :type start_tick: int
+        :param camera: The camera offset the run starts with.
+        :type camera: tuple
+        :param tick_rate: The simulation ticks per second.
+        :type tick_rate: int
+        :param start_update: The update count the run starts at.
+        :type start_update: int
+        """
+        self.level = level
+        self.seed = seed
+        self.start_tick = start_tick
+        self.camera = tuple(camera)
+        self.tick_rate = tick_rate
+        self.start_update = start_update
+        self.keys = []
+        self.runs = []
+        self.checksum = None
+        self.key_bits = {}
+        self.expanded = None
+
+    def __len__(self):
+        return sum(count for count, _ in self.runs)
+
+    @classmethod
+    def start(cls, game, seed=0):
+        """
+        Start recording a run through the game's current level.
+
+        The level must not have been played since it was loaded. The random module is
+        seeded with the seed.
+
+        :param game: The game about to be played.
+        :type game: Game
+        :param seed: The random seed of the run.
+        :type seed: int
+        :return: The empty recording.
+        :rtype: Recording
+        """
+        random.seed(seed)
+        return cls(
+            game.current_level,
+            seed,
+            game.simulation_ticks,
+            (game.camera.x, game.camera.y),
+            start_update=game.update_count,
+        )
+
+    def restore(self, game):
+        """
+        Put a game whose level was just loaded into the state the run started in.
+
+        :param game: The game.
+        :type game: Game
+        :return: None
+        """
+        random.seed(self.seed)
+        game.simulation_ticks = self.start_tick
+        game.update_count = self.start_update
+        game.camera.x, game.camera.y = self.camera
+        game.camera.camera.topleft = self.camera
+
+    def record(self, held_keys):
+        """
+        Append the keys held during one tick.
+
+        :param held_keys: The pygame key constants held during the tick.
+        :type held_keys: iterable of int
+        :return: None
+        """
+        mask = 0
+        for key in held_keys:
+            bit = self.key_bits.get(key)
+            if bit is None:
+                bit = self.key_bits[key] = len(self.keys)
+                self.keys.append(key)
+            mask |= 1 << bit
+        if self.runs and self.runs[-1][1] == mask:
+            self.runs[-1][0] += 1
+        else:
+            self.runs.append([1, mask])
+        self.expanded = None
+
+    def record_snapshot(self, snapshot):
+        """
+        Append the gameplay keys held in an input snapshot.
+
+        :param snapshot: The input snapshot of the tick.
+        :type snapshot: InputSnapshot
+        :return: None
+        """
+        self.record([key for key in GAMEPLAY_KEYS if snapshot[key]])
+
+    def keys_at(self, tick):
+        """
+        Get the keys held during a tick.
+
+        :param tick: The tick number, starting at 0.
+        :type tick: int
+        :return: A tuple of pygame key constants.
+        """
+        if self.expanded is None:
+            masks = {}
+            self.expanded = []
+            for count, mask in self.runs:
+                held = masks.get(mask)
+                if held is None:
+                    held = masks[mask] = tuple(
+                        key for bit, key in enumerate(self.keys) if mask >> bit & 1
+                    )
+                self.expanded.extend([held] * count)
+        if tick < len(self.expanded):
+            return self.expanded[tick]
+        return ()
+
+    def to_dict(self):
+        """
+        Convert the recording to JSON compatible data.
+
+        :return: The recording as a dict.
+        :rtype: dict
+        """
+        return {
+            "version": RECORDING_VERSION,
+            "level": self.level,
+            "seed": self.seed,
+            "start_tick": self.start_tick,
+            "camera": list(self.camera),
+            "tick_rate": self.tick_rate,
+            "start_update": self.start_update,
+            "ticks": len(self),
+            "keys": self.keys,
+            "runs": self.runs,
+            "checksum": self.checksum,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a recording from the data written by to_dict.
+
+        :param data: The stored recording.
+        :type data: dict
+        :return: The recording.
+        :rtype: Recording
+        """
+        if data.get("version") != RECORDING_VERSION:
+            raise ValueError(f"Unsupported recording version: {data.get('version')}")
+        recording = cls(
+            data["level"],
+            data["seed"],
+            data["start_tick"],
+            data["camera"],
+            data["tick_rate"],
+            data.get("start_update", 0),
+        )
+        recording.keys = list(data["keys"])
+        recording.key_bits = {key: bit for bit, key in enumerate(recording.keys)}
+        recording.runs = [list(run) for run in data["runs"]]
+        recording.checksum = data.get("checksum")
+        return recording
+
+    def save(self, path):
+        """
+        Write the recording to a JSON file.
+
+        :param path: The file to write.
+        :type path: str
+        :return: None
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a recording from a JSON file.
+
+        :param path: The file to read.
+        :type path: str
+        :return: The recording.
+        :rtype: Recording
+        """
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
+
+
+def replay(recording, game=None, render=False, state_logging=False):
+    """
+    Replay a recording headless, one Game.update per recorded tick, as fast as possible.
+
+    The random seed, the simulation time and the camera are restored to what they
+    were when the run was recorded, so the replay ends in the same state as the run
+    did.
+
+    :param recording: The recording to replay.
+    :type recording: Recording
+    :param game: A headless game to reuse, or None to create one.
+    :type game: Game or None
+    :param render: Whether to draw every tick.
+    :type render: bool
+    :param state_logging: Whether to log the game state every tick.
+    :type state_logging: bool
+    :return: The stats of run_headless, plus "matches_recording", which is True if
+        the final state has the recorded checksum, False if not and None if the
+        recording has no checksum.
+    :rtype: dict
+    """
+    if recording.tick_rate != SIMULATION_RATE:
+        raise ValueError(
+            f"Recording was made at {recording.tick_rate} ticks per second, "
+            f"the game runs at {SIMULATION_RATE}"
+        )
+    result = run_headless(
+        recording.level,
+        len(recording),
+        recording.keys_at,
+        render,
+        game,
+        state_logging,
+        recording.restore,
+    )
+    if recording.checksum is None:
+        result["matches_recording"] = None
+    else:
+        result["matches_recording"] = result["checksum"] == recording.checksum
+    return result
+
+
+def main():
+    """
+    Replay a recorded run and print its throughput and whether it is deterministic.
+
+    :return: None
+    """
+    parser = argparse.ArgumentParser(description="Replay a recorded run headless")
+    parser.add_argument("recording")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--render", action="store_true")
+    args = parser.parse_args()
+
+    recording = Recording.load(args.recording)
+    game = create_game()
+    for _ in range(args.repeat):
+        result = replay(recording, game, args.render)
+        print(
+            f"{recording.level}: {result['ticks']} ticks, "
+            f"{result['ticks_per_second']:.0f} ticks/s, "
+            f"update p50 {result['update']['p50_ms']:.2f} ms "
+            f"p95 {result['update']['p95_ms']:.2f} ms, "
+            f"checksum {result['checksum'][:10]}, "
+            f"matches recording: {result['matches_recording']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
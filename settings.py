@@ -13,11 +13,21 @@ HEIGHT = 600
 EDITOR_WIDTH = 800
 EDITOR_HEIGHT = 600
 FPS = 60
+# Velocities are in pixels per simulation tick. RENDER_FPS caps the rendered
+# frames, 0 renders as fast as possible.
+SIMULATION_RATE = FPS
+RENDER_FPS = FPS
+MAX_SIMULATION_STEPS = 5
+INTERPOLATION_SNAP_DISTANCE = 64
 
 
 WORLD_WIDTH = 1600
 WORLD_HEIGHT = 1200
 GRID_SIZE = 10
+SPATIAL_CELL_SIZE = 128
+COLLISION_BACKEND = "auto"
+PROJECTILE_SIZE = 8
+PROJECTILE_CAPACITY = 256
 
 
 PLATFORM_COLORS = {
@@ -34,15 +44,40 @@ MIN_PLATFORM_SIZE = GRID_SIZE
 
 CAMERA_SPEED_DIVISOR = 10
 CAMERA_RECT_SIZE = 50
+ACTIVATION_MARGIN = 400
+DRAW_CULL_MARGIN = 64
+SLEEP_TICK_INTERVAL = 0
+# Time-slicing of the enemy AI is opt-in: with one bucket and no budget every enemy
+# thinks every tick. More buckets spread the decisions over frames, which is cheaper
+# but makes enemies react up to AI_THINK_BUCKETS - 1 ticks late; a budget in
+# milliseconds defers the rest of the enemies once it is used up.
+AI_THINK_BUCKETS = 1
+AI_THINK_BUDGET_MS = None
 
 
 DEBUG_FONT_SIZE = 24
 CAMERA_PAN_SPEED = 20
 
 LEVEL_PATH = ".//levels//"
+GENERATED_LEVEL_PATH = LEVEL_PATH + "generated//"
+PLAYABILITY_REPORT_PATH = ".//playability//"
 
 
 TANK_ENEMIE_HEALTH = 200
 SHOOTER_ENEMIE_HEALTH = 30
 FLYING_ENEMIE_HEALTH = 50
 GROUND_ENEMIE_HEALTH = 50
+
+
+PLAYER_MAX_SPEED = 5
+PLAYER_JUMP_POWER = -13
+PLAYER_GRAVITY = 0.8
+
+
+LADDER_REACH = 40
+WALKABLE_SPAN_TOLERANCE = 5
+NAVIGATION_VERSION = 1
+
+
+LINE_OF_SIGHT_CACHE_FRAMES = 4
+LINE_OF_SIGHT_TOLERANCE = 8
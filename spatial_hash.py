@@ -0,0 +1,100 @@
+from settings import SPATIAL_CELL_SIZE
+
+
+class SpatialHash:
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE):
+        """
+        Initialize an empty uniform spatial hash.
+
+        The world is divided into square cells of cell_size pixels. Every item is
+        registered in each cell its rect overlaps, so a query only has to look at the
+        few cells around the rect being tested instead of every item in the level.
+
+        :param cell_size: The width and height of one grid cell in pixels.
+        :type cell_size: int
+        """
+        self.cell_size = cell_size
+        self.cells = {}
+        self.order = {}
+
+    def __len__(self):
+        return len(self.order)
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def cell_range(self, rect):
+        """
+        Get the range of cells covered by a rectangle.
+
+        :param rect: The rectangle to look up.
+        :type rect: pygame.Rect
+        :return: A tuple (min_x, min_y, max_x, max_y) of inclusive cell coordinates.
+        """
+        size = self.cell_size
+        return (
+            rect.left // size,
+            rect.top // size,
+            (rect.right - 1) // size,
+            (rect.bottom - 1) // size,
+        )
+
+    def insert(self, item, rect=None):
+        """
+        Register an item in every cell its rectangle overlaps.
+
+        :param item: The object to store, usually a sprite.
+        :param rect: The rectangle to index the item by, defaults to item.rect.
+        :type rect: pygame.Rect or None
+        :return: None
+        """
+        if rect is None:
+            rect = item.rect
+        self.order[item] = len(self.order)
+        min_x, min_y, max_x, max_y = self.cell_range(rect)
+        for cx in range(min_x, max_x + 1):
+            for cy in range(min_y, max_y + 1):
+                self.cells.setdefault((cx, cy), []).append(item)
+
+    def clear(self):
+        """
+        Remove every item from the hash.
+
+        :return: None
+        """
+        self.cells.clear()
+        self.order.clear()
+
+    def query(self, rect):
+        """
+        Get all items sharing at least one cell with the given rectangle.
+
+        The result is a broad phase candidate list: items are returned once each, in
+        the order they were inserted, but they do not necessarily overlap the rect.
+
+        :param rect: The area to search.
+        :type rect: pygame.Rect
+        :return: A list of candidate items.
+        """
+        min_x, min_y, max_x, max_y = self.cell_range(rect)
+        cells = self.cells
+        if min_x == max_x and min_y == max_y:
+            return list(cells.get((min_x, min_y), ()))
+
+        found = set()
+        for cx in range(min_x, max_x + 1):
+            for cy in range(min_y, max_y + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        return sorted(found, key=self.order.__getitem__)
+
+    def collide(self, rect):
+        """
+        Get all items whose rectangle overlaps the given rectangle.
+
+        :param rect: The area to test.
+        :type rect: pygame.Rect
+        :return: A list of overlapping items in insertion order.
+        """
+        return [item for item in self.query(rect) if rect.colliderect(item.rect)]
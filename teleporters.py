@@ -0,0 +1,108 @@
+from platform_registry import PlatformCollection
+from debug_logger import logger
+
+
+class TeleporterNetwork:
+    def __init__(self, teleporters=None):
+        """
+        Index the teleporters of a level by their pair id.
+
+        Every pair_id should be used by exactly two teleporters. The pairs are looked up
+        once here, so finding the partner of a teleporter is a dictionary lookup instead
+        of a scan over every platform. Pair ids used by a single teleporter, or by more
+        than two, are reported with a warning; extra teleporters are left unpaired.
+
+        Attributes:
+        teleporters: The collection the teleporters were read from.
+        pairs: A dict mapping each pair_id to its (a, b) teleporters.
+        partners: A dict mapping each paired teleporter to its partner.
+        last_teleport: A dict mapping each pair_id to the time of its last use.
+        unpaired: A list of teleporters without a partner.
+
+        :param teleporters: The teleporters collection of the level's PlatformRegistry.
+        :type teleporters: PlatformCollection or None
+        """
+        if teleporters is None:
+            teleporters = PlatformCollection("teleporters")
+        self.teleporters = teleporters
+        self.pairs = {}
+        self.partners = {}
+        self.last_teleport = {}
+        self.unpaired = []
+
+        by_pair_id = {}
+        for teleporter in teleporters:
+            by_pair_id.setdefault(teleporter.pair_id, []).append(teleporter)
+
+        for pair_id, members in by_pair_id.items():
+            if len(members) == 1:
+                logger.warning(
+                    f"Teleporter pair {pair_id} has only one teleporter at "
+                    f"({members[0].rect.x}, {members[0].rect.y})"
+                )
+                self.unpaired.extend(members)
+                continue
+            if len(members) > 2:
+                logger.warning(
+                    f"Teleporter pair {pair_id} has {len(members)} teleporters, "
+                    f"only the first two are linked"
+                )
+                self.unpaired.extend(members[2:])
+
+            a, b = members[0], members[1]
+            self.pairs[pair_id] = (a, b)
+            self.partners[a] = b
+            self.partners[b] = a
+            self.last_teleport[pair_id] = 0
+
+    def __len__(self):
+        return len(self.pairs)
+
+    def partner(self, teleporter):
+        """
+        Get the teleporter linked to the given one.
+
+        :param teleporter: A teleporter of the level.
+        :type teleporter: TeleporterPlatform
+        :return: The partner teleporter, or None if the teleporter is unpaired.
+        """
+        return self.partners.get(teleporter)
+
+    def colliding(self, rect):
+        """
+        Get the teleporters overlapping a rectangle.
+
+        :param rect: The area to test.
+        :type rect: pygame.Rect
+        :return: A list of overlapping teleporters.
+        """
+        return self.teleporters.collide(rect)
+
+    def teleport(self, entity, current_time):
+        """
+        Teleport an entity standing on a teleporter to the paired teleporter.
+
+        The entity is placed on top of the partner teleporter and its velocity is reset.
+        Both teleporters of the pair then share a cooldown before they can be used again.
+
+        :param entity: The entity to teleport, usually the player. It must have rect,
+            vel_x and vel_y attributes.
+        :param current_time: The game time in milliseconds, from Game.get_ticks.
+        :type current_time: int
+        :return: True if the entity was teleported, False otherwise.
+        """
+        for teleporter in self.colliding(entity.rect):
+            other = self.partners.get(teleporter)
+            if other is None:
+                continue
+            pair_id = teleporter.pair_id
+            if current_time - self.last_teleport[pair_id] < teleporter.cooldown:
+                continue
+
+            entity.vel_x = 0
+            entity.vel_y = 0
+            entity.rect.centerx = other.rect.centerx
+            entity.rect.bottom = other.rect.top
+            self.last_teleport[pair_id] = current_time
+            return True
+        return False
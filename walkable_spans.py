@@ -0,0 +1,221 @@
+from bisect import bisect_right
+from settings import WALKABLE_SPAN_TOLERANCE
+
+
+class WalkableSpan:
+    __slots__ = ("top", "left", "right", "height")
+
+    def __init__(self, top, left, right, height=0):
+        """
+        Initialize a walkable span.
+
+        :param top: The y-coordinate of the surface, the bottom of an entity standing
+            on it. For a span joined from surfaces at several heights, the highest one.
+        :param left: The x-coordinate where the span starts.
+        :param right: The x-coordinate where the span ends, exclusive like Rect.right.
+        :param height: How far the lowest surface of a joined span is below its top, 0
+            for a flat span.
+        """
+        self.top = top
+        self.left = left
+        self.right = right
+        self.height = height
+
+    def __repr__(self):
+        if self.height:
+            return (
+                f"<WalkableSpan y={self.top}..{self.top + self.height} "
+                f"x={self.left}..{self.right}>"
+            )
+        return f"<WalkableSpan y={self.top} x={self.left}..{self.right}>"
+
+    def supports(self, rect, tolerance=0):
+        """
+        Check whether a rectangle stands on this span.
+
+        :param rect: The rectangle to check.
+        :type rect: pygame.Rect
+        :param tolerance: How many pixels the rect's bottom may be above or below the
+            span.
+        :type tolerance: int
+        :return: True if the rect's bottom is on the span and it overlaps it horizontally.
+        :rtype: bool
+        """
+        return (
+            self.top - tolerance <= rect.bottom <= self.top + self.height + tolerance
+            and rect.left < self.right
+            and rect.right > self.left
+        )
+
+
+def merge_spans(rects, gap=0):
+    """
+    Merge the tops of rectangles at the same height into walkable spans.
+
+    :param rects: The rectangles whose tops can be walked on.
+    :type rects: iterable of pygame.Rect
+    :param gap: Tops closer than this are merged as well.
+    :type gap: int
+    :return: A dict mapping each top to its spans, sorted by left.
+    :rtype: dict
+    """
+    by_top = {}
+    for rect in rects:
+        by_top.setdefault(rect.top, []).append((rect.left, rect.right))
+    spans = {}
+    for top, intervals in by_top.items():
+        intervals.sort()
+        merged = []
+        for left, right in intervals:
+            if merged and left <= merged[-1].right + gap:
+                merged[-1].right = max(merged[-1].right, right)
+            else:
+                merged.append(WalkableSpan(top, left, right))
+        spans[top] = merged
+    return spans
+
+
+def join_spans(spans, tolerance):
+    """
+    Join spans that touch or overlap horizontally and whose tops are at most tolerance
+    pixels apart, so small steps between neighbouring platforms count as one stretch
+    of ground.
+
+    :param spans: A dict mapping each top to its spans sorted by left, as returned by
+        merge_spans.
+    :type spans: dict
+    :param tolerance: The largest height difference that is joined.
+    :type tolerance: int
+    :return: A dict mapping each top to the spans that contain a surface at that
+        top, sorted by left. Spans that were not joined are returned unchanged.
+    :rtype: dict
+    """
+    if tolerance <= 0:
+        return spans
+    items = [span for top in sorted(spans) for span in spans[top]]
+    index = {id(span): i for i, span in enumerate(items)}
+    lefts = {top: [span.left for span in row] for top, row in spans.items()}
+    parent = list(range(len(items)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, span in enumerate(items):
+        for top in range(span.top + 1, span.top + tolerance + 1):
+            row = spans.get(top)
+            if not row:
+                continue
+            # The spans of one row do not overlap, so their rights grow with their lefts.
+            j = bisect_right(lefts[top], span.right) - 1
+            while j >= 0 and row[j].right >= span.left:
+                parent[find(index[id(row[j])])] = find(i)
+                j -= 1
+
+    groups = {}
+    for i, span in enumerate(items):
+        groups.setdefault(find(i), []).append(span)
+    joined = {}
+    for members in groups.values():
+        if len(members) == 1:
+            span = members[0]
+        else:
+            top = min(member.top for member in members)
+            span = WalkableSpan(
+                top,
+                min(member.left for member in members),
+                max(member.right for member in members),
+                max(member.top for member in members) - top,
+            )
+        for member_top in {member.top for member in members}:
+            joined.setdefault(member_top, []).append(span)
+    for row in joined.values():
+        row.sort(key=lambda span: span.left)
+    return joined
+
+
+class WalkableSpanMap:
+    def __init__(self, registry, tolerance=WALKABLE_SPAN_TOLERANCE):
+        """
+        Precompute the walkable spans of a level.
+
+        A span is a continuous stretch of ground: the tops of all platforms at the same
+        y-coordinate are merged where they touch or overlap, and then spans that touch
+        and differ in height by at most tolerance pixels are joined, like the small
+        steps an enemy walks down without falling. Two
+        tables are built, one with the solid platforms and teleporters and one that also
+        counts the tops of ladders as ground, for enemies that walk over ladders.
+
+        Entities are pushed out of platforms by whole pixels and can end up slightly
+        above or below a top, so a rect still stands on a span when its bottom is within
+        tolerance pixels of it.
+
+        Attributes:
+        spans: A dict mapping (top, include_ladders) to the spans with a surface at that
+            height, sorted by left.
+        lefts: A dict with the same keys mapping to the left edges of those spans, for
+            bisecting.
+        tolerance: How far in pixels a rect's bottom may be from the span it stands on.
+        offsets: The offsets from a rect's bottom at which spans are looked up, nearest
+            first.
+
+        :param registry: The platform registry of the level.
+        :type registry: PlatformRegistry
+        :param tolerance: The distance in pixels allowed between a bottom and a span.
+        :type tolerance: int
+        """
+        self.tolerance = tolerance
+        self.offsets = [0]
+        for distance in range(1, tolerance + 1):
+            self.offsets += [distance, -distance]
+        self.spans = {}
+        self.lefts = {}
+        ground = list(registry.solids) + list(registry.teleporters)
+        for include_ladders, colliders in (
+            (False, ground),
+            (True, ground + list(registry.ladders)),
+        ):
+            by_top = join_spans(
+                merge_spans(collider.rect for collider in colliders), tolerance
+            )
+            for top, merged in by_top.items():
+                key = (top, include_ladders)
+                self.spans[key] = merged
+                self.lefts[key] = [span.left for span in merged]
+
+    def __len__(self):
+        return len(
+            {
+                id(span)
+                for (_, ladders), spans in self.spans.items()
+                if ladders
+                for span in spans
+            }
+        )
+
+    def span_at(self, rect, include_ladders=False):
+        """
+        Find the span a rectangle stands on.
+
+        The span nearest to the rect's bottom within the tolerance is used. If the rect
+        overlaps two spans at that height, the one under its center is preferred.
+
+        :param rect: The rectangle standing on the ground.
+        :type rect: pygame.Rect
+        :param include_ladders: Whether ladder tops count as ground.
+        :type include_ladders: bool
+        :return: The span, or None if the rect does not stand on any.
+        :rtype: WalkableSpan or None
+        """
+        for offset in self.offsets:
+            key = (rect.bottom + offset, include_ladders)
+            spans = self.spans.get(key)
+            if not spans:
+                continue
+            i = bisect_right(self.lefts[key], rect.centerx) - 1
+            for j in (i, i + 1, i - 1):
+                if 0 <= j < len(spans) and spans[j].supports(rect, abs(offset)):
+                    return spans[j]
+        return None